@@ -0,0 +1,86 @@
+"""Per-account auth tokens for Skinergy Desktop Uploader (--batch)
+
+auth_token.json holds the one token the window and --headless use. A host
+that runs several League clients, each logged into a different account,
+needs one Skinergy token per account instead: account_tokens.json maps the
+client's Riot ID ("name#tag", case-insensitive) to the same fields
+auth_token.json has. Fill it with --link "Name#TAG" --code CODE.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+ACCOUNT_TOKENS_FILE = 'account_tokens.json'
+
+
+def account_key(name: str, tag: str) -> str:
+    """Store key of a Riot ID"""
+    return f"{name.strip()}#{tag.strip()}".lower()
+
+
+class AccountTokenStore:
+    """Riot ID -> {auth_token, user_id, saved_at, expires_at} in the data dir
+
+    Every call re-reads the file, so a token linked from another process
+    is picked up without a restart; writes are atomic.
+    """
+
+    def __init__(self, data_dir: str, filename: str = ACCOUNT_TOKENS_FILE):
+        self.path = os.path.join(data_dir, filename)
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('accounts', {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.error(f"Failed to load {ACCOUNT_TOKENS_FILE}: {e}")
+            return {}
+
+    def _save(self, accounts: Dict[str, Dict]):
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'accounts': accounts}, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, riot_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """(auth_token, user_id) linked to a Riot ID, (None, None) if missing or expired"""
+        entry = self._load().get(riot_id.lower())
+        if not entry or time.time() > entry.get('expires_at', 0):
+            return None, None
+        return entry.get('auth_token'), entry.get('user_id')
+
+    def set(self, riot_id: str, auth_token: str, user_id: str, expires_in: float = 86400):
+        with self._lock:
+            accounts = self._load()
+            accounts[riot_id.lower()] = {
+                'auth_token': auth_token,
+                'user_id': user_id,
+                'saved_at': time.time(),
+                'expires_at': time.time() + expires_in
+            }
+            self._save(accounts)
+
+    def remove(self, riot_id: str):
+        """Forget an account's token (expired or rejected by the server)"""
+        with self._lock:
+            accounts = self._load()
+            if accounts.pop(riot_id.lower(), None) is not None:
+                self._save(accounts)
+
+    def token_for_user(self, user_id: str) -> Optional[str]:
+        """Any unexpired token saved for a Skinergy user (for queued uploads)"""
+        now = time.time()
+        for entry in self._load().values():
+            if str(entry.get('user_id')) == str(user_id) and now <= entry.get('expires_at', 0):
+                return entry.get('auth_token')
+        return None
+
+    def accounts(self) -> List[str]:
+        return sorted(self._load())
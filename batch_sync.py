@@ -0,0 +1,155 @@
+"""Batch mode for Skinergy Desktop Uploader (--batch)
+
+Syncs every League client running on this host at once: separate installs
+and Wine prefixes, each logged into its own account. Each client is
+identified by its Riot ID, which picks that account's Skinergy token from
+the AccountTokenStore, and gets its own data dir (accounts/<riot id>) so
+snapshots and delta bases never mix between accounts.
+"""
+
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from account_store import AccountTokenStore, account_key
+from process_table import ProcessTable
+from security_config import RateLimiter, SecurityConfig
+from sync_engine import (STATUS_AUTH_EXPIRED, STATUS_CLIENT_ERROR, STATUS_CONNECTION_ERROR,
+                         STATUS_NOT_AUTHORIZED, STATUS_TIMEOUT, SkinSyncEngine, SyncResult)
+
+ACCOUNTS_DIR = 'accounts'
+
+
+def _no_progress(text, step=None, stage=None):
+    pass
+
+
+class ClientResult:
+    """Outcome of one client in a batch"""
+
+    def __init__(self, port: str, riot_id: Optional[str], result: SyncResult, seconds: float):
+        self.port = port
+        self.riot_id = riot_id
+        self.result = result
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"ClientResult(port={self.port}, riot_id={self.riot_id!r}, status={self.result.status!r})"
+
+
+def account_dir(data_dir: str, riot_id: str) -> str:
+    """Data dir of one account (created if missing)"""
+    safe = re.sub(r'[^\w.-]+', '_', riot_id.lower()).strip('._') or 'account'
+    path = os.path.join(data_dir, ACCOUNTS_DIR, safe)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class BatchSync:
+    """Discover every running client and sync them concurrently
+
+    `rate_limiter` (the upload_data limiter) is asked before each upload,
+    so a batch stays inside the same budget as the window and --daemon.
+    """
+
+    def __init__(self, data_dir: str, store: Optional[AccountTokenStore] = None,
+                 log: Optional[Callable[[str], None]] = None,
+                 workers: Optional[int] = None,
+                 process_table: Optional[ProcessTable] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 export_json: bool = False):
+        self.data_dir = data_dir
+        self.store = store if store is not None else AccountTokenStore(data_dir)
+        self.log = log or logging.info
+        self.workers = max(1, workers or SecurityConfig.BATCH_WORKERS)
+        self.rate_limiter = rate_limiter
+        self.export_json = export_json
+        self.discovery = SkinSyncEngine(data_dir=data_dir, log=self.log,
+                                        process_table=process_table)
+        self.process_table = self.discovery.process_table
+        # One spool for all accounts (keyed by user), drained by the window or --daemon
+        self.spool = self.discovery.spool
+
+    def discover(self) -> List[Dict]:
+        return self.discovery.discover_clients()
+
+    def run(self, clients: Optional[List[Dict]] = None) -> List[ClientResult]:
+        """Sync every client (discovered if not given); results in client order"""
+        clients = self.discover() if clients is None else clients
+        if not clients:
+            return []
+        self.log(f"Found {len(clients)} League client(s), syncing up to {self.workers} at a time")
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(clients)),
+                                thread_name_prefix="batch") as pool:
+            return list(pool.map(self.sync_client, clients))
+
+    def sync_client(self, client: Dict) -> ClientResult:
+        """Identify one client's account and run the pipeline against it"""
+        port, lcu_token = client['port'], client['token']
+        start = time.perf_counter()
+        prefix = f"[{port}] "
+
+        def _log(message):
+            self.log(prefix + message)
+
+        riot_id = None
+        try:
+            # Whose client this is decides the token and the data dir
+            account = self._identify(port, lcu_token, _log)
+            if account is None:
+                result = SyncResult(STATUS_CLIENT_ERROR, "Failed to get summoner info")
+            else:
+                riot_id = f"{account['summoner_name']}#{account['summoner_tag']}"
+                prefix = f"[{riot_id}] "
+                result = self._sync_account(account, riot_id, (port, lcu_token), _log)
+        except requests.exceptions.ConnectionError:
+            result = SyncResult(STATUS_CONNECTION_ERROR, "Connection error - cannot reach League client")
+        except requests.exceptions.Timeout:
+            result = SyncResult(STATUS_TIMEOUT, "Request timeout - League client took too long to respond")
+        except Exception as e:
+            result = SyncResult(STATUS_CLIENT_ERROR, f"Failed to read client: {e}")
+
+        _log(("✓ " if result.ok else "✗ ") + result.message)
+        return ClientResult(port, riot_id, result, time.perf_counter() - start)
+
+    def _identify(self, port: str, lcu_token: str, log) -> Optional[Dict]:
+        """fetch_account() of one client, with no data dir of its own yet"""
+        engine = SkinSyncEngine(log=log, progress=_no_progress, process_table=self.process_table)
+        try:
+            return engine.fetch_account(port, lcu_token)
+        finally:
+            engine.sessions.close()
+
+    def _sync_account(self, account: Dict, riot_id: str, connection, log) -> SyncResult:
+        key = account_key(*riot_id.split('#', 1))
+        auth_token, user_id = self.store.get(key)
+        if not auth_token or not user_id:
+            return SyncResult(STATUS_NOT_AUTHORIZED,
+                              f"No Skinergy token linked to {riot_id} - run with --link \"{riot_id}\" --code CODE")
+
+        # Own data dir for snapshots; projection tables and the spool are shared
+        engine = SkinSyncEngine(data_dir=account_dir(self.data_dir, key), log=log, progress=_no_progress,
+                                process_table=self.process_table, export_json=self.export_json,
+                                tables_dir=self.data_dir, spool=self.spool,
+                                offline_spool=self.spool is not None)
+        try:
+            self._wait_for_rate_limit(log)
+            result = engine.run(auth_token, user_id, connection=connection, account=account)
+        finally:
+            engine.sessions.close()
+        if result.status == STATUS_AUTH_EXPIRED:
+            self.store.remove(key)
+        return result
+
+    def _wait_for_rate_limit(self, log):
+        if self.rate_limiter is None:
+            return
+        while not self.rate_limiter.can_make_request():
+            wait = max(1, self.rate_limiter.time_until_next_request())
+            log(f"Upload rate limit reached, waiting {wait}s")
+            time.sleep(wait)
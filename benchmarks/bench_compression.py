@@ -0,0 +1,59 @@
+"""Compression ratio and CPU cost of the upload body
+
+    python benchmarks/bench_compression.py [--skins 2000] [--loot 1500]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_payload  # noqa: E402
+from http_client import compress_body, zstandard  # noqa: E402
+
+
+def _time_cpu(fn, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skins', type=int, default=2000)
+    parser.add_argument('--loot', type=int, default=1500)
+    parser.add_argument('--friends', type=int, default=150)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_payload(args.skins, args.loot, args.friends)
+    body, encode_cpu = _time_cpu(
+        lambda: json.dumps(payload, separators=(',', ':')).encode('utf-8'), args.repeat)
+
+    print(f"payload: {args.skins} skins, {args.loot} loot, {args.friends} friends")
+    print(f"json encode: {len(body):>10,} bytes  {encode_cpu * 1000:8.1f} ms cpu")
+
+    cases = [
+        ("gzip-1", lambda: gzip.compress(body, compresslevel=1, mtime=0)),
+        ("gzip-6 (upload)", lambda: compress_body(body, 'gzip')),
+        ("gzip-9", lambda: gzip.compress(body, compresslevel=9, mtime=0)),
+    ]
+    if zstandard is not None:
+        cases.append(("zstd-3 (upload)", lambda: compress_body(body, 'zstd')))
+        cases.append(("zstd-10", lambda: zstandard.ZstdCompressor(level=10).compress(body)))
+    else:
+        print("zstandard not installed, skipping zstd")
+
+    for name, fn in cases:
+        out, cpu = _time_cpu(fn, args.repeat)
+        print(f"{name:<16} {len(out):>10,} bytes  ratio {len(body) / len(out):6.1f}x  "
+              f"{cpu * 1000:8.1f} ms cpu")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""End-to-end sync benchmark against local League client and Skinergy API stand-ins
+
+    python benchmarks/bench_e2e.py [--sizes small,medium,huge] [--repeat 3]
+                                   [--accept-encoding gzip]
+                                   [--json bench_e2e.json] [--compare old.json]
+
+For each synthetic account size, starts a FakeLcuApi (HTTPS, self-signed
+certificate) and a FakeSkinergyApi, then runs authorize + the full
+SkinSyncEngine pipeline (discovery, account, skins/loot/friends, upload)
+in a fresh child process per repeat, so peak RSS belongs to that one sync.
+Reports the median of each stage, total wall time, peak RSS and the bytes
+read from the client and sent to the API. Results go to a JSON file; with
+--compare, the change against an earlier file is printed as well.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_api import FakeSkinergyApi  # noqa: E402
+from benchmarks.fake_lcu import FakeLcuApi, make_self_signed_cert  # noqa: E402
+from benchmarks.synthetic import make_friends, make_loot, make_skins  # noqa: E402
+
+SIZES = {
+    'small': {'skins': 300, 'loot': 200, 'friends': 20},
+    'medium': {'skins': 2000, 'loot': 1500, 'friends': 150},
+    'huge': {'skins': 12000, 'loot': 8000, 'friends': 800},
+}
+STAGES = ('authorize', 'connect', 'account', 'collection', 'upload')
+# Spinner stage reported by SkinSyncEngine.progress -> benchmark stage it starts
+_PROGRESS_STAGES = {'Connecting': 'connect', 'Fetching account': 'account',
+                    'Fetching skins': 'collection', 'Uploading': 'upload'}
+
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                 ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize // 1024
+    except Exception:
+        return None
+
+
+def _child(config):
+    """One sync in this process; prints a JSON result line"""
+    from process_table import FakeProcessTable, ProcessInfo
+    from security_config import SecurityConfig
+    from sync_engine import SkinSyncEngine
+
+    SecurityConfig.API_BASE_URL = config['api_url']
+    marks = []
+
+    def _progress(text, step=None, stage=None):
+        if stage in _PROGRESS_STAGES:
+            marks.append((_PROGRESS_STAGES[stage], time.perf_counter()))
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as data_dir:
+        process = ProcessInfo(4242, 'LeagueClientUx.exe', config['cmdline'])
+        engine = SkinSyncEngine(data_dir=data_dir, log=lambda message: None, progress=_progress,
+                                process_table=FakeProcessTable([process]))
+        response = engine.verify_auth_code('BENCH123')
+        auth = response.json()
+        marks.insert(0, ('authorize', start))
+        result = engine.run(auth['auth_token'], auth['user_id'])
+        end = time.perf_counter()
+        engine.sessions.close()
+
+    stages = {}
+    for (stage, begin), (_, finish) in zip(marks, marks[1:] + [(None, end)]):
+        stages[stage] = finish - begin
+    print(json.dumps({'status': result.status, 'wall_s': end - start, 'stages': stages,
+                      'peak_rss_kb': _peak_rss_kb()}))
+    return 0 if result.ok else 1
+
+
+def _run_size(name, counts, repeat, certfile, keyfile, accept_encoding):
+    lcu = FakeLcuApi(make_skins(counts['skins']), make_loot(counts['loot']),
+                     make_friends(counts['friends']), certfile, keyfile).start()
+    runs = []
+    try:
+        for _ in range(repeat):
+            api = FakeSkinergyApi(accept_encoding=accept_encoding)
+            config = {'api_url': api.start(), 'cmdline': lcu.cmdline}
+            lcu_before = lcu.stats['bytes_sent']
+            try:
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', json.dumps(config)],
+                                      capture_output=True, text=True)
+            finally:
+                api.stop()
+            lines = proc.stdout.strip().splitlines()
+            if not lines:
+                raise RuntimeError(f"{name}: benchmark child failed:\n{proc.stderr}")
+            run = json.loads(lines[-1])
+            stored = api.collections.get('user-BENCH123') or {}
+            run.update(lcu_bytes=lcu.stats['bytes_sent'] - lcu_before,
+                       upload_bytes=api.stats['bytes_received'],
+                       payload_bytes=len(json.dumps(stored, separators=(',', ':')).encode('utf-8')))
+            runs.append(run)
+    finally:
+        lcu.stop()
+
+    def _median(values):
+        values = [v for v in values if v is not None]
+        return statistics.median(values) if values else None
+
+    return {
+        'counts': counts,
+        'repeat': repeat,
+        'statuses': sorted({run['status'] for run in runs}),
+        'stages_s': {stage: _median([run['stages'].get(stage) for run in runs]) for stage in STAGES},
+        'wall_s': _median([run['wall_s'] for run in runs]),
+        'wall_s_min': min(run['wall_s'] for run in runs),
+        'peak_rss_kb': _median([run['peak_rss_kb'] for run in runs]),
+        'lcu_bytes': _median([run['lcu_bytes'] for run in runs]),
+        'upload_bytes': _median([run['upload_bytes'] for run in runs]),
+        'payload_bytes': _median([run['payload_bytes'] for run in runs]),
+    }
+
+
+def _git_commit():
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:>8.1f}" if seconds is not None else f"{'-':>8}"
+
+
+def _print_results(results):
+    print(f"{'size':<8} " + " ".join(f"{stage + ' ms':>12}" for stage in STAGES)
+          + f" {'wall ms':>9} {'RSS MB':>7} {'LCU KB':>8} {'sent KB':>8} {'JSON KB':>8}  status")
+    for name, r in results.items():
+        rss = f"{r['peak_rss_kb'] / 1024:>7.1f}" if r['peak_rss_kb'] else f"{'-':>7}"
+        print(f"{name:<8} " + " ".join(f"{_ms(r['stages_s'][stage]):>12}" for stage in STAGES)
+              + f" {_ms(r['wall_s']):>9} {rss} {r['lcu_bytes'] / 1024:>8.0f} {r['upload_bytes'] / 1024:>8.0f} "
+              f"{r['payload_bytes'] / 1024:>8.0f}  {','.join(r['statuses'])}")
+
+
+def _print_comparison(results, old):
+    print(f"\nChange against {old['meta'].get('commit') or 'baseline'} (negative is better):")
+    for name, r in results.items():
+        before = old['results'].get(name)
+        if not before:
+            continue
+        changes = []
+        for label, new_value, old_value in (
+                [(stage, r['stages_s'][stage], before['stages_s'].get(stage)) for stage in STAGES]
+                + [('wall', r['wall_s'], before.get('wall_s')),
+                   ('rss', r['peak_rss_kb'], before.get('peak_rss_kb')),
+                   ('sent', r['upload_bytes'], before.get('upload_bytes'))]):
+            if new_value is not None and old_value:
+                changes.append(f"{label} {100.0 * (new_value - old_value) / old_value:+.1f}%")
+        print(f"{name:<8} " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(SIZES),
+                        help=f"comma-separated account sizes ({', '.join(SIZES)})")
+    parser.add_argument('--repeat', type=int, default=3, help='syncs per size (medians are reported)')
+    parser.add_argument('--accept-encoding', default='gzip',
+                        help="upload codings the stand-in API advertises ('' for none)")
+    parser.add_argument('--json', default='bench_e2e.json', help='where to write the results')
+    parser.add_argument('--compare', help='earlier --json file to compare against')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return _child(json.loads(args.child))
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cert_dir:
+        certfile, keyfile = make_self_signed_cert(cert_dir)
+        for name in sizes:
+            print(f"{name}: {SIZES[name]['skins']} skins, {SIZES[name]['loot']} loot, "
+                  f"{SIZES[name]['friends']} friends x {args.repeat}", flush=True)
+            results[name] = _run_size(name, SIZES[name], max(1, args.repeat), certfile, keyfile,
+                                      args.accept_encoding)
+
+    report = {
+        'meta': {'commit': _git_commit(), 'time': datetime.datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'accept_encoding': args.accept_encoding},
+        'results': results,
+    }
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print()
+    _print_results(results)
+    print(f"\nWrote {args.json}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            _print_comparison(results, json.load(f))
+
+    failed = [name for name, r in results.items() if r['statuses'] != ['success']]
+    if failed:
+        print(f"\nFAIL: sync did not succeed for {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
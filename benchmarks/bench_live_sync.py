@@ -0,0 +1,61 @@
+"""Latency from a League client inventory event to the sync trigger
+
+    python benchmarks/bench_live_sync.py [--bursts 5] [--events 20] [--debounce 0.5]
+
+Publishes bursts of inventory/loot events from FakeLcuEventServer and
+measures how long LcuEventSubscriber takes to fire after each burst ends.
+"""
+
+import argparse
+import os
+import queue
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_lcu import FakeLcuEventServer  # noqa: E402
+from lcu_events import LcuEventSubscriber  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bursts', type=int, default=5)
+    parser.add_argument('--events', type=int, default=20, help='events per burst')
+    parser.add_argument('--debounce', type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = FakeLcuEventServer().start()
+    fired = queue.Queue()
+    subscriber = LcuEventSubscriber(lambda: (server.port, server.token),
+                                    lambda uris: fired.put((time.perf_counter(), uris)),
+                                    debounce=args.debounce, use_tls=False)
+    subscriber.start()
+    if not server.wait_subscribed(len(subscriber.topics)):
+        sys.exit("subscriber never connected")
+
+    delays = []
+    for burst in range(args.bursts):
+        for i in range(args.events):
+            uri = ('/lol-champions/v1/inventories/1/skins-minimal' if i % 2
+                   else '/lol-loot/v1/player-loot-map')
+            server.publish(uri, {'burst': burst, 'n': i})
+            # Unrelated traffic must not trigger a sync
+            server.publish('/lol-chat/v1/me', {})
+        last_sent = time.perf_counter()
+        fired_at, uris = fired.get(timeout=args.debounce + 35)
+        delays.append(fired_at - last_sent)
+        print(f"burst {burst}: {args.events} events -> 1 trigger "
+              f"({len(uris)} uris) after {(fired_at - last_sent) * 1000:.0f} ms")
+
+    subscriber.stop()
+    server.stop()
+    print(f"\ntriggers: {len(delays)} for {args.bursts * args.events} events, "
+          f"events seen: {subscriber.events_seen}")
+    print(f"trigger delay after burst: median {statistics.median(delays) * 1000:.0f} ms "
+          f"(debounce {args.debounce * 1000:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Size and load time of the local caches: indented JSON vs binary snapshots
+
+    python benchmarks/bench_snapshot.py [--skins 10000] [--loot 1500]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshots  # noqa: E402
+from benchmarks.synthetic import make_payload  # noqa: E402
+
+JSON_SNAPSHOT_FILE = 'last_upload.json'
+
+
+def _best_of(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skins', type=int, default=10000)
+    parser.add_argument('--loot', type=int, default=1500)
+    parser.add_argument('--friends', type=int, default=150)
+    args = parser.parse_args()
+
+    payload = make_payload(skins=args.skins, loot=args.loot, friends=args.friends)
+    payload.update(user_id='bench-user', summoner_id=123456789)
+    snapshot = snapshots.build_snapshot(payload)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        def _write_json():
+            for name, data in (('skins.json', payload['skins']), ('skinsLoot.json', payload['loot'])):
+                with open(os.path.join(data_dir, name), 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+
+        def _load_json():
+            # What a diff against the old caches had to parse
+            for name in ('skins.json', 'skinsLoot.json'):
+                with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+                    json.load(f)
+
+        def _write_legacy():
+            with open(os.path.join(data_dir, JSON_SNAPSHOT_FILE), 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+
+        def _load_legacy():
+            with open(os.path.join(data_dir, JSON_SNAPSHOT_FILE), 'r', encoding='utf-8') as f:
+                json.load(f)
+
+        rows = []
+        for name, write, load, files in (
+            ('indented skins/loot JSON', _write_json, _load_json, ('skins.json', 'skinsLoot.json')),
+            ('compact snapshot JSON', _write_legacy, _load_legacy, (JSON_SNAPSHOT_FILE,)),
+            ('binary snapshot', lambda: snapshots.save_snapshot(data_dir, snapshot, snapshots.SNAPSHOT_FILE),
+             lambda: snapshots.load_snapshot(data_dir, snapshots.SNAPSHOT_FILE), (snapshots.SNAPSHOT_FILE,)),
+        ):
+            write_time = _best_of(write, repeat=3)
+            load_time = _best_of(load)
+            size = sum(os.path.getsize(os.path.join(data_dir, f)) for f in files)
+            rows.append((name, size, write_time, load_time))
+
+        assert snapshots.load_snapshot(data_dir, snapshots.SNAPSHOT_FILE) == snapshot
+
+    print(f"{args.skins} skins, {args.loot} loot, {args.friends} friends\n")
+    print(f"{'cache':<26} {'bytes':>11} {'write ms':>9} {'load ms':>8}")
+    for name, size, write_time, load_time in rows:
+        print(f"{name:<26} {size:>11} {write_time * 1000:>9.1f} {load_time * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Peak memory of encoding the upload body: one-shot json.dumps vs streaming
+
+    python benchmarks/bench_stream_memory.py [--skins 10000] [--budget-kb 1024]
+
+Builds the payload first, then measures with tracemalloc only what encoding
+(and gzip) allocates on top of it. Exits non-zero if the streaming encoder
+peaks above --budget-kb, so it can be used as a regression check.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.memory import streamed_size, traced_peak  # noqa: E402
+from benchmarks.synthetic import make_payload  # noqa: E402
+
+
+def _one_shot(payload):
+    return len(json.dumps(payload, separators=(',', ':'), allow_nan=False).encode('utf-8'))
+
+
+def _one_shot_gzip(payload):
+    body = json.dumps(payload, separators=(',', ':'), allow_nan=False).encode('utf-8')
+    return len(gzip.compress(body, compresslevel=6, mtime=0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skins', type=int, default=10000)
+    parser.add_argument('--loot', type=int, default=1500)
+    parser.add_argument('--friends', type=int, default=150)
+    parser.add_argument('--budget-kb', type=int, default=1024,
+                        help='max streaming peak before this exits with status 1')
+    args = parser.parse_args()
+
+    payload = make_payload(skins=args.skins, loot=args.loot, friends=args.friends)
+
+    rows = [
+        ('json.dumps', *traced_peak(lambda: _one_shot(payload))),
+        ('json.dumps + gzip', *traced_peak(lambda: _one_shot_gzip(payload))),
+        ('iter_json', *traced_peak(lambda: streamed_size(payload))),
+        ('iter_json + gzip', *traced_peak(lambda: streamed_size(payload, 'gzip'))),
+    ]
+
+    print(f"{args.skins} skins, {args.loot} loot, {args.friends} friends\n")
+    print(f"{'encoder':<20} {'body bytes':>12} {'peak KB':>10}")
+    for name, size, peak in rows:
+        print(f"{name:<20} {size:>12} {peak / 1024:>10.0f}")
+
+    stream_peak = max(rows[2][2], rows[3][2])
+    if stream_peak > args.budget_kb * 1024:
+        print(f"\nFAIL: streaming peak {stream_peak / 1024:.0f} KB > budget {args.budget_kb} KB")
+        return 1
+    print(f"\nOK: streaming peak {stream_peak / 1024:.0f} KB <= budget {args.budget_kb} KB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Chunked uploads against a stand-in API that drops connections at random
+
+    python benchmarks/check_chunked_upload.py [--skins 10000] [--drop-rate 0.2] [--seeds 5]
+
+For each seed, uploads a synthetic collection through SkinSyncEngine to a
+FakeSkinergyApi that drops --drop-rate of all requests (half before, half
+after acting on them), then checks the server assembled exactly the
+collection that was sent. Also runs a server that answers 413 above
+--max-body-kb, which has to be split around. Exits 1 on any mismatch or
+failed upload. Backoff sleeps are real, so high drop rates take a while.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_api import FakeSkinergyApi  # noqa: E402
+from benchmarks.synthetic import make_payload  # noqa: E402
+from security_config import SecurityConfig  # noqa: E402
+from sync_engine import SkinSyncEngine  # noqa: E402
+
+
+def _upload(payload, api, chunked):
+    SecurityConfig.API_BASE_URL = api.base_url
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = SkinSyncEngine(data_dir=data_dir, log=lambda message: None)
+        engine.chunked_supported = chunked
+        start = time.perf_counter()
+        result = engine.upload_collection(payload, 'bench-token')
+        elapsed = time.perf_counter() - start
+        engine.sessions.close()
+    return result, elapsed
+
+
+def _matches(api, payload):
+    stored = api.collections.get(payload['user_id'])
+    if stored is None:
+        return False
+    return all(stored.get(k) == v for k, v in payload.items())
+
+
+def _run(name, payload, chunked, **server_args):
+    api = FakeSkinergyApi(**server_args)
+    api.start()
+    try:
+        result, elapsed = _upload(payload, api, chunked)
+    finally:
+        api.stop()
+    ok = result.ok and _matches(api, payload)
+    stats = api.stats
+    print(f"{name:<28} {'ok' if ok else 'FAIL':<5} {result.status:<16} {stats['requests']:>5} "
+          f"{stats['dropped']:>5} {stats['replayed']:>6} {stats['bytes_received'] / 1e6:>8.2f} {elapsed:>6.1f}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--skins', type=int, default=10000)
+    parser.add_argument('--loot', type=int, default=1500)
+    parser.add_argument('--friends', type=int, default=150)
+    parser.add_argument('--drop-rate', type=float, default=0.2)
+    parser.add_argument('--seeds', type=int, default=5)
+    parser.add_argument('--part-kb', type=int, default=256, help='UPLOAD_PART_BYTES for the run')
+    parser.add_argument('--max-body-kb', type=int, default=100, help='413 threshold of the split check')
+    args = parser.parse_args()
+
+    payload = make_payload(skins=args.skins, loot=args.loot, friends=args.friends)
+    payload.update(user_id='bench-user', summoner_id=123456789)
+    SecurityConfig.UPLOAD_PART_BYTES = args.part_kb * 1024
+
+    print(f"{args.skins} skins, {args.loot} loot, {args.friends} friends, "
+          f"{args.part_kb} KB parts, drop rate {args.drop_rate}\n")
+    print(f"{'run':<28} {'':<5} {'status':<16} {'reqs':>5} {'drops':>5} {'replay':>6} {'MB recv':>8} {'s':>6}")
+    ok = _run('single POST, no drops', payload, chunked=False)
+    ok &= _run('session, no drops', payload, chunked=True)
+    for seed in range(args.seeds):
+        ok &= _run(f'session, drops (seed {seed})', payload, chunked=True,
+                   drop_rate=args.drop_rate, seed=seed)
+    # One part per request by our measure, so every split comes from the server's 413s
+    SecurityConfig.UPLOAD_PART_BYTES = 64 * 1024 * 1024
+    ok &= _run(f'413 above {args.max_body_kb} KB', payload, chunked=True,
+               max_body_bytes=args.max_body_kb * 1024)
+
+    if not ok:
+        print("\nFAIL: at least one upload did not reach the server intact")
+        return 1
+    print("\nOK: every upload reached the server intact")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
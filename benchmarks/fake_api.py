@@ -0,0 +1,265 @@
+"""Local stand-in for the Skinergy upload API, for benchmarks and manual testing
+
+FakeSkinergyApi answers auth/desktop-verify and accepts one-shot uploads,
+deltas against the stored version, unchanged pings and resumable upload
+sessions (see chunked_upload.py). It can drop a share of connections at random, before or
+after acting on the request, to exercise retries and idempotency keys,
+answer 413 above a body size limit, 415 to compressed bodies, and go down
+for maintenance (503).
+"""
+
+import gzip
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# (section, record key, fields whose records replace the stored ones, field of removed keys)
+_DELTA_SECTIONS = (
+    ('skins', lambda s: str(s.get('id')), ('skins_added', 'skins_changed'), 'skins_removed'),
+    ('loot', lambda i: str(i.get('lootId') or i.get('lootName') or ''), ('loot_changed',), 'loot_removed'),
+    ('friends', lambda f: str(f.get('puuid') or f.get('id') or f.get('summonerId') or ''),
+     ('friends_added', 'friends_changed'), 'friends_removed'),
+)
+_DELTA_FIELDS = {'mode', 'base_version'} | {f for _, _, replaced, removed in _DELTA_SECTIONS
+                                            for f in replaced + (removed,)}
+
+
+def _read_body(handler):
+    if handler.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+        data = bytearray()
+        while True:
+            size = int(handler.rfile.readline().split(b';')[0].strip(), 16)
+            if size == 0:
+                handler.rfile.readline()
+                break
+            data += handler.rfile.read(size)
+            handler.rfile.readline()
+        return bytes(data)
+    return handler.rfile.read(int(handler.headers.get('Content-Length') or 0))
+
+
+def _decode(body, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        api = self.server.owner
+        raw = _read_body(self)
+        with api.lock:
+            api.stats['requests'] += 1
+            api.stats['bytes_received'] += len(raw)
+            drop = api.rng.random() < api.drop_rate
+            drop_after = drop and api.rng.random() < 0.5
+            if drop:
+                api.stats['dropped'] += 1
+        if drop and not drop_after:
+            self.close_connection = True
+            return
+
+        encoding = self.headers.get('Content-Encoding')
+        with api.lock:
+            api.encodings.append(encoding)
+        if api.unavailable:
+            status, reply = 503, {'error': 'Down for maintenance'}
+        elif api.unsupported_media == 'all' or (api.unsupported_media == 'encoded' and encoding):
+            status, reply = 415, {'error': 'Unsupported Media Type'}
+        elif api.max_body_bytes is not None and len(raw) > api.max_body_bytes:
+            status, reply = 413, {'error': 'Payload too large'}
+        else:
+            body = json.loads(_decode(raw, encoding) or b'null')
+            with api.lock:
+                status, reply = api.handle(self.path, body, self.headers.get('Idempotency-Key'))
+
+        if drop_after:
+            # Acted on the request, but the client never hears about it
+            self.close_connection = True
+            return
+        data = json.dumps(reply).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if api.accept_encoding:
+            self.send_header('Accept-Encoding', api.accept_encoding)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeSkinergyApi:
+    """HTTP server answering like {API_BASE_URL}/upload-data and its session endpoints
+
+    `collections` maps user_id to the last complete collection received, as
+    the site would store it, with deltas applied to it. A delta or unchanged
+    ping whose base is not the stored version gets a 409, like a server that
+    lost the collection; `deltas=False` / `unchanged=False` answer those
+    endpoints with 404, like an older server. `unsupported_media` answers
+    415 to compressed bodies ('encoded') or to every body ('all').
+    """
+
+    def __init__(self, drop_rate=0.0, max_body_bytes=None, sessions=True, seed=0, accept_encoding=None,
+                 deltas=True, unchanged=True, unsupported_media=None):
+        self.drop_rate = drop_rate
+        self.accept_encoding = accept_encoding  # advertised upload codings, e.g. 'gzip, zstd'
+        self.max_body_bytes = max_body_bytes
+        self.sessions_enabled = sessions
+        self.deltas_enabled = deltas
+        self.unchanged_enabled = unchanged
+        self.unsupported_media = unsupported_media
+        self.unavailable = False  # answer every request with 503
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.collections = {}
+        self.encodings = []  # Content-Encoding of every request, None when plain
+        self.sessions = {}
+        self._replies = {}  # Idempotency-Key -> (status, reply)
+        self._session_keys = {}  # Idempotency-Key -> session id
+        self.stats = {'requests': 0, 'dropped': 0, 'bytes_received': 0, 'replayed': 0,
+                      'parts_applied': 0, 'commits': 0, 'full': 0, 'deltas': 0, 'unchanged': 0,
+                      'base_rejected': 0}
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/api"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _ApiHandler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def forget(self, user_id):
+        """Lose a user's collection, like a server restored from an older backup"""
+        with self.lock:
+            self.collections.pop(user_id, None)
+            self._replies.clear()
+            self._session_keys.clear()
+
+    def handle(self, path, body, key):
+        """(status, reply) for a request; called with self.lock held"""
+        if key is not None and key in self._replies:
+            self.stats['replayed'] += 1
+            return self._replies[key]
+        segments = path.split('?')[0].rstrip('/').split('/')
+        if segments[2:] == ['auth', 'desktop-verify']:
+            return self._verify(body)
+        if segments[3:] == ['session'] and self.sessions_enabled:
+            return self._open_session(body, key)
+        reply = self._route(segments, body)
+        if key is not None and reply[0] < 500:
+            self._replies[key] = reply
+        return reply
+
+    def _verify(self, body):
+        # Any code is good; each one becomes its own user
+        code = (body or {}).get('code')
+        if not code:
+            return 400, {'error': 'Missing code'}
+        return 200, {'auth_token': f"fake-token-{code}", 'user_id': f"user-{code}", 'expires_in': 86400}
+
+    def _open_session(self, manifest, key):
+        # Same key, same session: report what already arrived so the client resumes
+        session_id = self._session_keys.get(key) if key else None
+        if session_id is None:
+            session_id = f"s{len(self.sessions) + 1}"
+            self.sessions[session_id] = {'manifest': manifest, 'parts': {}}
+            if key:
+                self._session_keys[key] = session_id
+        else:
+            self.stats['replayed'] += 1
+        return 201, {'session_id': session_id, 'received': sorted(self.sessions[session_id]['parts'])}
+
+    def _route(self, segments, body):
+        # ['', 'api', 'upload-data', ...]
+        rest = segments[3:]
+        if not rest:
+            self.collections[body.get('user_id')] = body
+            self.stats['full'] += 1
+            return 200, {'ok': True}
+        if rest == ['delta'] and self.deltas_enabled:
+            return self._apply_delta(body)
+        if rest == ['unchanged'] and self.unchanged_enabled:
+            return self._unchanged(body)
+        if rest[0] != 'session' or not self.sessions_enabled:
+            return 404, {'error': 'Not found'}
+        session = self.sessions.get(rest[1])
+        if session is None:
+            return 404, {'error': 'Unknown upload session'}
+        if rest[2:] == ['parts']:
+            session['parts'][body['id']] = body
+            self.stats['parts_applied'] += 1
+            return 201, {'ok': True}
+        if rest[2:] == ['commit']:
+            missing = [pid for pid in body['parts'] if pid not in session['parts']]
+            if missing:
+                return 409, {'missing': missing}
+            manifest = session['manifest']
+            collection = dict(manifest['header'])
+            for section, count in manifest['sections'].items():
+                items = []
+                for pid in body['parts']:
+                    part = session['parts'][pid]
+                    if part['section'] == section:
+                        if part['start'] != len(items):
+                            return 400, {'error': f'Gap or overlap in {section} at {part["start"]}'}
+                        items.extend(part['items'])
+                if len(items) != count:
+                    return 400, {'error': f'{section}: expected {count} records, got {len(items)}'}
+                collection[section] = items
+            self.collections[manifest['user_id']] = collection
+            self.stats['commits'] += 1
+            self.stats['full'] += 1
+            return 200, {'ok': True}
+        return 404, {'error': 'Not found'}
+
+    def _stored_base(self, body, base_field):
+        stored = self.collections.get(body.get('user_id'))
+        if stored is None or not stored.get('version') or stored['version'] != body.get(base_field):
+            self.stats['base_rejected'] += 1
+            return None
+        return stored
+
+    def _unchanged(self, body):
+        if self._stored_base(body, 'version') is None:
+            return 409, {'error': 'Unknown version'}
+        self.stats['unchanged'] += 1
+        return 200, {'ok': True}
+
+    def _apply_delta(self, delta):
+        stored = self._stored_base(delta, 'base_version')
+        if stored is None:
+            return 409, {'error': 'Unknown base version'}
+        collection = {k: v for k, v in delta.items() if k not in _DELTA_FIELDS}
+        for section, key, replaced, removed in _DELTA_SECTIONS:
+            records = {key(r): r for r in stored.get(section) or []}
+            for name in delta.get(removed) or []:
+                records.pop(str(name), None)
+            for field in replaced:
+                for record in delta.get(field) or []:
+                    records[key(record)] = record
+            collection[section] = list(records.values())
+        self.collections[delta.get('user_id')] = collection
+        self.stats['deltas'] += 1
+        return 200, {'ok': True}
@@ -0,0 +1,263 @@
+"""Local stand-ins for the League client, for benchmarks and manual testing
+
+FakeLcuApi serves the REST endpoints a sync reads (summoner, Riot ID, skins,
+loot, friends) over HTTPS with a self-signed certificate, like the real
+client. FakeLcuEventServer speaks just enough WebSocket + WAMP 1.0 to
+accept subscriptions and publish OnJsonApiEvent messages to them.
+"""
+
+import base64
+import json
+import os
+import socket
+import socketserver
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lcu_events import (OP_CLOSE, OP_PING, OP_PONG, OP_TEXT, WAMP_EVENT,  # noqa: E402
+                        WAMP_SUBSCRIBE, WAMP_UNSUBSCRIBE, accept_key,
+                        decode_frame, encode_frame)
+
+
+def topic_for_uri(uri):
+    """Narrow topic name the client publishes a REST path under"""
+    return 'OnJsonApiEvent_' + uri.strip('/').replace('/', '_')
+
+
+class _EventHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        server = self.server.owner
+        sock = self.request
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            data += chunk
+        head, _, rest = data.partition(b'\r\n\r\n')
+        headers = {}
+        for line in head.decode('latin-1').split('\r\n')[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        expected = 'Basic ' + base64.b64encode(f'riot:{server.token}'.encode()).decode()
+        if server.token and headers.get('authorization') != expected:
+            sock.sendall(b'HTTP/1.1 401 Unauthorized\r\nContent-Length: 0\r\n\r\n')
+            return
+        sock.sendall((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\nConnection: Upgrade\r\n'
+            f"Sec-WebSocket-Accept: {accept_key(headers.get('sec-websocket-key', ''))}\r\n"
+            'Sec-WebSocket-Protocol: wamp\r\n\r\n').encode('ascii'))
+
+        client = {'sock': sock, 'topics': set(), 'lock': threading.Lock()}
+        with server.lock:
+            server.clients.append(client)
+        buffer = bytearray(rest)
+        try:
+            while True:
+                frame = decode_frame(buffer)
+                if frame is None:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    continue
+                _, opcode, payload = frame
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_PING:
+                    with client['lock']:
+                        sock.sendall(encode_frame(OP_PONG, payload, mask=False))
+                elif opcode == OP_TEXT:
+                    message = json.loads(payload.decode('utf-8'))
+                    if message[0] == WAMP_SUBSCRIBE:
+                        client['topics'].add(message[1])
+                    elif message[0] == WAMP_UNSUBSCRIBE:
+                        client['topics'].discard(message[1])
+        except (OSError, ValueError):
+            pass
+        finally:
+            with server.lock:
+                server.clients.remove(client)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        if self.ssl_context:
+            sock = self.ssl_context.wrap_socket(sock, server_side=True)
+        return sock, addr
+
+
+class FakeLcuEventServer:
+    """WAMP event publisher on 127.0.0.1 (plain ws, or wss with a cert/key pair)"""
+
+    def __init__(self, token='test-token', certfile=None, keyfile=None):
+        self.token = token
+        self.clients = []
+        self.lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), _EventHandler)
+        self._server.owner = self
+        self._server.ssl_context = None
+        if certfile:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile, keyfile)
+            self._server.ssl_context = context
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.disconnect()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def disconnect(self):
+        """Drop every client connection but keep accepting new ones"""
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client['sock'].shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return len(clients)
+
+    def wait_subscribed(self, topics=1, timeout=5.0):
+        """Block until some client has subscribed to at least `topics` topics"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.lock:
+                if any(len(c['topics']) >= topics for c in self.clients):
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def publish(self, uri, data=None, event_type='Update'):
+        """Send an OnJsonApiEvent for `uri` to every matching subscriber"""
+        event = {'data': data, 'eventType': event_type, 'uri': uri}
+        narrow = topic_for_uri(uri)
+        with self.lock:
+            clients = list(self.clients)
+        sent = 0
+        for client in clients:
+            for topic in client['topics']:
+                if topic == 'OnJsonApiEvent' or narrow.startswith(topic):
+                    frame = encode_frame(OP_TEXT, json.dumps([WAMP_EVENT, topic, event]).encode(),
+                                         mask=False)
+                    try:
+                        with client['lock']:
+                            client['sock'].sendall(frame)
+                        sent += 1
+                    except OSError:
+                        pass
+                    break
+        return sent
+
+
+def make_self_signed_cert(directory, common_name='127.0.0.1'):
+    """(certfile, keyfile) of a fresh self-signed certificate (needs the openssl CLI)"""
+    certfile = os.path.join(directory, 'lcu-cert.pem')
+    keyfile = os.path.join(directory, 'lcu-key.pem')
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                        '-subj', f'/CN={common_name}', '-keyout', keyfile, '-out', certfile],
+                       check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise RuntimeError(f"Could not create a self-signed certificate with openssl: {e}")
+    return certfile, keyfile
+
+
+class _RestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        lcu = self.server.owner
+        expected = 'Basic ' + base64.b64encode(f'riot:{lcu.token}'.encode()).decode()
+        if self.headers.get('Authorization') != expected:
+            status, body = 401, b'{"message":"Unauthorized"}'
+        else:
+            body = lcu.routes.get(self.path.split('?')[0])
+            status = 200 if body is not None else 404
+            if body is None:
+                body = b'{"message":"Not found"}'
+        if lcu.latency:
+            time.sleep(lcu.latency)
+        with lcu.lock:
+            lcu.stats['requests'] += 1
+            lcu.stats['bytes_sent'] += len(body)
+            path = self.path.split('?')[0]
+            lcu.hits[path] = lcu.hits.get(path, 0) + 1
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeLcuApi:
+    """HTTPS League client REST API on 127.0.0.1 for one logged-in account
+
+    Responses are encoded once up front, so serving them costs the
+    benchmark as little as possible. `latency` seconds are added to each
+    response.
+    """
+
+    def __init__(self, skins, loot, friends, certfile, keyfile, token='test-token',
+                 game_name='Bench', tag_line='EUW', summoner_id=123456789, latency=0.0):
+        self.token = token
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'bytes_sent': 0}
+        self.hits = {}  # path -> requests
+        riot_id = {'gameName': game_name, 'tagLine': tag_line}
+        routes = {
+            '/lol-summoner/v1/current-summoner': {'summonerId': summoner_id, 'displayName': game_name,
+                                                  'profileIconId': 29, 'summonerLevel': 321},
+            '/lol-summoner/v1/current-summoner/riot-id': riot_id,
+            '/lol-chat/v1/me': dict(riot_id, gameTag=tag_line, platformId='EUW1'),
+            f'/lol-champions/v1/inventories/{summoner_id}/skins-minimal': skins,
+            '/lol-loot/v1/player-loot': loot,
+            '/lol-chat/v1/friends': friends,
+        }
+        self.routes = {path: json.dumps(data).encode('utf-8') for path, data in routes.items()}
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _RestHandler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self.port = self._server.server_address[1]
+
+    @property
+    def cmdline(self):
+        """LeagueClientUx command line pointing at this server, for FakeProcessTable"""
+        return (f'"C:\\Riot Games\\League of Legends\\LeagueClientUx.exe" '
+                f'--app-port={self.port} --remoting-auth-token={self.token}')
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
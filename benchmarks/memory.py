@@ -0,0 +1,26 @@
+"""tracemalloc helpers shared by bench_stream_memory.py and the tests"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import compress_stream, iter_json  # noqa: E402
+
+
+def traced_peak(fn):
+    """(fn(), peak bytes Python allocated while it ran)"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def streamed_size(payload, encoding=None):
+    """Bytes of the streamed upload body, drained chunk by chunk like the HTTP adapter does"""
+    return sum(len(chunk) for chunk in compress_stream(iter_json(payload), encoding))
@@ -0,0 +1,154 @@
+"""Synthetic League client data for benchmarks
+
+Records mirror the shape of skins-minimal, player-loot and chat/friends
+responses closely enough that size and compression numbers are realistic.
+"""
+
+import random
+
+
+def make_skins(count, seed=1):
+    """skins-minimal style records, roughly a third owned, some with chromas"""
+    rng = random.Random(seed)
+    skins = []
+    for i in range(count):
+        champion_id = 1 + i // 12
+        skin_id = champion_id * 1000 + i % 12
+        owned = rng.random() < 0.35
+        chromas = []
+        for c in range(rng.choice((0, 0, 0, 4, 7))):
+            chroma_id = skin_id * 100 + c
+            chromas.append({
+                "championId": champion_id,
+                "chromaPath": f"/lol-game-data/assets/v1/champion-chroma-images/{champion_id}/{chroma_id}.png",
+                "colors": ["#B3B3B3", "#1D1D1D"],
+                "disabled": False,
+                "id": chroma_id,
+                "lastSelected": False,
+                "name": f"Skin {skin_id} Chroma {c}",
+                "ownership": {"loyaltyReward": False, "owned": owned and rng.random() < 0.3,
+                              "rental": {"endDate": 0, "purchaseDate": 0, "rented": False,
+                                         "winCountRemaining": 0},
+                              "xboxGPReward": False},
+                "stillObtainable": True,
+            })
+        skins.append({
+            "championId": champion_id,
+            "chromaPath": None,
+            "chromas": chromas,
+            "disabled": False,
+            "emblems": [],
+            "featuresText": None,
+            "id": skin_id,
+            "isBase": i % 12 == 0,
+            "lastSelected": False,
+            "name": f"Synthetic Skin {skin_id}",
+            "ownership": {"loyaltyReward": False, "owned": owned,
+                          "rental": {"endDate": 0, "purchaseDate": 1600000000000 + i, "rented": False,
+                                     "winCountRemaining": 0},
+                          "xboxGPReward": False},
+            "rarityGemPath": "",
+            "splashPath": f"/lol-game-data/assets/v1/champion-splashes/{champion_id}/{skin_id}.jpg",
+            "stillObtainable": rng.random() < 0.9,
+            "tilePath": f"/lol-game-data/assets/v1/champion-tiles/{champion_id}/{skin_id}.jpg",
+            "uncenteredSplashPath": f"/lol-game-data/assets/v1/champion-splashes/uncentered/{champion_id}/{skin_id}.jpg",
+        })
+    return skins
+
+
+LOOT_KINDS = [
+    ("CHAMPION_SKIN_RENTAL", "SKIN_RENTAL", "CHAMPION_SKIN"),
+    ("CHAMPION_SKIN", "SKIN", "CHAMPION_SKIN"),
+    ("CHAMPION_RENTAL", "CHAMPION_RENTAL", "CHAMPION"),
+    ("WARD_SKIN_RENTAL", "WARD_SKIN_RENTAL", "WARDSKIN"),
+    ("EMOTE", "EMOTE", "EMOTE"),
+    ("SUMMONER_ICON", "SUMMONERICON", "SUMMONERICON"),
+    ("CHEST", "CHEST", "CHEST"),
+    ("MATERIAL", "MATERIAL", "MATERIAL"),
+]
+
+
+def make_loot(count, seed=2):
+    """player-loot style records spread across skin and non-skin categories"""
+    rng = random.Random(seed)
+    loot = []
+    for i in range(count):
+        prefix, loot_type, category = LOOT_KINDS[i % len(LOOT_KINDS)]
+        ref_id = 1000 + i
+        loot.append({
+            "asset": "",
+            "count": rng.choice((1, 1, 1, 2, 3)),
+            "disenchantLootName": "CURRENCY_cosmetic",
+            "disenchantRecipeName": f"{loot_type}_disenchant",
+            "disenchantValue": rng.choice((78, 150, 270, 405)),
+            "displayCategories": category,
+            "expiryTime": -1,
+            "isNew": False,
+            "isRental": "RENTAL" in prefix,
+            "itemDesc": f"Synthetic {category.lower()} {ref_id}",
+            "itemStatus": "OWNED" if rng.random() < 0.3 else "NONE",
+            "localizedDescription": "",
+            "localizedName": "",
+            "localizedRecipeSubtitle": "",
+            "localizedRecipeTitle": "",
+            "lootId": f"{prefix}_{ref_id}",
+            "lootName": f"{prefix}_{ref_id}",
+            "parentItemStatus": "NONE",
+            "parentStoreItemId": -1,
+            "rarity": rng.choice(("DEFAULT", "EPIC", "LEGENDARY")),
+            "redeemableStatus": "ALREADY_OWNED" if rng.random() < 0.2 else "REDEEMABLE",
+            "refId": str(ref_id),
+            "rentalGames": 0,
+            "rentalSeconds": 0,
+            "shadowPath": "",
+            "splashPath": f"/lol-game-data/assets/v1/champion-splashes/{ref_id // 1000}/{ref_id}.jpg",
+            "storeItemId": ref_id,
+            "tags": "",
+            "tilePath": f"/lol-game-data/assets/v1/champion-tiles/{ref_id // 1000}/{ref_id}.jpg",
+            "type": loot_type,
+            "upgradeEssenceName": "CURRENCY_cosmetic",
+            "upgradeEssenceValue": rng.choice((450, 900, 1350)),
+            "upgradeLootName": f"{prefix.replace('_RENTAL', '')}_{ref_id}",
+            "value": rng.choice((390, 750, 1350)),
+        })
+    return loot
+
+
+def make_friends(count, seed=3):
+    """chat/friends style records"""
+    rng = random.Random(seed)
+    friends = []
+    for i in range(count):
+        friends.append({
+            "availability": rng.choice(("online", "offline", "away", "dnd")),
+            "gameName": f"Friend{i}",
+            "gameTag": "EUW",
+            "icon": rng.randint(1, 5000),
+            "id": f"0000000{i}-0000-0000-0000-000000000000@eu1.pvp.net",
+            "lastSeenOnlineTimestamp": None,
+            "lol": {"gameStatus": "outOfGame", "level": str(rng.randint(30, 500))},
+            "name": f"Friend{i}",
+            "pid": f"0000000{i}-0000-0000-0000-000000000000@eu1.pvp.net",
+            "platformId": "EUW1",
+            "product": "league_of_legends",
+            "puuid": f"0000000{i}-0000-0000-0000-000000000000",
+            "statusMessage": "",
+            "summonerId": 100000 + i,
+            "time": 0,
+        })
+    return friends
+
+
+def make_payload(skins=2000, loot=1500, friends=150):
+    """A full upload payload as SkinSyncEngine builds it"""
+    return {
+        "user_id": "00000000-0000-0000-0000-000000000000",
+        "summoner_name": "Bench",
+        "summoner_tag": "EUW",
+        "icon": 1,
+        "region": "EUW1",
+        "summoner_id": 123456789,
+        "skins": make_skins(skins),
+        "loot": make_loot(loot),
+        "friends": make_friends(friends),
+    }
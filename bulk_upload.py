@@ -0,0 +1,361 @@
+"""Bulk upload of saved snapshot sets for Skinergy Desktop Uploader (--bulk)
+
+A snapshot set is a folder with the files --export-json writes:
+skins.json and account.json (required), skinsLoot.json and friends.json.
+--bulk DIR walks DIR for such folders, validates them and uploads them
+with a bounded pool of workers, each account with its own token from the
+AccountTokenStore (see --link).
+
+Only the newest set of each account is uploaded; the site keeps the
+current collection, so older sets of the same account are reported as
+superseded. Every finished set is appended to a checkpoint file as it
+completes, so an interrupted run picks up where it stopped. The checkpoint
+also remembers the newest upload of each account, so a later run never
+rolls an account back to an older set.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import projections
+from account_store import AccountTokenStore, account_key
+from batch_sync import account_dir
+from security_config import RateLimiter, SecurityConfig
+from sync_engine import STATUS_AUTH_EXPIRED, STATUS_NOT_AUTHORIZED, SkinSyncEngine, SyncResult
+
+BULK_CHECKPOINT_FILE = 'bulk_checkpoint.jsonl'
+SET_FILES = ('skins.json', 'account.json', 'skinsLoot.json', 'friends.json')
+ACCOUNT_FIELDS = ('summoner_id', 'summoner_name', 'summoner_tag')
+
+# Outcomes that aren't SyncResult statuses
+STATUS_INVALID = 'invalid'
+STATUS_SUPERSEDED = 'superseded'
+STATUS_INTERRUPTED = 'interrupted'
+
+
+class SnapshotSetError(ValueError):
+    """A snapshot set that can't be uploaded as it is"""
+
+
+def _read_json(folder: str, filename: str, required: bool = True):
+    path = os.path.join(folder, filename)
+    if not os.path.exists(path):
+        if required:
+            raise SnapshotSetError(f"missing {filename}")
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise SnapshotSetError(f"unreadable {filename}: {e}")
+
+
+def find_snapshot_sets(root: str) -> List[str]:
+    """Every folder under root (root included) that has a skins.json"""
+    found = []
+    for folder, dirs, files in os.walk(root):
+        dirs.sort()
+        if 'skins.json' in files:
+            found.append(os.path.abspath(folder))
+    return found
+
+
+def set_fingerprint(folder: str) -> str:
+    """Changes whenever one of the set's files does, so re-exported sets upload again"""
+    parts = []
+    for filename in SET_FILES:
+        try:
+            st = os.stat(os.path.join(folder, filename))
+            parts.append(f"{filename}:{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            pass
+    return f"{folder}|{'|'.join(parts)}"
+
+
+def read_set_account(folder: str) -> Dict:
+    """account.json of a set, checked, with fetched_at filled in"""
+    account = _read_json(folder, 'account.json')
+    if not isinstance(account, dict):
+        raise SnapshotSetError("account.json is not an object")
+    missing = [field for field in ACCOUNT_FIELDS if account.get(field) in (None, '')]
+    if missing:
+        raise SnapshotSetError(f"account.json has no {', '.join(missing)}")
+    if not isinstance(account.get('fetched_at'), (int, float)):
+        # Hand-made account.json: skins.json is saved right after it
+        account['fetched_at'] = os.path.getmtime(os.path.join(folder, 'skins.json'))
+    return account
+
+
+def load_set_collection(folder: str):
+    """(skins, loot, friends) of a set as the client returned them, checked"""
+    skins = _read_json(folder, 'skins.json')
+    if not isinstance(skins, list) or not all(isinstance(s, dict) and 'id' in s for s in skins):
+        raise SnapshotSetError("skins.json is not a list of skins-minimal records")
+    loot = _read_json(folder, 'skinsLoot.json', required=False)
+    if loot is None:
+        loot = []
+    elif not isinstance(loot, list):
+        raise SnapshotSetError("skinsLoot.json is not a list")
+    friends = _read_json(folder, 'friends.json', required=False)
+    if friends is None:
+        friends = []
+    elif not isinstance(friends, list):
+        raise SnapshotSetError("friends.json is not a list")
+    return skins, loot, friends
+
+
+class Checkpoint:
+    """Append-only log of finished sets; one JSON object per line
+
+    A line is fsynced before the next set starts, so at worst the set that
+    was uploading when the process died is uploaded again (a no-op upload
+    for the server, the collection version hasn't changed).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = set()
+        self.uploaded: Dict[str, float] = {}  # account key -> fetched_at of its newest upload
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.done.add(entry['fingerprint'])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # torn last line of an interrupted run
+                    if entry.get('status') != STATUS_SUPERSEDED:
+                        self._note_upload(entry.get('account'), entry.get('fetched_at'))
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self.done
+
+    def _note_upload(self, key: Optional[str], fetched_at) -> None:
+        if key and isinstance(fetched_at, (int, float)) and fetched_at > self.uploaded.get(key, float('-inf')):
+            self.uploaded[key] = fetched_at
+
+    def record(self, fingerprint: str, folder: str, status: str,
+               key: Optional[str] = None, fetched_at: Optional[float] = None):
+        line = json.dumps({'fingerprint': fingerprint, 'set': folder, 'status': status,
+                           'account': key, 'fetched_at': fetched_at, 'time': time.time()},
+                          ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.done.add(fingerprint)
+            if status != STATUS_SUPERSEDED:
+                self._note_upload(key, fetched_at)
+
+
+class SetResult:
+    """Outcome of one snapshot set"""
+
+    def __init__(self, folder: str, status: str, message: str = '', riot_id: Optional[str] = None,
+                 bytes_sent: int = 0, exit_code: int = 0):
+        self.folder = folder
+        self.status = status
+        self.message = message
+        self.riot_id = riot_id
+        self.bytes_sent = bytes_sent  # request bodies as sent (delta, ping or full, compressed)
+        self.exit_code = exit_code
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    def __repr__(self):
+        return f"SetResult(folder={self.folder!r}, status={self.status!r})"
+
+
+class BulkUploader:
+    """Validate and upload a directory of snapshot sets with `workers` threads
+
+    Sets already in the checkpoint (same files) are skipped, and so are
+    sets older than an account's newest checkpointed upload; sets that
+    failed are not checkpointed, so running again retries just those.
+    """
+
+    def __init__(self, data_dir: str, checkpoint_path: Optional[str] = None,
+                 store: Optional[AccountTokenStore] = None,
+                 log: Optional[Callable[[str], None]] = None,
+                 workers: Optional[int] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.data_dir = data_dir
+        self.checkpoint = Checkpoint(checkpoint_path or os.path.join(data_dir, BULK_CHECKPOINT_FILE))
+        self.store = store if store is not None else AccountTokenStore(data_dir)
+        self.log = log or logging.info
+        self.workers = max(1, workers or SecurityConfig.BATCH_WORKERS)
+        self.rate_limiter = rate_limiter
+        self._stop = threading.Event()
+        self.results: List[SetResult] = []
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    def stop(self):
+        """Let the uploads in flight finish and start no new ones"""
+        self._stop.set()
+
+    def run(self, root: str) -> List[SetResult]:
+        start = time.perf_counter()
+        folders = find_snapshot_sets(root)
+        self.log(f"Found {len(folders)} snapshot set(s) in {root}")
+
+        # Newest set per account; everything else is decided without uploading
+        newest: Dict[str, tuple] = {}
+        for folder in folders:
+            fingerprint = set_fingerprint(folder)
+            if fingerprint in self.checkpoint:
+                self.skipped += 1
+                continue
+            try:
+                account = read_set_account(folder)
+            except SnapshotSetError as e:
+                self._finish(fingerprint, SetResult(folder, STATUS_INVALID, str(e), exit_code=1))
+                continue
+            key = account_key(str(account['summoner_name']), str(account['summoner_tag']))
+            uploaded_at = self.checkpoint.uploaded.get(key)
+            if uploaded_at is not None and account['fetched_at'] < uploaded_at:
+                self._finish(fingerprint, SetResult(folder, STATUS_SUPERSEDED,
+                                                    "older than the set already uploaded", key),
+                             key, account['fetched_at'])
+                continue
+            current = (folder, fingerprint, account)
+            previous = newest.get(key)
+            if previous is None:
+                newest[key] = current
+                continue
+            if account['fetched_at'] > previous[2]['fetched_at']:
+                newest[key], older = current, previous
+            else:
+                older = current
+            self._finish(older[1], SetResult(older[0], STATUS_SUPERSEDED,
+                                             f"newer set in {newest[key][0]}", key),
+                         key, older[2]['fetched_at'])
+        if self.skipped:
+            self.log(f"Skipping {self.skipped} set(s) already uploaded (checkpoint)")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk") as pool:
+            try:
+                for _ in pool.map(lambda item: self._upload_set(*item), newest.items()):
+                    pass
+            except KeyboardInterrupt:
+                self.log("Stopping after the uploads in progress (the checkpoint keeps what's done)")
+                self.stop()
+        self.elapsed = time.perf_counter() - start
+        return self.results
+
+    def _finish(self, fingerprint: str, result: SetResult,
+                key: Optional[str] = None, fetched_at: Optional[float] = None):
+        self.results.append(result)
+        # Failures stay out of the checkpoint so the next run retries them
+        if result.ok or result.status == STATUS_SUPERSEDED:
+            self.checkpoint.record(fingerprint, result.folder, result.status, key, fetched_at)
+        if result.status == STATUS_INVALID:
+            self.log(f"✗ {result.folder}: {result.message}")
+
+    def _upload_set(self, key: str, item) -> None:
+        folder, fingerprint, account = item
+        riot_id = f"{account['summoner_name']}#{account['summoner_tag']}"
+        if self._stop.is_set():
+            self.results.append(SetResult(folder, STATUS_INTERRUPTED, "not started", riot_id, exit_code=1))
+            return
+
+        def _log(message):
+            self.log(f"[{riot_id}] {message}")
+
+        try:
+            skins, loot, friends = load_set_collection(folder)
+        except SnapshotSetError as e:
+            self._finish(fingerprint, SetResult(folder, STATUS_INVALID, str(e), riot_id, exit_code=1))
+            return
+
+        auth_token, user_id = self.store.get(key)
+        if not auth_token or not user_id:
+            result = SyncResult(STATUS_NOT_AUTHORIZED,
+                                f"No Skinergy token linked to {riot_id} - run with --link \"{riot_id}\" --code CODE")
+            _log(f"✗ {result.message}")
+            self._finish(fingerprint, SetResult(folder, result.status, result.message, riot_id,
+                                                exit_code=result.exit_code))
+            return
+
+        # Same trimming as a live sync (the exported files are the raw client responses)
+        if SecurityConfig.SKIN_PROJECTION:
+            skins = projections.project_skins(skins, projections.load_skin_schema(self.data_dir))
+        if SecurityConfig.LOOT_FILTER:
+            loot = projections.filter_loot(loot, projections.load_loot_filter(self.data_dir))
+        payload = {
+            "user_id": user_id,
+            "summoner_name": account["summoner_name"],
+            "summoner_tag": account["summoner_tag"],
+            "icon": account.get("icon", 0),
+            "region": account.get("region", "UNKNOWN"),
+            "summoner_id": account["summoner_id"],
+            "skins": skins,
+            "loot": loot,
+            "friends": friends
+        }
+        if not self._wait_for_rate_limit(_log):
+            self.results.append(SetResult(folder, STATUS_INTERRUPTED, "not started", riot_id, exit_code=1))
+            return
+
+        # A failed set is retried by the next run, not queued
+        engine = SkinSyncEngine(data_dir=account_dir(self.data_dir, key), log=_log,
+                                progress=lambda text, step=None, stage=None: None, process_table=None,
+                                offline_spool=False)
+        try:
+            result = engine.upload_collection(payload, auth_token, fetched_at=account['fetched_at'])
+        finally:
+            engine.sessions.close()
+
+        if result.status == STATUS_AUTH_EXPIRED:
+            self.store.remove(key)
+        _log(("✓ " if result.ok else "✗ ") + result.message)
+        self._finish(fingerprint, SetResult(folder, result.status, result.message, riot_id,
+                                            engine.bytes_uploaded, result.exit_code),
+                     key, account['fetched_at'])
+
+    def _wait_for_rate_limit(self, log) -> bool:
+        """Wait for an upload_data token; False if stopped meanwhile"""
+        if self.rate_limiter is None:
+            return True
+        while not self.rate_limiter.can_make_request():
+            wait = max(1, self.rate_limiter.time_until_next_request())
+            log(f"Upload rate limit reached, waiting {wait}s")
+            if self._stop.wait(wait):
+                return False
+        return True
+
+    def summary(self) -> List[str]:
+        """Throughput and error summary lines for the console"""
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        uploaded = [r for r in self.results if r.ok and r.status != STATUS_SUPERSEDED]
+        sent = sum(r.bytes_sent for r in uploaded)
+        elapsed = max(self.elapsed, 1e-6)
+        outcomes = [f"{count} {status}" for status, count in sorted(counts.items())]
+        if self.skipped:
+            outcomes.append(f"{self.skipped} already uploaded")
+        lines = [
+            f"{len(self.results) + self.skipped} set(s)" + (": " + ", ".join(outcomes) if outcomes else ""),
+            f"{len(uploaded)} upload(s) in {self.elapsed:.1f}s: {len(uploaded) / elapsed:.2f} sets/s, "
+            f"{sent / 1e6 / elapsed:.2f} MB/s ({sent / 1e6:.2f} MB sent)",
+        ]
+        errors = [r for r in self.results if not r.ok]
+        if errors:
+            lines.append(f"{len(errors)} error(s):")
+            for result in errors[:20]:
+                lines.append(f"  {result.folder}: {result.status} - {result.message}")
+            if len(errors) > 20:
+                lines.append(f"  ... and {len(errors) - 20} more")
+        return lines
@@ -0,0 +1,62 @@
+"""Resumable upload sessions for Skinergy Desktop Uploader
+
+A full collection that doesn't fit in one request is sent as parts of an
+upload session instead of one all-or-nothing POST:
+
+    POST {upload_data}/session              manifest (header fields, section sizes)
+         -> {"session_id": "...", "received": [part ids the server already has]}
+    POST {upload_data}/session/{id}/parts   {"id", "section", "start", "items"}
+    POST {upload_data}/session/{id}/commit  {"version", "parts": [every part id, in order]}
+         -> 200/201 done, or 409 {"missing": [...]} to resend those parts
+
+Every request carries an Idempotency-Key derived from the user and the
+collection version, so a retry after a dropped response is a no-op on the
+server and a later run resumes the same session. Part ids name the item
+range they hold ("skins:0-511"), so parts split after a 413 get new ids and
+the commit lists exactly the parts to assemble.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Tuple
+
+UPLOAD_SECTIONS = ('skins', 'loot', 'friends')
+
+
+def session_key(payload: Dict) -> str:
+    """Idempotency key of the upload session for this user and collection version"""
+    seed = f"{payload.get('user_id')}:{payload.get('summoner_id')}:{payload.get('version')}"
+    return hashlib.sha256(seed.encode('utf-8')).hexdigest()[:32]
+
+
+def make_part(section: str, start: int, items: List) -> Dict:
+    return {'id': f"{section}:{start}-{start + len(items)}", 'section': section,
+            'start': start, 'items': items}
+
+
+def split_payload(payload: Dict, part_bytes: int) -> Tuple[Dict, List[Dict]]:
+    """(header fields, parts) with each part's items at most ~part_bytes of JSON
+
+    A single record bigger than part_bytes still gets a part of its own.
+    """
+    header = {k: v for k, v in payload.items() if k not in UPLOAD_SECTIONS}
+    parts = []
+    for section in UPLOAD_SECTIONS:
+        items = payload.get(section) or []
+        start, size = 0, 0
+        for i, item in enumerate(items):
+            item_size = len(json.dumps(item, separators=(',', ':')).encode('utf-8')) + 1
+            if i > start and size + item_size > part_bytes:
+                parts.append(make_part(section, start, items[start:i]))
+                start, size = i, 0
+            size += item_size
+        if items:
+            parts.append(make_part(section, start, items[start:]))
+    return header, parts
+
+
+def split_part(part: Dict, max_items: int) -> List[Dict]:
+    """Split a part into parts of at most max_items records"""
+    items = part['items']
+    return [make_part(part['section'], part['start'] + i, items[i:i + max_items])
+            for i in range(0, len(items), max(1, max_items))]
@@ -0,0 +1,347 @@
+"""League client detection for Skinergy Desktop Uploader
+
+Watches the League `lockfile` appear and disappear instead of polling
+tasklist. Directory change notifications come from inotify on Linux (Wine/
+Proton installs) and FindFirstChangeNotification on Windows, with a plain
+stat() polling fallback everywhere else.
+"""
+
+import logging
+import os
+import re
+import select
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from process_table import ProcFsProcessTable
+
+
+def read_lockfile(path: str) -> Optional[Dict]:
+    """Parse a League lockfile (name:pid:port:password:protocol)"""
+    try:
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r') as f:
+            parts = f.read().strip().split(':')
+        if len(parts) >= 4:
+            return {'pid': int(parts[1]) if parts[1].isdigit() else None,
+                    'port': parts[2], 'token': parts[3], 'mtime': mtime, 'path': path}
+    except Exception:
+        pass
+    return None
+
+
+def _is_client(name: str) -> bool:
+    # LeagueClient.exe writes the lockfile; LeagueClientUx runs next to it
+    return name.lower().startswith('leagueclient')
+
+
+def _proc_started_at(pid: int, proc_root: str) -> Optional[float]:
+    """Wall-clock start time of a process from /proc, or None if unknown"""
+    try:
+        with open(os.path.join(proc_root, str(pid), 'stat'), 'rb') as f:
+            # comm (field 2) may contain spaces; starttime is field 22, in clock ticks since boot
+            start_ticks = int(f.read().rsplit(b')', 1)[1].split()[19])
+        with open(os.path.join(proc_root, 'stat'), 'rb') as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith(b'btime '))
+        return boot_time + start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+
+def _proc_pid_alive(pid: int, proc_root: str, written_at: Optional[float]) -> bool:
+    try:
+        with open(os.path.join(proc_root, str(pid), 'cmdline'), 'rb') as f:
+            argv0 = f.read().split(b'\0')[0].decode('utf-8', 'replace')
+        if _is_client(re.split(r'[\\/]', argv0)[-1]):
+            return True
+    except OSError:
+        pass
+    # Under Wine/Proton the lockfile holds a Wine PID, not a host one. Accept a
+    # running Wine client (a Windows .exe), but only one that was already up
+    # when the lockfile was written, so a crashed client's lockfile stays stale
+    for process in ProcFsProcessTable(proc_root).processes():
+        if not (_is_client(process.name) and process.name.lower().endswith('.exe')):
+            continue
+        started_at = _proc_started_at(process.pid, proc_root) if written_at is not None else None
+        if started_at is None or started_at <= written_at + 1:
+            return True
+    return False
+
+
+def pid_alive(pid: Optional[int], proc_root: str = '/proc', written_at: Optional[float] = None) -> bool:
+    """Whether the process that wrote a lockfile is still running
+
+    Checked on Windows and through /proc on Linux, so a lockfile a crashed
+    client left behind doesn't count as a running client. Elsewhere the
+    lockfile is trusted. `written_at` is the lockfile's mtime, which lets a
+    Wine client be matched to the lockfile it wrote.
+    """
+    if not pid:
+        return True
+    if os.name != 'nt':
+        if sys.platform.startswith('linux') and os.path.isdir(proc_root):
+            return _proc_pid_alive(pid, proc_root, written_at)
+        return True
+    try:
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+                return True
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    except Exception:
+        return True
+
+
+class PollingNotifier:
+    """Fallback notifier: never reports changes, just waits out the timeout"""
+
+    def __init__(self, directories: Iterable[str] = ()):
+        self._wake = threading.Event()
+
+    def wait(self, timeout: float) -> bool:
+        """Block for up to `timeout` seconds; True if woken early"""
+        woken = self._wake.wait(timeout)
+        self._wake.clear()
+        return woken
+
+    def wake(self):
+        self._wake.set()
+
+    def close(self):
+        self.wake()
+
+
+class InotifyNotifier(PollingNotifier):
+    """Linux directory watcher using inotify through ctypes"""
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    # | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+    MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self, directories: Iterable[str]):
+        super().__init__()
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watched = 0
+        for directory in directories:
+            if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK) >= 0:
+                watched += 1
+        if not watched:
+            os.close(self._fd)
+            raise OSError("no watchable directories")
+
+    def wait(self, timeout: float) -> bool:
+        # Wake up at least once a second so close()/wake() are noticed
+        deadline = time.monotonic() + timeout
+        while not self._wake.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                readable, _, _ = select.select([self._fd], [], [], min(remaining, 1.0))
+            except (OSError, ValueError):
+                # fd closed by close() from another thread
+                return True
+            if readable:
+                self._drain()
+                return True
+        self._wake.clear()
+        return True
+
+    def _drain(self):
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def close(self):
+        super().close()
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+class WindowsNotifier(PollingNotifier):
+    """Windows directory watcher using FindFirstChangeNotificationW"""
+
+    FILE_NOTIFY_CHANGE_FILE_NAME = 0x1
+    FILE_NOTIFY_CHANGE_LAST_WRITE = 0x10
+    WAIT_TIMEOUT = 0x102
+
+    def __init__(self, directories: Iterable[str]):
+        super().__init__()
+        import ctypes
+        self._ctypes = ctypes
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        self._handles = []
+        for directory in directories:
+            handle = self._kernel32.FindFirstChangeNotificationW(
+                directory, False,
+                self.FILE_NOTIFY_CHANGE_FILE_NAME | self.FILE_NOTIFY_CHANGE_LAST_WRITE)
+            if handle and handle != ctypes.c_void_p(-1).value:
+                self._handles.append(handle)
+        if not self._handles:
+            raise OSError("no watchable directories")
+        self._array = (ctypes.c_void_p * len(self._handles))(*self._handles)
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while not self._wake.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            result = self._kernel32.WaitForMultipleObjects(
+                len(self._handles), self._array, False, int(min(remaining, 1.0) * 1000))
+            if 0 <= result < len(self._handles):
+                self._kernel32.FindNextChangeNotification(self._ctypes.c_void_p(self._array[result]))
+                return True
+            if result != self.WAIT_TIMEOUT:
+                # WAIT_FAILED - behave like the polling fallback
+                self._wake.wait(min(remaining, 1.0))
+        self._wake.clear()
+        return True
+
+    def close(self):
+        super().close()
+        for handle in self._handles:
+            try:
+                self._kernel32.FindCloseChangeNotification(self._ctypes.c_void_p(handle))
+            except Exception:
+                pass
+        self._handles = []
+
+
+def create_notifier(directories: Iterable[str]) -> PollingNotifier:
+    """Best available change notifier for these directories"""
+    directories = [d for d in directories if os.path.isdir(d)]
+    if directories:
+        backend = WindowsNotifier if os.name == 'nt' else InotifyNotifier
+        if os.name == 'nt' or sys.platform.startswith('linux'):
+            try:
+                return backend(directories)
+            except Exception as e:
+                logging.debug(f"{backend.__name__} unavailable, polling instead: {e}")
+    return PollingNotifier(directories)
+
+
+class ClientWatcher:
+    """Reports League client start/stop by watching its lockfile
+
+    `lockfile_paths` is called every cycle so install dirs discovered later
+    get picked up. While the client is up the recheck interval backs off from
+    UP_MIN_INTERVAL to UP_MAX_INTERVAL (a crash can leave a stale lockfile);
+    while it's down we only wake on directory events or DOWN_INTERVAL.
+    `fallback_check` is used when none of the install dirs exist yet.
+    """
+
+    UP_MIN_INTERVAL = 1.0
+    UP_MAX_INTERVAL = 30.0
+    DOWN_INTERVAL = 30.0
+    POLL_INTERVAL = 2.0
+    FALLBACK_INTERVAL = 15.0
+
+    def __init__(self, lockfile_paths: Callable[[], List[str]],
+                 on_change: Callable[[bool], None],
+                 fallback_check: Optional[Callable[[], bool]] = None,
+                 notifier_factory: Callable[[Iterable[str]], PollingNotifier] = create_notifier):
+        self.lockfile_paths = lockfile_paths
+        self.on_change = on_change
+        self.fallback_check = fallback_check
+        self.notifier_factory = notifier_factory
+        self.is_running: Optional[bool] = None
+        self._stop = threading.Event()
+        self._notifier: Optional[PollingNotifier] = None
+        self._watched_dirs: List[str] = []
+        self._thread: Optional[threading.Thread] = None
+        self._last_fallback = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="client-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._notifier:
+            self._notifier.close()
+
+    def check_now(self):
+        """Wake the watcher for an immediate recheck"""
+        if self._notifier:
+            self._notifier.wake()
+
+    def _check(self, paths: List[str]) -> bool:
+        partial = False
+        for path in paths:
+            info = read_lockfile(path)
+            if info and pid_alive(info['pid'], written_at=info['mtime']):
+                return True
+            partial = partial or (info is None and os.path.exists(path))
+        if partial and self.is_running is not None:
+            return self.is_running  # lockfile being (re)written, look again on its next event
+        if self.fallback_check and not self._watched_dirs:
+            now = time.monotonic()
+            if now - self._last_fallback >= self.FALLBACK_INTERVAL or self.is_running is None:
+                self._last_fallback = now
+                return bool(self.fallback_check())
+            return bool(self.is_running)
+        return False
+
+    def _rearm(self, paths: List[str]):
+        """(Re)create the notifier when the set of existing install dirs changes"""
+        dirs = []
+        for path in paths:
+            directory = os.path.dirname(path)
+            if os.path.isdir(directory) and directory not in dirs:
+                dirs.append(directory)
+        if dirs == self._watched_dirs and self._notifier:
+            return
+        if self._notifier:
+            self._notifier.close()
+        self._watched_dirs = dirs
+        self._notifier = self.notifier_factory(dirs)
+
+    def _run(self):
+        interval = self.UP_MIN_INTERVAL
+        while not self._stop.is_set():
+            try:
+                paths = self.lockfile_paths()
+                self._rearm(paths)
+                running = self._check(paths)
+                if running != self.is_running:
+                    self.is_running = running
+                    interval = self.UP_MIN_INTERVAL
+                    self.on_change(running)
+                elif running:
+                    interval = min(interval * 2, self.UP_MAX_INTERVAL)
+            except Exception as e:
+                logging.debug(f"Client watcher error: {e}")
+
+            if self.is_running:
+                timeout = interval
+            elif isinstance(self._notifier, (InotifyNotifier, WindowsNotifier)):
+                timeout = self.DOWN_INTERVAL
+            else:
+                timeout = self.POLL_INTERVAL
+            if self._stop.is_set():
+                break
+            if self._notifier is None:
+                self._notifier = PollingNotifier()
+            self._notifier.wait(timeout)
@@ -3,17 +3,25 @@ import urllib3
 import json
 import tkinter as tk
 # messagebox removed — custom _show_popup used instead to avoid freeze with overrideredirect windows
-import subprocess
-import re
 import threading
-from requests.auth import HTTPBasicAuth
 import os
 import time
 import sys
 import argparse
 import logging
 import tempfile
-from security_config import SecurityConfig, RateLimiter
+from collections import deque
+from account_store import AccountTokenStore, account_key
+from batch_sync import BatchSync
+from bulk_upload import BulkUploader
+from client_watcher import ClientWatcher
+from lcu_events import LcuEventSubscriber
+from log_setup import (APP_LOGGER, CallbackHandler, add_handler, remove_handler, setup_logging,
+                       shutdown_logging)
+from security_config import SecurityConfig, create_rate_limiters
+from sync_daemon import SyncDaemon, lower_priority
+from sync_engine import (SkinSyncEngine, EXIT_CODES, STATUS_AUTH_EXPIRED, STATUS_CONNECTION_ERROR,
+                         STATUS_ERROR, STATUS_NO_CLIENT, STATUS_NOT_AUTHORIZED, STATUS_QUEUED)
 
 def _get_log_path():
     """Find a writable log file path, preferring LocalAppData on Windows"""
@@ -41,7 +49,7 @@ def _get_log_path():
 
 
 def _get_data_dir():
-    """Return a writable directory for user data like skins.json"""
+    """Return a writable directory for user data like last_upload.snap"""
     try:
         data_dir = os.path.dirname(_get_log_path())
         os.makedirs(data_dir, exist_ok=True)
@@ -106,6 +114,14 @@ def _load_auth_token():
     return None, None
 
 
+def _spool_token(user_id):
+    """Saved auth token of the user a queued upload is for (window or --batch account)"""
+    auth_token, saved_user_id = _load_auth_token()
+    if auth_token and str(saved_user_id) == str(user_id):
+        return auth_token
+    return AccountTokenStore(_get_data_dir()).token_for_user(user_id)
+
+
 def _clear_auth_token():
     """Clear saved auth token"""
     try:
@@ -139,6 +155,21 @@ def _load_pending_code():
     return None
 
 
+def _parse_code_arg(code_arg):
+    """Normalize a --code value, including skinergy:// protocol handler URLs"""
+    code = str(code_arg).strip()
+
+    # Parse protocol handler URL (skinergy://code=ABC12345 or skinergy://ABC12345)
+    if 'skinergy://code=' in code:
+        code = code.split('code=')[-1]
+        code = code.rstrip('/').strip('"').strip("'").strip()
+    elif code.startswith('skinergy://'):
+        code = code.replace('skinergy://', '').strip()
+
+    # Only keep alphanumeric
+    return ''.join(c for c in code if c.isalnum()).upper()
+
+
 def _register_protocol_handler():
     """Register skinergy:// protocol handler in Windows registry"""
     if os.name != 'nt':
@@ -176,14 +207,17 @@ def _register_protocol_handler():
 
 
 log_path = _get_log_path()
-logging.basicConfig(level=logging.DEBUG, filename=log_path, filemode='w',
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+setup_logging(log_path)
+app_log = logging.getLogger(APP_LOGGER)
 
 # Disable SSL warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class LeagueSkinFetcher:
-    def __init__(self, code_from_args=None):
+    LOG_BUFFER_LINES = 1000   # kept in memory and shown in the log window
+    LOG_FLUSH_MS = 16         # pending log lines are written to the window once per frame
+
+    def __init__(self, code_from_args=None, export_json=False):
         self.root = tk.Tk()
         
         # Set title BEFORE overrideredirect so taskbar shows the correct name
@@ -258,15 +292,30 @@ class LeagueSkinFetcher:
         self.current_step = 0
         self.status_monitor_running = True
         self.last_status = None
+        self.event_subscriber = None
+        self._sync_pending = False
+        self._rate_limited_retry = None
         self._drag_start_x = 0
         self._drag_start_y = 0
         self._spinner_running = False
         self._spinner_frames = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
         self._spinner_index = 0
         self._spinner_base_text = ""
+        self.log_lines = deque(maxlen=self.LOG_BUFFER_LINES)
+        self.log_window = None
+        self.log_text = None
+        self._pending_log_lines = deque(maxlen=self.LOG_BUFFER_LINES)
+        self._log_flush_scheduled = False
+        self._log_lock = threading.Lock()
+        self._log_handler = CallbackHandler(self._append_log_line)
+        self._log_handler.setFormatter(logging.Formatter('[%(asctime)s] %(message)s', datefmt='%H:%M:%S'))
+        add_handler(self._log_handler)
 
         self.api_endpoints = SecurityConfig.get_api_endpoints()
-        self.rate_limiter = RateLimiter(SecurityConfig.MAX_REQUESTS_PER_MINUTE)
+        self.rate_limiters = create_rate_limiters(_get_data_dir())
+        self.engine = SkinSyncEngine(data_dir=_get_data_dir(), log=self.log_message,
+                                     progress=self._on_engine_progress, export_json=export_json)
+        self.engine.start_spool_drainer(_spool_token)
         
         self._load_logo()
         self._create_and_set_icon()
@@ -285,17 +334,7 @@ class LeagueSkinFetcher:
 
         # Handle code from command line or protocol handler
         if code_from_args:
-            code = str(code_from_args).strip()
-            
-            # Parse protocol handler URL (skinergy://code=ABC12345 or skinergy://ABC12345)
-            if 'skinergy://code=' in code:
-                code = code.split('code=')[-1]
-                code = code.rstrip('/').strip('"').strip("'").strip()
-            elif code.startswith('skinergy://'):
-                code = code.replace('skinergy://', '').strip()
-            
-            # Only keep alphanumeric
-            code = ''.join(c for c in code if c.isalnum()).upper()
+            code = _parse_code_arg(code_from_args)
             
             # Prefill if we have a valid code
             if len(code) == 8:
@@ -670,10 +709,6 @@ class LeagueSkinFetcher:
                                 fg=self.text_muted, bg=self.bg_color)
         version_label.pack(side=tk.LEFT)
 
-        self.log_lines = []
-        self.log_window = None
-        self.log_text = None
-
         # Input handlers
         self.code_entry.bind('<KeyRelease>', self.on_code_change)
         self.code_entry.bind('<Return>', lambda event: self.handle_auth_or_upload())
@@ -779,8 +814,9 @@ class LeagueSkinFetcher:
             self.status_label.config(text=validated_code, fg=self.error_color)
             return
 
-        if not self.rate_limiter.can_make_request():
-            wait_time = self.rate_limiter.time_until_next_request()
+        rate_limiter = self.rate_limiters['auth_verify']
+        if not rate_limiter.can_make_request():
+            wait_time = rate_limiter.time_until_next_request()
             self.status_label.config(text=f"Rate limited. Wait {wait_time}s", fg=self.warning_color)
             return
 
@@ -796,13 +832,7 @@ class LeagueSkinFetcher:
             self.log_message(f"Attempting authorization with code: [REDACTED]")
 
             try:
-                response = requests.post(
-                    self.api_endpoints['auth_verify'],
-                    json={"code": validated_code},
-                    headers={"Content-Type": "application/json"},
-                    timeout=SecurityConfig.REQUEST_TIMEOUT,
-                    verify=SecurityConfig.SSL_VERIFY
-                )
+                response = self.engine.verify_auth_code(validated_code)
                 self.log_message(f"Verification response status: {response.status_code}")
 
                 if response.status_code == 200:
@@ -814,6 +844,7 @@ class LeagueSkinFetcher:
                     if self.auth_token and self.user_id:
                         self.authorized = True
                         _save_auth_token(self.auth_token, self.user_id, expires_in)
+                        self.engine.notify_spool()
                         self.log_message("Device authorization successful!")
 
                         # Update UI and immediately start upload
@@ -934,34 +965,48 @@ class LeagueSkinFetcher:
             self.user_id = None
 
     def log_message(self, message):
-        """Add a sanitized message to the log buffer"""
-        sanitized_message = SecurityConfig.sanitize_log_message(message)
-        timestamp = time.strftime("%H:%M:%S")
-        entry = f"[{timestamp}] {sanitized_message}"
-        try:
+        """Log a message; the log file and the log window get the same sanitized line"""
+        app_log.info(message)
+
+    def _append_log_line(self, entry):
+        """Add a formatted line to the log buffer (runs on the log listener thread)"""
+        # Queue the line and let one scheduled flush per frame write
+        # everything that arrived in the meantime
+        with self._log_lock:
             self.log_lines.append(entry)
-            # Keep only last 1000 lines
-            if len(self.log_lines) > 1000:
-                self.log_lines = self.log_lines[-1000:]
+            self._pending_log_lines.append(entry)
+            if self._log_flush_scheduled:
+                return
+            self._log_flush_scheduled = True
+        try:
+            self.root.after(self.LOG_FLUSH_MS, self._flush_log_lines)
         except Exception:
-            self.log_lines = [entry]
-
-        # Update log window if it's open
-        def update_log_widget():
-            if getattr(self, 'log_text', None):
-                try:
-                    self.log_text.config(state=tk.NORMAL)
-                    self.log_text.insert(tk.END, entry + "\n")
-                    self.log_text.see(tk.END)
-                    self.log_text.config(state=tk.DISABLED)
-                except Exception:
-                    pass
-
+            with self._log_lock:
+                self._log_flush_scheduled = False
+
+    def _flush_log_lines(self):
+        """Write pending log lines to the log window in a single insert"""
+        with self._log_lock:
+            pending = list(self._pending_log_lines)
+            self._pending_log_lines.clear()
+            self._log_flush_scheduled = False
+        if not pending or not getattr(self, 'log_text', None):
+            return
         try:
-            self.root.after(0, update_log_widget)
+            self.log_text.config(state=tk.NORMAL)
+            self.log_text.insert(tk.END, "\n".join(pending) + "\n")
+            self._trim_log_widget()
+            self.log_text.see(tk.END)
+            self.log_text.config(state=tk.DISABLED)
         except Exception:
             pass
 
+    def _trim_log_widget(self):
+        """Drop the oldest lines so the window never holds more than the buffer"""
+        lines = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if lines > self.LOG_BUFFER_LINES:
+            self.log_text.delete('1.0', f"{lines - self.LOG_BUFFER_LINES + 1}.0")
+
     def open_logs(self):
         """Open logs window"""
         if getattr(self, 'log_window', None) and tk.Toplevel.winfo_exists(self.log_window):
@@ -1087,13 +1132,13 @@ class LeagueSkinFetcher:
                             highlightthickness=0)
         copy_btn.pack(fill=tk.X)
 
-        # Populate existing logs
-        for line in getattr(self, 'log_lines', []):
-            try:
-                self.log_text.insert(tk.END, line + "\n")
-            except Exception:
-                pass
+        # Populate existing logs; anything still pending is already in the buffer
+        with self._log_lock:
+            existing = list(self.log_lines)
+            self._pending_log_lines.clear()
         try:
+            if existing:
+                self.log_text.insert(tk.END, "\n".join(existing) + "\n")
             self.log_text.see(tk.END)
             self.log_text.config(state=tk.DISABLED)
         except Exception:
@@ -1133,8 +1178,9 @@ class LeagueSkinFetcher:
             return
         
         # Check rate limiting
-        if not self.rate_limiter.can_make_request():
-            wait_time = self.rate_limiter.time_until_next_request()
+        rate_limiter = self.rate_limiters['auth_verify']
+        if not rate_limiter.can_make_request():
+            wait_time = rate_limiter.time_until_next_request()
             self.status_label.config(text=f"Rate limited. Wait {wait_time}s", fg=self.warning_color)
             self.log_message(f"Rate limited: Please wait {wait_time} seconds")
             return
@@ -1143,13 +1189,7 @@ class LeagueSkinFetcher:
         self.status_label.config(text="Verifying code...", fg=self.text_secondary)
         
         try:
-            response = requests.post(
-                self.api_endpoints['auth_verify'],
-                json={"code": validated_code},
-                headers={"Content-Type": "application/json"},
-                timeout=SecurityConfig.REQUEST_TIMEOUT,
-                verify=SecurityConfig.SSL_VERIFY
-            )
+            response = self.engine.verify_auth_code(validated_code)
             
             self.log_message(f"Verification response status: {response.status_code}")
             
@@ -1162,6 +1202,7 @@ class LeagueSkinFetcher:
                 if self.auth_token and self.user_id:
                     self.authorized = True
                     _save_auth_token(self.auth_token, self.user_id, expires_in)
+                    self.engine.notify_spool()
                     
                     self.progress_container.pack(fill=tk.X, pady=(0, 8), before=self.status_label)
                     self.update_step(0)
@@ -1187,54 +1228,65 @@ class LeagueSkinFetcher:
             self.log_message(f"Authorization error: {str(e)}")
 
     def start_status_monitoring(self):
-        """Start background thread to check League client status"""
-        def monitor():
-            while self.status_monitor_running:
-                try:
-                    is_running = self.is_league_running()
-                    if is_running != self.last_status:
-                        self.last_status = is_running
-                        summoner_name = None
-                        if is_running:
-                            summoner_name = self._get_summoner_name_quick()
-                        self.root.after(0, self.update_status_display, is_running, summoner_name)
-                except Exception:
-                    pass
-                time.sleep(2)
-
-        threading.Thread(target=monitor, daemon=True).start()
+        """Watch the League lockfile and update the client status on changes"""
+        def on_change(is_running):
+            if not self.status_monitor_running:
+                return
+            self.last_status = is_running
+            summoner_name = None
+            if is_running:
+                summoner_name = self._get_summoner_name_quick()
+                if not summoner_name:
+                    # The lockfile shows up a moment before the API answers
+                    time.sleep(2)
+                    summoner_name = self._get_summoner_name_quick()
+            else:
+                self.engine.invalidate_connection()
+            try:
+                self.root.after(0, self.update_status_display, is_running, summoner_name)
+                self.root.after(0, self._update_live_sync, is_running)
+            except Exception:
+                pass
+
+        self.client_watcher = ClientWatcher(self.engine.lockfile_candidates, on_change,
+                                            fallback_check=self.is_league_running)
+        self.client_watcher.start()
+
+    def _update_live_sync(self, is_running):
+        """Follow the client's inventory events while it runs (LIVE_SYNC=1)"""
+        if is_running and SecurityConfig.LIVE_SYNC and self.event_subscriber is None:
+            self.event_subscriber = LcuEventSubscriber(
+                self.engine.get_league_connection_info,
+                lambda uris: self.root.after(0, self._on_inventory_event, uris),
+                debounce=SecurityConfig.LIVE_SYNC_DEBOUNCE)
+            self.event_subscriber.start()
+            self.log_message("Live sync on - new skins and loot upload automatically")
+        elif not is_running and self.event_subscriber is not None:
+            self.event_subscriber.stop()
+            self.event_subscriber = None
+
+    def _on_inventory_event(self, uris):
+        """Client reported an inventory/loot change - run an incremental sync"""
+        if not self.authorized or not self.status_monitor_running:
+            return
+        if self.is_fetching:
+            # Pick the change up once the current sync finishes
+            self._sync_pending = True
+            return
+        self.log_message(f"Collection changed in League client ({len(uris)} updates) - syncing")
+        self.fetch_skins_threaded(auto=True)
+
+    def _retry_rate_limited_sync(self):
+        self._rate_limited_retry = None
+        self._on_inventory_event(set())
 
     def _get_summoner_name_quick(self):
         """Try to get the logged-in summoner name from the League client API."""
-        try:
-            port, token = self.get_league_connection_info()
-            if not port or not token:
-                return None
-            url = f"https://127.0.0.1:{port}/lol-summoner/v1/current-summoner"
-            resp = requests.get(url, auth=HTTPBasicAuth('riot', token),
-                                verify=False, timeout=3)
-            if resp.status_code == 200:
-                data = resp.json()
-                name = data.get('gameName') or data.get('displayName') or ''
-                tag = data.get('tagLine', '')
-                if name and tag:
-                    return f"{name}#{tag}"
-                return name or None
-        except Exception:
-            pass
-        return None
+        return self.engine.get_summoner_name_quick()
 
     def is_league_running(self):
         """Check if League client is currently running"""
-        try:
-            result = subprocess.run(
-                ['tasklist', '/FI', 'IMAGENAME eq LeagueClientUx.exe'],
-                capture_output=True, text=True, timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            return 'LeagueClientUx.exe' in result.stdout
-        except Exception:
-            return False
+        return self.engine.is_league_running()
 
     def update_status_display(self, is_running, summoner_name=None):
         """Update the League client status label"""
@@ -1258,100 +1310,7 @@ class LeagueSkinFetcher:
 
     def get_league_connection_info(self):
         """Get League client connection details"""
-        self.log_message("Attempting to find League client connection info...")
-        
-        methods = [
-            ("WMIC", self.try_wmic),
-            ("PowerShell", self.try_powershell),
-            ("Lockfile", self.try_lockfile)
-        ]
-
-        for method_name, method in methods:
-            try:
-                self.log_message(f"Trying {method_name} method...")
-                port, token = method()
-                if port and token:
-                    self.log_message(f"✓ Found connection via {method_name}: port {port}")
-                    return port, token
-                else:
-                    self.log_message(f"✗ {method_name} method failed")
-            except Exception as e:
-                self.log_message(f"✗ {method_name} method error: {str(e)}")
-                continue
-
-        self.log_message("✗ All methods failed to find League connection")
-        return None, None
-
-    def try_wmic(self):
-        """Try to get info using wmic"""
-        cmd = 'wmic PROCESS WHERE "name=\'LeagueClientUx.exe\'" GET commandline /format:list'
-        result = subprocess.run(cmd, capture_output=True, text=True, shell=True, creationflags=subprocess.CREATE_NO_WINDOW)
-
-        if result.returncode == 0 and result.stdout:
-            port_match = re.search(r'--app-port=(\d+)', result.stdout)
-            token_match = re.search(r'--remoting-auth-token=([\w-]+)', result.stdout)
-
-            if port_match and token_match:
-                return port_match.group(1), token_match.group(1)
-
-        return None, None
-
-    def try_powershell(self):
-        """Try to get info using PowerShell"""
-        ps_cmd = '''
-        $process = Get-Process LeagueClientUx -ErrorAction SilentlyContinue
-        if ($process) {
-            $commandLine = (Get-CimInstance Win32_Process -Filter "ProcessId = $($process.Id)").CommandLine
-            Write-Output $commandLine
-        }
-        '''
-
-        result = subprocess.run(['powershell', '-Command', ps_cmd],
-                              capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-
-        if result.returncode == 0 and result.stdout:
-            port_match = re.search(r'--app-port=(\d+)', result.stdout)
-            token_match = re.search(r'--remoting-auth-token=([\w-]+)', result.stdout)
-
-            if port_match and token_match:
-                return port_match.group(1), token_match.group(1)
-
-        return None, None
-
-    def try_lockfile(self):
-        """Try to read League's lockfile"""
-        possible_paths = [
-            os.path.expandvars(r"%LOCALAPPDATA%\Riot Games\League of Legends\lockfile"),
-            r"C:\Riot Games\League of Legends\lockfile",
-        ]
-
-        try:
-            result = subprocess.run(['wmic', 'process', 'where', 'name="LeagueClientUx.exe"', 'get', 'ExecutablePath'],
-                                  capture_output=True, text=True, shell=True, creationflags=subprocess.CREATE_NO_WINDOW)
-
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if 'League of Legends' in line and '.exe' in line:
-                        league_dir = os.path.dirname(line.strip())
-                        lockfile_path = os.path.join(league_dir, 'lockfile')
-                        possible_paths.insert(0, lockfile_path)
-                        break
-        except Exception:
-            pass
-
-        for path in possible_paths:
-            try:
-                if os.path.exists(path):
-                    with open(path, 'r') as f:
-                        content = f.read().strip()
-                        parts = content.split(':')
-                        if len(parts) >= 4:
-                            return parts[2], parts[3]
-            except Exception:
-                continue
-
-        return None, None
+        return self.engine.get_league_connection_info()
 
     def update_progress(self, text, step=None):
         """Update status text and progress steps (THREAD-SAFE)
@@ -1517,14 +1476,19 @@ class LeagueSkinFetcher:
                               cursor="hand2", bd=0, highlightthickness=0)
         close_btn.pack()
 
-    def fetch_skins_threaded(self):
-        """Start skin fetch in background thread"""
+    def fetch_skins_threaded(self, auto=False):
+        """Start skin fetch in background thread (`auto` = triggered by live sync)"""
         if self.is_fetching or not self.authorized:
             return
 
-        if not self.rate_limiter.can_make_request():
-            wait_time = self.rate_limiter.time_until_next_request()
+        rate_limiter = self.rate_limiters['upload_data']
+        if not rate_limiter.can_make_request():
+            wait_time = rate_limiter.time_until_next_request()
             self.log_message(f"Rate limited: Please wait {wait_time} seconds")
+            if auto and self._rate_limited_retry is None:
+                # Don't drop a live-sync change; sync it once the limiter allows another upload
+                self._rate_limited_retry = self.root.after(int(max(1, wait_time) * 1000),
+                                                           self._retry_rate_limited_sync)
             return
 
         # Disable button and start spinner
@@ -1533,9 +1497,9 @@ class LeagueSkinFetcher:
         self._start_spinner("Uploading")
 
         self.log_message("=== Starting secure skin fetch process ===")
-        threading.Thread(target=self.fetch_skins, daemon=True).start()
+        threading.Thread(target=self.fetch_skins, args=(auto,), daemon=True).start()
 
-    def fetch_skins(self):
+    def fetch_skins(self, auto=False):
         """Fetch skins from League client and upload to server"""
         if not self.authorized:
             self.log_message("✗ Not authorized - please enter authorization code first")
@@ -1555,337 +1519,44 @@ class LeagueSkinFetcher:
             self.root.after(0, _do)
 
         try:
-            # Find League client connection info
-            self._safe_update_spinner_text("Connecting")
-            self.update_progress("Connecting to League client...", step=1)
-
-            port, token = self.get_league_connection_info()
-
-            if not port or not token:
-                _on_error("Could not find League client connection info",
-                         popup_msg="League client not detected.\n\nOpen League and retry.")
-                self.is_fetching = False
-                return
-
-            self.log_message(f"✓ Connected to League client on port {port}")
-
-            # Get summoner account information
-            self._safe_update_spinner_text("Fetching account")
-            self.update_progress("Getting account information...", step=1)
-
-            summoner_url = f"https://127.0.0.1:{port}/lol-summoner/v1/current-summoner"
-            self.log_message(f"Making request to: {summoner_url}")
-            
-            # League client uses self-signed localhost cert, so we skip verification
-            response = requests.get(summoner_url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=10)
-            self.log_message(f"Summoner API response: {response.status_code}")
-
-            if response.status_code != 200:
-                _on_error(f"Failed to get summoner info: {response.status_code}",
-                         popup_msg="Failed to connect to League client.\n\nMake sure League is running and try again.")
-                self.is_fetching = False
-                return
-
-            summoner_data = response.json()
-            summoner_id = summoner_data.get('summonerId')
-            initial_game_name = summoner_data.get('displayName', '').strip() 
-            profile_icon_id = summoner_data.get('profileIconId', 0)
-            
-            self.log_message(f"✓ Base summoner info: '{initial_game_name}' (ID: {summoner_id}, IconID: {profile_icon_id})")
+            result = self.engine.run(self.auth_token, self.user_id)
 
-            # Get Riot ID (game name and tagline)
-            self.update_progress("Fetching Riot ID...")
-            
-            final_game_name = initial_game_name
-            tagline = "N/A"
-            platform_id = "N/A"
-
-            # Try a few different endpoints to get Riot ID
-            chat_me_url = f"https://127.0.0.1:{port}/lol-chat/v1/me"
-            try:
-                chat_me_response = requests.get(chat_me_url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=10)
-                if chat_me_response.status_code == 200:
-                    chat_data = chat_me_response.json()
-                    fetched_game_name_from_chat = chat_data.get('gameName', '').strip()
-                    fetched_tagline_from_chat = chat_data.get('gameTag', '').strip()
-                    fetched_platform_id_from_chat = chat_data.get('platformId', '').strip()
-
-                    if fetched_game_name_from_chat:
-                        final_game_name = fetched_game_name_from_chat
-                    if fetched_tagline_from_chat:
-                        tagline = fetched_tagline_from_chat
-                    if fetched_platform_id_from_chat:
-                        platform_id = fetched_platform_id_from_chat
-            except Exception:
-                pass
-
-            # Try account endpoint as fallback
-            if not final_game_name.strip() or final_game_name == initial_game_name or tagline == "N/A" or platform_id == "N/A":
-                active_account_url = f"https://127.0.0.1:{port}/lol-account/v1/active-account"
-                try:
-                    active_account_response = requests.get(active_account_url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=10)
-                    if active_account_response.status_code == 200:
-                        account_data = active_account_response.json()
-                        fetched_game_name_from_account = account_data.get('gameName', '').strip()
-                        fetched_tagline_from_account = account_data.get('tagLine', '').strip()
-                        fetched_platform_id_from_account = account_data.get('platformId', '').strip()
-
-                        if fetched_game_name_from_account and (not final_game_name.strip() or final_game_name == initial_game_name):
-                            final_game_name = fetched_game_name_from_account
-                        if fetched_tagline_from_account and tagline == "N/A":
-                            tagline = fetched_tagline_from_account
-                        if fetched_platform_id_from_account and platform_id == "N/A":
-                            platform_id = fetched_platform_id_from_account
-                except Exception:
-                    pass
-
-            # Last resort: summoner Riot ID endpoint
-            if not final_game_name.strip() or final_game_name == initial_game_name or tagline == "N/A":
-                riot_id_url = f"https://127.0.0.1:{port}/lol-summoner/v1/current-summoner/riot-id"
-                try:
-                    riot_id_response = requests.get(riot_id_url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=10)
-                    if riot_id_response.status_code == 200:
-                        riot_id_data = riot_id_response.json()
-                        fetched_game_name_from_summoner_riot_id = riot_id_data.get('gameName', '').strip()
-                        fetched_tagline_from_summoner_riot_id = riot_id_data.get('tagLine', '').strip()
-
-                        if fetched_game_name_from_summoner_riot_id and (not final_game_name.strip() or final_game_name == initial_game_name):
-                            final_game_name = fetched_game_name_from_summoner_riot_id
-                        if fetched_tagline_from_summoner_riot_id and tagline == "N/A":
-                            tagline = fetched_tagline_from_summoner_riot_id
-                except Exception:
-                    pass
-
-            # Make sure we have something
-            if not final_game_name.strip() or (final_game_name == initial_game_name and not initial_game_name.strip()):
-                final_game_name = "Player"
-            
-            if not tagline or tagline == "N/A": 
-                tagline = "N/A" 
-            if not platform_id or platform_id == "N/A":
-                platform_id = "UNKNOWN"
-
-            self.log_message(f"✓ Connected as: {final_game_name}#{tagline} (Region: {platform_id})")
-
-            # Fetch skin collection
-            self._safe_update_spinner_text("Fetching skins")
-            self.update_progress("Fetching your skin collection...", step=1)
-
-            url = f"https://127.0.0.1:{port}/lol-champions/v1/inventories/{summoner_id}/skins-minimal"
-            response = requests.get(url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=15)
-            self.log_message(f"Skins API response: {response.status_code}")
-
-            if response.status_code != 200:
-                _on_error(f"Failed to fetch skins: {response.status_code}",
-                         popup_msg="Failed to fetch skins from League client.\n\nTry again later.")
-                self.is_fetching = False
-                return
-
-            skins_data = response.json()
-            skin_count = len(skins_data) if isinstance(skins_data, list) else 0
-            self.log_message(f"✓ Fetched {skin_count} skins")
-
-            # Save skins.json
-            try:
-                data_dir = _get_data_dir()
-                tmp_path = os.path.join(data_dir, f"skins.json.tmp.{int(time.time())}")
-                final_path = os.path.join(data_dir, "skins.json")
-                with open(tmp_path, "w", encoding="utf-8") as f:
-                    json.dump(skins_data, f, indent=2, ensure_ascii=False)
-                os.replace(tmp_path, final_path)
-                self.log_message(f"✓ Saved skins.json to: {final_path}")
-            except Exception as e:
-                self.log_message(f"✗ Failed to save skins.json: {e}")
-
-            # Fetch loot items
-            self._safe_update_spinner_text("Fetching loot")
-            self.update_progress("Fetching loot data...", step=1)
-
-            loot_data = []
-            try:
-                url = f"https://127.0.0.1:{port}/lol-loot/v1/player-loot"
-                response = requests.get(url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=15)
-                self.log_message(f"Loot API response: {response.status_code}")
-
-                if response.status_code == 200:
-                    loot_data = response.json()
-                    loot_count = len(loot_data) if isinstance(loot_data, list) else 0
-                    self.log_message(f"✓ Fetched {loot_count} loot items")
-                    
-                    # Save skinsLoot.json
-                    try:
-                        data_dir = _get_data_dir()
-                        tmp_path = os.path.join(data_dir, f"skinsLoot.json.tmp.{int(time.time())}")
-                        final_path = os.path.join(data_dir, "skinsLoot.json")
-                        with open(tmp_path, "w", encoding="utf-8") as f:
-                            json.dump(loot_data, f, indent=2, ensure_ascii=False)
-                        os.replace(tmp_path, final_path)
-                        self.log_message(f"✓ Saved skinsLoot.json to: {final_path}")
-                    except Exception as e:
-                        self.log_message(f"✗ Failed to save skinsLoot.json: {e}")
-            except Exception as e:
-                self.log_message(f"⚠ Loot fetch error: {str(e)}")
-
-            # Get friends list for auto-friending
-            friends_data = []
-            try:
-                friends_url = f"https://127.0.0.1:{port}/lol-chat/v1/friends"
-                friends_response = requests.get(friends_url, auth=HTTPBasicAuth('riot', token), verify=False, timeout=10)
-                self.log_message(f"Friends API response: {friends_response.status_code}")
-                
-                if friends_response.status_code == 200:
-                    all_friends = friends_response.json()
-                    friends_data = all_friends if isinstance(all_friends, list) else []
-                    friends_count = len(friends_data)
-                    self.log_message(f"✓ Fetched {friends_count} friends from League client")
-                else:
-                    self.log_message(f"⚠ Friends API returned status {friends_response.status_code}")
-            except Exception as e:
-                self.log_message(f"⚠ Friends fetch error: {str(e)}")
-
-            # Upload data to server
-            self._safe_update_spinner_text("Uploading")
-            self.update_progress("Uploading data to server...", step=2)
-
-            if not self.user_id:
-                _on_error("User ID not found. Please re-authorize.")
-                self.is_fetching = False
-                return
-            
-            payload = {
-                "user_id": self.user_id,
-                "summoner_name": final_game_name,
-                "summoner_tag": tagline,
-                "icon": profile_icon_id,
-                "region": platform_id,
-                "summoner_id": summoner_id,
-                "skins": skins_data,
-                "loot": loot_data,
-                "friends": friends_data
-            }
-
-            self.log_message(f"Preparing to upload {len(payload.get('skins', []))} skins and {len(payload.get('loot', []))} loot items")
-            
-            try:
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.auth_token}"
-                }
-                
-                self.log_message("Uploading data to Skinergy servers...")
-
-                max_attempts = 3
-                backoff_base = 2
-                success = False
-                api_response = None
-
-                for attempt in range(1, max_attempts + 1):
-                    try:
-                        timeout_val = max(30, SecurityConfig.REQUEST_TIMEOUT)
-                        api_response = requests.post(
-                            self.api_endpoints['upload_data'],
-                            json=payload,
-                            headers=headers,
-                            timeout=timeout_val,
-                            verify=SecurityConfig.SSL_VERIFY
-                        )
-
-                        self.log_message(f"API response status: {getattr(api_response, 'status_code', 'NO_RESPONSE')}")
-
-                        if api_response.status_code in (200, 201):
-                            self.log_message("✓ Data uploaded successfully!")
-                            success = True
-                            break
-                        elif api_response.status_code == 401:
-                            # Authorization token is invalid/expired - need to re-authorize
-                            error_msg = "Authorization expired"
-                            try:
-                                error_data = api_response.json()
-                                error_msg = error_data.get('error', error_msg)
-                            except Exception:
-                                pass
-                            
-                            self.log_message(f"⚠ {error_msg} - please re-authorize")
-                            
-                            # Clear saved auth and reset state
-                            _clear_auth_token()
-                            self.authorized = False
-                            self.auth_token = None
-                            self.user_id = None
-                            
-                            # Update UI on main thread
-                            def prompt_reauth():
-                                self._stop_spinner("Start Upload")
-                                self.status_label.config(text="Authorization expired. Please enter a new code.", fg=self.error_color)
-                                self.auth_btn.config(state='normal', text="Start Upload", bg=self.btn_primary, fg=self.btn_primary_text,
-                                                    activebackground=self.btn_primary_hover, activeforeground=self.btn_primary_text)
-                                self.update_step(0)
-                                self._show_popup("Re-authorization Required",
-                                    "Your authorization has expired.\n\nPlease get a new code from the Skinergy website and try again.",
-                                    icon_text="⚠", icon_color=self.warning_color)
-                            self.root.after(0, prompt_reauth)
-                            return  # Exit the upload flow entirely
-                        elif api_response.status_code >= 500:
-                            if attempt < max_attempts:
-                                wait = backoff_base ** attempt
-                                self.log_message(f"Retrying upload in {wait}s (attempt {attempt + 1}/{max_attempts})")
-                                time.sleep(wait)
-                                continue
-                            else:
-                                break
-                        else:
-                            error_msg = "Upload failed"
-                            try:
-                                error_data = api_response.json()
-                                error_msg = error_data.get('error', error_msg)
-                            except Exception:
-                                error_msg = getattr(api_response, 'text', error_msg)
-
-                            self.log_message(f"⚠ API upload failed: {error_msg}")
-                            break
-
-                    except requests.exceptions.RequestException as rexc:
-                        self.log_message(f"✗ Request exception during upload: {str(rexc)}")
-                        if attempt < max_attempts:
-                            wait = backoff_base ** attempt
-                            self.log_message(f"Retrying upload in {wait}s (attempt {attempt + 1}/{max_attempts})")
-                            time.sleep(wait)
-                            continue
-                        else:
-                            break
-
-                if success:
-                    self.update_progress("Upload complete! Your skins are now synced.", step=3)
-                    def _on_success():
-                        self._stop_spinner("Done ✓")
-                        self.auth_btn.config(state='normal', text="Done ✓", bg=self.emerald, fg="white",
-                                            activebackground=self.emerald_dim, activeforeground="white")
-                    self.root.after(0, _on_success)
+            if result.ok:
+                def _on_success():
+                    self._stop_spinner("Done ✓")
+                    self.auth_btn.config(state='normal', text="Done ✓", bg=self.emerald, fg="white",
+                                        activebackground=self.emerald_dim, activeforeground="white")
+                self.root.after(0, _on_success)
+                if not auto:
                     self.root.after(2000, self.show_success_popup)
-                else:
-                    error_msg = "Upload failed after multiple attempts"
-                    if api_response:
-                        try:
-                            error_data = api_response.json()
-                            error_msg = error_data.get('error', error_msg)
-                        except Exception:
-                            pass
-                    _on_error(f"Upload failed: {error_msg}",
-                             popup_title="Upload Error",
-                             popup_msg=f"Failed to upload data.\n\n{error_msg}")
-                    
-            except requests.exceptions.ConnectionError:
-                _on_error("Connection error - cannot reach Skinergy servers",
-                         popup_title="Connection Error",
-                         popup_msg="Cannot connect to Skinergy servers.\n\nCheck your internet connection.")
-            except requests.exceptions.Timeout:
-                _on_error("Request timeout - server took too long to respond",
-                         popup_title="Timeout Error",
-                         popup_msg="Server took too long to respond.\n\nPlease try again.")
-            except Exception as e:
-                _on_error(f"API upload error: {str(e)}",
-                         popup_title="Upload Error",
-                         popup_msg="Failed to upload data.\n\nPlease try again.")
+            elif result.status == STATUS_AUTH_EXPIRED:
+                # Clear saved auth and reset state
+                _clear_auth_token()
+                self.authorized = False
+                self.auth_token = None
+                self.user_id = None
+
+                # Update UI on main thread
+                def prompt_reauth():
+                    self._stop_spinner("Start Upload")
+                    self.status_label.config(text="Authorization expired. Please enter a new code.", fg=self.error_color)
+                    self.auth_btn.config(state='normal', text="Start Upload", bg=self.btn_primary, fg=self.btn_primary_text,
+                                        activebackground=self.btn_primary_hover, activeforeground=self.btn_primary_text)
+                    self.update_step(0)
+                    self._show_popup(result.popup_title, result.popup_msg,
+                                     icon_text="⚠", icon_color=self.warning_color)
+                self.root.after(0, prompt_reauth)
+            elif result.status == STATUS_QUEUED:
+                def _on_queued():
+                    self._stop_spinner("▶  Start Upload")
+                    self.auth_btn.config(state='normal', text="▶  Start Upload", bg=self.emerald, fg="white",
+                                        activebackground=self.emerald_dim, activeforeground="white")
+                    if not auto:
+                        self._show_popup(result.popup_title, result.popup_msg,
+                                         icon_text="⚠", icon_color=self.warning_color)
+                self.root.after(0, _on_queued)
+            else:
+                _on_error(result.message, popup_title=result.popup_title, popup_msg=result.popup_msg)
 
         except Exception as e:
             error_msg = f"An unexpected error occurred: {str(e)}"
@@ -1894,12 +1565,31 @@ class LeagueSkinFetcher:
 
         finally:
             self.is_fetching = False
+            if self._sync_pending:
+                self._sync_pending = False
+                self.root.after(0, self._on_inventory_event, set())
+
+    def _on_engine_progress(self, text, step=None, stage=None):
+        """Progress callback for the sync engine (called from the worker thread)"""
+        if stage:
+            self._safe_update_spinner_text(stage)
+        self.update_progress(text, step=step)
 
     def on_closing(self):
         """Handle window close event - ensure full cleanup"""
         self.status_monitor_running = False
+        try:
+            self.client_watcher.stop()
+        except Exception:
+            pass
+        if self.event_subscriber is not None:
+            self.event_subscriber.stop()
+        self.engine.stop_spool_drainer()
         self.is_fetching = False
 
+        # Threads still logging on their way out must not call into a destroyed window
+        remove_handler(self._log_handler)
+
         # Close the log window if open
         try:
             if getattr(self, 'log_window', None) and self.log_window.winfo_exists():
@@ -1907,18 +1597,8 @@ class LeagueSkinFetcher:
         except Exception:
             pass
 
-        # Shut down all logging handlers so the log file is released
-        try:
-            root_logger = logging.getLogger()
-            for handler in root_logger.handlers[:]:
-                try:
-                    handler.flush()
-                    handler.close()
-                except Exception:
-                    pass
-                root_logger.removeHandler(handler)
-        except Exception:
-            pass
+        # Write out queued log records so the log file is complete and released
+        shutdown_logging()
 
         # Destroy the tkinter window
         try:
@@ -1931,10 +1611,203 @@ class LeagueSkinFetcher:
         os._exit(0)
 
 
+def _console_log(message):
+    """Log callback for the windowless modes: sanitized to the log file and stdout"""
+    app_log.info(message)
+
+
+def _log_to_stdout():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    add_handler(handler)
+
+
+def _authorize_from_code(engine, code_from_args, _log, save=_save_auth_token):
+    """Exchange a --code (or pending deep-link code) for a saved token
+
+    `save(auth_token, user_id, expires_in)` stores it (auth_token.json by default).
+    Returns an exit code on failure, None when authorized or no code was given.
+    """
+    code = _parse_code_arg(code_from_args) if code_from_args else _load_pending_code()
+    if not code:
+        return None
+    is_valid, validated_code = SecurityConfig.validate_auth_code(code)
+    if not is_valid:
+        _log(f"✗ {validated_code}")
+        return EXIT_CODES[STATUS_NOT_AUTHORIZED]
+    try:
+        response = engine.verify_auth_code(validated_code)
+        _log(f"Verification response status: {response.status_code}")
+        data = response.json() if response.status_code == 200 else {}
+    except requests.exceptions.RequestException as e:
+        _log(f"✗ Authorization error: {str(e)}")
+        return EXIT_CODES[STATUS_CONNECTION_ERROR]
+    if not data.get('auth_token') or not data.get('user_id'):
+        _log(f"✗ Authorization failed: HTTP {response.status_code}")
+        return EXIT_CODES[STATUS_NOT_AUTHORIZED]
+    save(data['auth_token'], data['user_id'], data.get('expires_in', 86400))
+    _log("Device authorization successful!")
+    return None
+
+
+def run_headless(code_from_args=None, export_json=False):
+    """Run one sync without the window and return a process exit code"""
+    def _progress(text, step=None, stage=None):
+        _console_log(f"Progress: {text}")
+
+    engine = SkinSyncEngine(data_dir=_get_data_dir(), log=_console_log, progress=_progress,
+                            export_json=export_json)
+
+    exit_code = _authorize_from_code(engine, code_from_args, _console_log)
+    if exit_code is not None:
+        return exit_code
+
+    auth_token, user_id = _load_auth_token()
+    if not auth_token or not user_id:
+        _console_log("✗ Not authorized - run with --code or authorize in the app first")
+        return EXIT_CODES[STATUS_NOT_AUTHORIZED]
+
+    result = engine.run(auth_token, user_id)
+    engine.sessions.close()
+    if result.status == STATUS_AUTH_EXPIRED:
+        _clear_auth_token()
+    _console_log(("✓ " if result.ok else "✗ ") + result.message)
+    return result.exit_code
+
+
+def run_daemon(code_from_args=None, interval=None, export_json=False):
+    """Keep syncing in the background until interrupted (no window is created)"""
+    lower_priority()
+    engine = SkinSyncEngine(data_dir=_get_data_dir(), log=_console_log,
+                            progress=lambda text, step=None, stage=None: None,
+                            export_json=export_json)
+
+    exit_code = _authorize_from_code(engine, code_from_args, _console_log)
+    if exit_code is not None:
+        return exit_code
+
+    daemon = SyncDaemon(engine, _load_auth_token, interval=interval,
+                        on_auth_expired=_clear_auth_token)
+    engine.start_spool_drainer(_spool_token)
+    _console_log(f"Auto-sync running (every {daemon.interval / 60:.0f} min while League is open). "
+                 "Press Ctrl+C to stop.")
+    daemon.start()
+    try:
+        while not daemon.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        engine.stop_spool_drainer()
+        engine.sessions.close()
+    _console_log("Auto-sync stopped")
+    return 0
+
+
+def run_link(riot_id, code_from_args):
+    """Link a Skinergy auth code to one League account for --batch"""
+    name, _, tag = riot_id.partition('#')
+    if not name.strip() or not tag.strip():
+        _console_log("✗ --link needs a Riot ID like \"Name#TAG\"")
+        return EXIT_CODES[STATUS_ERROR]
+    if not code_from_args:
+        _console_log("✗ --link needs --code (authorization code from the Skinergy website)")
+        return EXIT_CODES[STATUS_NOT_AUTHORIZED]
+
+    engine = SkinSyncEngine(log=_console_log)
+    store = AccountTokenStore(_get_data_dir())
+    key = account_key(name, tag)
+    exit_code = _authorize_from_code(
+        engine, code_from_args, _console_log,
+        save=lambda auth_token, user_id, expires_in: store.set(key, auth_token, user_id, expires_in))
+    engine.sessions.close()
+    if exit_code is not None:
+        return exit_code
+    _console_log(f"✓ Linked {name.strip()}#{tag.strip()} for --batch")
+    return 0
+
+
+def run_batch(workers=None, export_json=False):
+    """Sync every running League client with its linked account and return an exit code
+
+    0 if every client synced, otherwise the exit code of the first failure.
+    """
+    data_dir = _get_data_dir()
+    batch = BatchSync(data_dir, log=_console_log, workers=workers,
+                      rate_limiter=create_rate_limiters(data_dir)['upload_data'],
+                      export_json=export_json)
+    results = batch.run()
+    if not results:
+        _console_log("✗ No League clients found")
+        return EXIT_CODES[STATUS_NO_CLIENT]
+
+    _console_log("")
+    _console_log(f"{'Client':<28} {'Port':>6}  {'Status':<18} {'Time':>6}")
+    for client in results:
+        _console_log(f"{(client.riot_id or '?'):<28} {client.port:>6}  {client.result.status:<18} "
+                     f"{client.seconds:>5.1f}s")
+    failed = [client for client in results if not client.result.ok]
+    _console_log(f"{len(results) - len(failed)}/{len(results)} clients synced")
+    return failed[0].result.exit_code if failed else 0
+
+
+def run_bulk(root, workers=None, checkpoint=None):
+    """Upload every saved snapshot set under `root` and print a summary
+
+    0 if every set was uploaded (or skipped as done/superseded), otherwise
+    the exit code of the first failure.
+    """
+    if not os.path.isdir(root):
+        _console_log(f"✗ Not a directory: {root}")
+        return EXIT_CODES[STATUS_ERROR]
+    data_dir = _get_data_dir()
+    uploader = BulkUploader(data_dir, checkpoint_path=checkpoint, log=_console_log, workers=workers,
+                            rate_limiter=create_rate_limiters(data_dir)['upload_data'])
+    results = uploader.run(root)
+    _console_log("")
+    for line in uploader.summary():
+        _console_log(line)
+    failed = [result for result in results if not result.ok]
+    return failed[0].exit_code if failed else 0
+
+
 if __name__ == "__main__":
     # Parse command line arguments for deep link support
     parser = argparse.ArgumentParser(description='Skinergy Desktop Uploader')
     parser.add_argument('--code', type=str, help='Authorization code to prefill')
+    parser.add_argument('--headless', action='store_true',
+                        help='Sync once without opening the window and exit with a status code')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep syncing in the background whenever League is running (no window)')
+    parser.add_argument('--interval', type=int,
+                        help='Seconds between --daemon syncs (default: DAEMON_INTERVAL or 3600)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Sync every running League client with its linked account and exit')
+    parser.add_argument('--link', type=str, metavar='NAME#TAG',
+                        help='Link --code to this League account for --batch and exit')
+    parser.add_argument('--bulk', type=str, metavar='DIR',
+                        help='Upload every saved snapshot set (--export-json folders) under DIR and exit')
+    parser.add_argument('--workers', type=int,
+                        help='Uploads at once for --batch/--bulk (default: BATCH_WORKERS or 4)')
+    parser.add_argument('--checkpoint', type=str, metavar='FILE',
+                        help='--bulk progress file (default: bulk_checkpoint.jsonl in the data folder)')
+    parser.add_argument('--export-json', action='store_true',
+                        help='Also save readable skins.json and skinsLoot.json in the data folder')
     args = parser.parse_args()
     
-    app = LeagueSkinFetcher(code_from_args=args.code if args.code else None)
+    if args.headless or args.daemon or args.batch or args.link or args.bulk:
+        _log_to_stdout()
+    if args.link:
+        sys.exit(run_link(args.link, args.code))
+    if args.batch:
+        sys.exit(run_batch(workers=args.workers, export_json=args.export_json))
+    if args.bulk:
+        sys.exit(run_bulk(args.bulk, workers=args.workers, checkpoint=args.checkpoint))
+    if args.headless:
+        sys.exit(run_headless(args.code, export_json=args.export_json))
+    if args.daemon:
+        sys.exit(run_daemon(args.code, interval=args.interval, export_json=args.export_json))
+
+    app = LeagueSkinFetcher(code_from_args=args.code if args.code else None,
+                            export_json=args.export_json)
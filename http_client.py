@@ -0,0 +1,202 @@
+"""Pooled keep-alive HTTP sessions for Skinergy Desktop Uploader"""
+
+import gzip
+import json
+import threading
+import zlib
+from typing import Any, Iterable, Iterator, Optional, Set, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+from security_config import SecurityConfig
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Streamed upload bodies are handed to the socket in pieces of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class _PooledSession(requests.Session):
+    """Session that always sends its own `verify` setting
+
+    requests lets REQUESTS_CA_BUNDLE override session.verify, which would
+    break the LCU's self-signed cert, so pass it explicitly on every call.
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('verify', self.verify)
+        return super().request(method, url, **kwargs)
+
+
+def _build_session(pool_size: int, verify) -> requests.Session:
+    """Create a session with a sized keep-alive pool for one host"""
+    session = _PooledSession()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.verify = verify
+    return session
+
+
+class SessionManager:
+    """Hands out one session for the League client and one for the Skinergy API
+
+    The League client session is bound to the discovered (port, token) and is
+    rebuilt automatically when either changes (client restart).
+    """
+
+    def __init__(self, pool_size: Optional[int] = None):
+        self.pool_size = pool_size or SecurityConfig.HTTP_POOL_SIZE
+        self._lock = threading.Lock()
+        self._lcu = None
+        self._lcu_key: Optional[Tuple[str, str]] = None
+        self._api = None
+
+    def lcu(self, port, token) -> requests.Session:
+        """Session for https://127.0.0.1:<port> using the client's auth token"""
+        key = (str(port), token)
+        with self._lock:
+            if self._lcu is None or self._lcu_key != key:
+                if self._lcu is not None:
+                    self._lcu.close()
+                # League client uses self-signed localhost cert, so we skip verification
+                session = _build_session(self.pool_size, verify=False)
+                session.auth = HTTPBasicAuth('riot', token)
+                # Local traffic only - don't pick up proxies or .netrc credentials
+                session.trust_env = False
+                session.headers.update({"Accept": "application/json"})
+                self._lcu = session
+                self._lcu_key = key
+            return self._lcu
+
+    def api(self) -> requests.Session:
+        """Session for SecurityConfig.API_BASE_URL"""
+        with self._lock:
+            if self._api is None:
+                self._api = _build_session(self.pool_size, verify=SecurityConfig.SSL_VERIFY)
+            return self._api
+
+    def reset_lcu(self):
+        """Drop the League client session (e.g. after a 401 or connection error)"""
+        with self._lock:
+            if self._lcu is not None:
+                self._lcu.close()
+            self._lcu = None
+            self._lcu_key = None
+
+    def close(self):
+        """Close both sessions and their pooled connections"""
+        self.reset_lcu()
+        with self._lock:
+            if self._api is not None:
+                self._api.close()
+            self._api = None
+
+
+def parse_accept_encoding(header: Optional[str]) -> Set[str]:
+    """Codings listed in an Accept-Encoding response header (RFC 7694)"""
+    codings = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        codings.add(name.strip().lower())
+    return codings
+
+
+def upload_encoding(accepted: Optional[Set[str]] = None) -> Optional[str]:
+    """Content-Encoding to use for uploads
+
+    'auto' only compresses once the API has advertised the coding in an
+    Accept-Encoding header; 'gzip'/'zstd' force it (zstd needs zstandard).
+    """
+    wanted = (SecurityConfig.UPLOAD_COMPRESSION or 'none').lower()
+    if wanted == 'auto':
+        accepted = accepted or set()
+        if 'zstd' in accepted and zstandard is not None:
+            return 'zstd'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+    if wanted == 'zstd':
+        # zstandard is optional - fall back to gzip when it isn't installed
+        return 'zstd' if zstandard is not None else 'gzip'
+    if wanted == 'gzip':
+        return 'gzip'
+    return None
+
+
+def compress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress a request body for the given Content-Encoding"""
+    if encoding == 'gzip':
+        # mtime=0 keeps the output deterministic for identical payloads
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return body
+
+
+def _json_pieces(value: Any, encode, depth: int = 0) -> Iterator[str]:
+    """Walk the outer dict/list levels, encoding each inner record in one go"""
+    if depth < 2 and isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            yield (',' if i else '') + encode(key) + ':'
+            yield from _json_pieces(item, encode, depth + 1)
+        yield '}'
+    elif depth < 2 and isinstance(value, (list, tuple)):
+        yield '['
+        for i, item in enumerate(value):
+            if i:
+                yield ','
+            yield from _json_pieces(item, encode, depth + 1)
+        yield ']'
+    else:
+        yield encode(value)
+
+
+def iter_json(value: Any, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Compact JSON as a stream of byte chunks
+
+    Same bytes as json.dumps(value, separators=(',', ':'), allow_nan=False),
+    but only one record plus one chunk is held in memory at a time instead of
+    the whole encoded body.
+    """
+    encode = json.JSONEncoder(separators=(',', ':'), allow_nan=False).encode
+    buffer = []
+    size = 0
+    for piece in _json_pieces(value, encode):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: Optional[str]) -> Iterator[bytes]:
+    """Streaming counterpart of compress_body (never yields empty chunks)"""
+    if encoding == 'gzip':
+        # wbits=31 writes a gzip wrapper; zlib leaves mtime at 0 like compress_body
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    elif encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        yield from (chunk for chunk in chunks if chunk)
+        return
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    out = compressor.flush()
+    if out:
+        yield out
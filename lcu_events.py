@@ -0,0 +1,375 @@
+"""League client event stream for Skinergy Desktop Uploader
+
+The client publishes WAMP 1.0 events over a WebSocket on the same port and
+token as its REST API. LcuEventSubscriber listens for inventory and loot
+changes and calls back once a burst of events has settled, so a new unlock
+can be synced within seconds instead of waiting for the next button press.
+Only the standard library is used (socket + ssl).
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import socket
+import ssl
+import struct
+import threading
+import time
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+# WAMP 1.0 message types used by the League client
+WAMP_SUBSCRIBE = 5
+WAMP_UNSUBSCRIBE = 6
+WAMP_EVENT = 8
+
+# Topic names are the REST path with '/' replaced by '_'
+INVENTORY_TOPICS = (
+    'OnJsonApiEvent_lol-champions_v1_inventories',
+    'OnJsonApiEvent_lol-loot_v1_player-loot',
+)
+INVENTORY_URIS = (
+    '/lol-champions/v1/inventories',
+    '/lol-loot/v1/player-loot',
+)
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+_WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+class WebSocketError(Exception):
+    """Handshake or framing failure"""
+
+
+def accept_key(key: str) -> str:
+    """Sec-WebSocket-Accept value for a Sec-WebSocket-Key (RFC 6455 4.2.2)"""
+    digest = hashlib.sha1((key + _WS_GUID).encode('ascii')).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def encode_frame(opcode: int, payload: bytes, mask: bool = True) -> bytes:
+    """One final frame; clients must mask, servers must not"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+    if not mask:
+        return bytes(header) + payload
+    key = os.urandom(4)
+    return bytes(header) + key + _apply_mask(payload, key)
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    if not payload:
+        return b''
+    # XOR in one go through int arithmetic - much faster than a byte loop
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(payload), 'big')
+
+
+def decode_frame(buffer: bytearray) -> Optional[Tuple[bool, int, bytes]]:
+    """Pop one complete frame (fin, opcode, payload) off the buffer, or None"""
+    if len(buffer) < 2:
+        return None
+    fin = bool(buffer[0] & 0x80)
+    opcode = buffer[0] & 0x0F
+    masked = bool(buffer[1] & 0x80)
+    length = buffer[1] & 0x7F
+    offset = 2
+    if length == 126:
+        if len(buffer) < 4:
+            return None
+        length = struct.unpack_from('!H', buffer, 2)[0]
+        offset = 4
+    elif length == 127:
+        if len(buffer) < 10:
+            return None
+        length = struct.unpack_from('!Q', buffer, 2)[0]
+        offset = 10
+    if length > MAX_MESSAGE_BYTES:
+        raise WebSocketError(f"frame too large ({length} bytes)")
+    key = b''
+    if masked:
+        if len(buffer) < offset + 4:
+            return None
+        key = bytes(buffer[offset:offset + 4])
+        offset += 4
+    if len(buffer) < offset + length:
+        return None
+    payload = bytes(buffer[offset:offset + length])
+    del buffer[:offset + length]
+    if masked:
+        payload = _apply_mask(payload, key)
+    return fin, opcode, payload
+
+
+class WebSocketConnection:
+    """Minimal RFC 6455 client connection (text messages, ping/pong, close)"""
+
+    def __init__(self, sock: socket.socket, buffer: bytes = b''):
+        self.sock = sock
+        self._buffer = bytearray(buffer)
+        self._fragments: List[bytes] = []
+        self._send_lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, port, token: Optional[str], host: str = '127.0.0.1',
+                use_tls: bool = True, protocol: str = 'wamp',
+                timeout: float = 10.0) -> 'WebSocketConnection':
+        """Open a WebSocket to the League client (Basic auth riot:<token>)"""
+        sock = socket.create_connection((host, int(port)), timeout=timeout)
+        try:
+            if use_tls:
+                # League client uses self-signed localhost cert, so we skip verification
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+                sock = context.wrap_socket(sock, server_hostname=host)
+
+            key = base64.b64encode(os.urandom(16)).decode('ascii')
+            lines = [
+                'GET / HTTP/1.1',
+                f'Host: {host}:{port}',
+                'Upgrade: websocket',
+                'Connection: Upgrade',
+                f'Sec-WebSocket-Key: {key}',
+                'Sec-WebSocket-Version: 13',
+                f'Sec-WebSocket-Protocol: {protocol}',
+            ]
+            if token:
+                credentials = base64.b64encode(f'riot:{token}'.encode('utf-8')).decode('ascii')
+                lines.append(f'Authorization: Basic {credentials}')
+            sock.sendall(('\r\n'.join(lines) + '\r\n\r\n').encode('ascii'))
+
+            response = b''
+            while b'\r\n\r\n' not in response:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    raise WebSocketError("connection closed during handshake")
+                response += chunk
+                if len(response) > 65536:
+                    raise WebSocketError("handshake response too large")
+            head, _, rest = response.partition(b'\r\n\r\n')
+            status_line, *header_lines = head.decode('latin-1').split('\r\n')
+            if ' 101 ' not in f'{status_line} ':
+                raise WebSocketError(f"handshake rejected: {status_line}")
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if headers.get('sec-websocket-accept') != accept_key(key):
+                raise WebSocketError("bad Sec-WebSocket-Accept")
+        except Exception:
+            sock.close()
+            raise
+        return cls(sock, rest)
+
+    def send_text(self, text: str):
+        with self._send_lock:
+            self.sock.sendall(encode_frame(OP_TEXT, text.encode('utf-8')))
+
+    def send_json(self, message):
+        self.send_text(json.dumps(message, separators=(',', ':')))
+
+    def recv_text(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Next complete text message, or None if `timeout` passes first
+
+        Raises WebSocketError when the peer closes the connection.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            frame = decode_frame(self._buffer)
+            if frame is not None:
+                message = self._handle_frame(*frame)
+                if message is not None:
+                    return message
+                continue
+            if self.closed:
+                raise WebSocketError("connection closed")
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self.sock.settimeout(remaining)
+            try:
+                chunk = self.sock.recv(65536)
+            except socket.timeout:
+                return None
+            if not chunk:
+                self.closed = True
+                raise WebSocketError("connection closed")
+            self._buffer += chunk
+
+    def _handle_frame(self, fin: bool, opcode: int, payload: bytes) -> Optional[str]:
+        if opcode == OP_PING:
+            with self._send_lock:
+                self.sock.sendall(encode_frame(OP_PONG, payload))
+            return None
+        if opcode == OP_PONG:
+            return None
+        if opcode == OP_CLOSE:
+            self.close()
+            raise WebSocketError("connection closed by peer")
+        if opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+            self._fragments.append(payload)
+            if not fin:
+                return None
+            data = b''.join(self._fragments)
+            self._fragments = []
+            return data.decode('utf-8', 'replace')
+        raise WebSocketError(f"unexpected opcode {opcode}")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            with self._send_lock:
+                self.sock.sendall(encode_frame(OP_CLOSE, struct.pack('!H', 1000)))
+        except Exception:
+            pass
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class LcuEventSubscriber:
+    """Calls `on_change(uris)` after inventory/loot events have settled
+
+    Events are debounced: the callback fires DEBOUNCE_SECONDS after the last
+    event of a burst, but never later than MAX_DELAY after the first one.
+    `get_connection` returns the client's (port, token) and is asked again on
+    every reconnect, so client restarts are picked up. A burst still waiting
+    when the stream drops fires as soon as it reconnects.
+    """
+
+    DEBOUNCE_SECONDS = 5.0
+    MAX_DELAY = 30.0
+    RECONNECT_MIN = 2.0
+    RECONNECT_MAX = 60.0
+
+    def __init__(self, get_connection: Callable[[], Tuple[Optional[str], Optional[str]]],
+                 on_change: Callable[[Set[str]], None],
+                 topics: Iterable[str] = INVENTORY_TOPICS,
+                 uri_prefixes: Iterable[str] = INVENTORY_URIS,
+                 debounce: Optional[float] = None,
+                 use_tls: bool = True, host: str = '127.0.0.1'):
+        self.get_connection = get_connection
+        self.on_change = on_change
+        self.topics = tuple(topics)
+        self.uri_prefixes = tuple(uri_prefixes)
+        self.debounce = self.DEBOUNCE_SECONDS if debounce is None else debounce
+        self.use_tls = use_tls
+        self.host = host
+        self.connected = False
+        self.events_seen = 0
+        self._pending: Set[str] = set()
+        self._first_event = self._last_event = 0.0
+        self._stop = threading.Event()
+        self._conn: Optional[WebSocketConnection] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lcu-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        conn = self._conn
+        if conn:
+            conn.close()
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def _matches(self, uri: str) -> bool:
+        return any(uri.startswith(prefix) for prefix in self.uri_prefixes)
+
+    def _run(self):
+        backoff = self.RECONNECT_MIN
+        while not self._stop.is_set():
+            port, token = None, None
+            try:
+                port, token = self.get_connection()
+            except Exception as e:
+                logging.debug(f"LCU event connection lookup failed: {e}")
+            if port and token:
+                try:
+                    self._conn = WebSocketConnection.connect(port, token, host=self.host,
+                                                             use_tls=self.use_tls)
+                    for topic in self.topics:
+                        self._conn.send_json([WAMP_SUBSCRIBE, topic])
+                    self.connected = True
+                    backoff = self.RECONNECT_MIN
+                    logging.info("Subscribed to League client inventory events")
+                    if self._pending:
+                        # A burst the drop cut off; the client won't send it again
+                        self._flush()
+                    self._listen(self._conn)
+                except Exception as e:
+                    if not self._stop.is_set():
+                        logging.debug(f"LCU event stream dropped: {e}")
+                finally:
+                    self.connected = False
+                    if self._conn:
+                        self._conn.close()
+                    self._conn = None
+            if self._stop.wait(backoff):
+                break
+            backoff = min(backoff * 2, self.RECONNECT_MAX)
+
+    def _listen(self, conn: WebSocketConnection):
+        while not self._stop.is_set():
+            if self._pending:
+                now = time.monotonic()
+                due = min(self._last_event + self.debounce, self._first_event + self.MAX_DELAY)
+                if now >= due:
+                    self._flush()
+                    continue
+                timeout = min(due - now, 1.0)
+            else:
+                timeout = 1.0
+
+            text = conn.recv_text(timeout=timeout)
+            if text is None:
+                continue
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+            if not (isinstance(message, list) and len(message) >= 3 and message[0] == WAMP_EVENT):
+                continue
+            event = message[2] if isinstance(message[2], dict) else {}
+            uri = str(event.get('uri') or '')
+            if not self._matches(uri):
+                continue
+            self.events_seen += 1
+            now = time.monotonic()
+            if not self._pending:
+                self._first_event = now
+            self._last_event = now
+            self._pending.add(uri)
+
+    def _flush(self):
+        uris, self._pending = self._pending, set()
+        try:
+            self.on_change(uris)
+        except Exception as e:
+            logging.warning(f"LCU event callback failed: {e}")
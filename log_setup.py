@@ -0,0 +1,149 @@
+"""Logging pipeline for Skinergy Desktop Uploader
+
+Log calls only format, sanitize and queue the record; one listener thread
+does all the writing (the rotating log file, the optional JSON-lines file,
+stdout in the windowless modes and the in-app log window). Every start
+rolls the previous run over to skin_fetcher.log.1 .. .N, so the last few
+runs are still there when a support ticket comes in.
+"""
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import Callable, Optional
+
+from security_config import SecurityConfig
+
+APP_LOGGER = 'skinergy'  # messages shown to the user (log window / stdout)
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+class SanitizingQueueHandler(logging.handlers.QueueHandler):
+    """Formats and sanitizes on the calling thread, so every output gets the same text"""
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.msg = SecurityConfig.sanitize_log_message(record.msg)
+        return record
+
+
+class RunRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Size-rotated log file that also starts a fresh file for every run"""
+
+    def __init__(self, filename: str, max_bytes: int, keep_runs: int):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=keep_runs,
+                         encoding='utf-8', delay=True)
+        try:
+            if os.path.getsize(filename) > 0:
+                if keep_runs:
+                    self.doRollover()
+                else:
+                    open(filename, 'w').close()
+        except OSError:
+            pass  # no previous run
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record, for log tooling"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class CallbackHandler(logging.Handler):
+    """Passes each formatted line to a callback (e.g. the log window buffer)"""
+
+    def __init__(self, callback: Callable[[str], None], level=logging.NOTSET):
+        super().__init__(level)
+        self.callback = callback
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+def setup_logging(log_path: str, level=logging.DEBUG, json_lines: Optional[bool] = None,
+                  keep_runs: Optional[int] = None, max_bytes: Optional[int] = None):
+    """Route the root logger through the queue to the rotating log file(s)"""
+    global _listener, _atexit_registered
+    shutdown_logging()
+    keep_runs = SecurityConfig.LOG_KEEP_RUNS if keep_runs is None else keep_runs
+    max_bytes = SecurityConfig.LOG_MAX_BYTES if max_bytes is None else max_bytes
+    json_lines = SecurityConfig.LOG_JSON if json_lines is None else json_lines
+
+    file_handler = RunRotatingFileHandler(log_path, max_bytes, keep_runs)
+    file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [file_handler]
+    if json_lines:
+        json_handler = RunRotatingFileHandler(os.path.splitext(log_path)[0] + '.jsonl',
+                                              max_bytes, keep_runs)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(SanitizingQueueHandler(log_queue))
+
+    with _lock:
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        if not _atexit_registered:
+            atexit.register(shutdown_logging)
+            _atexit_registered = True
+    return _listener
+
+
+def add_handler(handler: logging.Handler, app_only: bool = True):
+    """Also send records to `handler` (only APP_LOGGER's unless app_only is False)"""
+    if app_only:
+        handler.addFilter(logging.Filter(APP_LOGGER))
+    with _lock:
+        if _listener is not None:
+            # The listener reads this tuple once per record, so swapping it is safe
+            _listener.handlers = _listener.handlers + (handler,)
+
+
+def remove_handler(handler: logging.Handler):
+    """Stop sending records to `handler` (the caller still owns and closes it)"""
+    with _lock:
+        if _listener is not None:
+            _listener.handlers = tuple(h for h in _listener.handlers if h is not handler)
+
+
+def shutdown_logging():
+    """Write out everything still queued and close the log files"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is None:
+        return
+    try:
+        listener.stop()
+    except Exception:
+        pass
+    for handler in listener.handlers:
+        try:
+            handler.close()
+        except Exception:
+            pass
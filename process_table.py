@@ -0,0 +1,220 @@
+"""In-process process enumeration for Skinergy Desktop Uploader
+
+Reads process command lines without shelling out to wmic/PowerShell:
+ctypes (Toolhelp + NtQueryInformationProcess) on Windows and /proc on Linux,
+which also covers Wine/Proton installs. FakeProcessTable is for tests.
+"""
+
+import logging
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional
+
+CLIENT_PROCESS_NAME = 'LeagueClientUx.exe'
+
+
+class ProcessInfo:
+    """One running process"""
+
+    def __init__(self, pid: int, name: str, cmdline: Optional[str] = None, exe: Optional[str] = None):
+        self.pid = pid
+        self.name = name
+        self.cmdline = cmdline
+        self.exe = exe
+
+    def __repr__(self):
+        return f"ProcessInfo(pid={self.pid}, name={self.name!r})"
+
+
+def _basename(path: str) -> str:
+    """Basename that understands both / and \\ (Wine reports Windows paths)"""
+    return re.split(r'[\\/]', path.rstrip('\\/'))[-1] if path else ''
+
+
+def parse_client_args(cmdline: Optional[str]) -> Dict[str, Optional[str]]:
+    """Pull port, auth token and install dir out of a LeagueClientUx command line"""
+    cmdline = cmdline or ''
+    port = re.search(r'--app-port=(\d+)', cmdline)
+    token = re.search(r'--remoting-auth-token=([\w-]+)', cmdline)
+    install_dir = re.search(r'--install-directory=([^"\r\n\x00]+?)(?="|\s+--|\r|\n|\x00|$)', cmdline)
+    return {
+        'port': port.group(1) if port else None,
+        'token': token.group(1) if token else None,
+        'install_dir': install_dir.group(1).strip() if install_dir else None,
+    }
+
+
+class ProcessTable:
+    """Base class: enumerate processes and find them by executable name"""
+
+    def processes(self) -> Iterator[ProcessInfo]:
+        raise NotImplementedError
+
+    def find(self, name: str = CLIENT_PROCESS_NAME) -> List[ProcessInfo]:
+        """All processes whose executable name matches (case-insensitive)"""
+        wanted = name.lower()
+        return [p for p in self.processes() if p.name.lower() == wanted]
+
+
+class FakeProcessTable(ProcessTable):
+    """Fixed list of processes, for unit tests"""
+
+    def __init__(self, processes: Iterable[ProcessInfo] = ()):
+        self._processes = list(processes)
+
+    def processes(self) -> Iterator[ProcessInfo]:
+        return iter(list(self._processes))
+
+
+class ProcFsProcessTable(ProcessTable):
+    """Linux /proc reader (native processes and Wine/Proton clients)"""
+
+    def __init__(self, proc_root: str = '/proc'):
+        self.proc_root = proc_root
+
+    def processes(self) -> Iterator[ProcessInfo]:
+        try:
+            entries = os.listdir(self.proc_root)
+        except OSError:
+            return
+        for entry in entries:
+            if not entry.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.proc_root, entry, 'cmdline'), 'rb') as f:
+                    raw = f.read()
+            except OSError:
+                continue  # process exited or not ours
+            if not raw:
+                continue  # kernel thread
+            args = [a.decode('utf-8', 'replace') for a in raw.rstrip(b'\0').split(b'\0')]
+            # Under Wine argv[0] is the Windows path of the .exe
+            yield ProcessInfo(int(entry), _basename(args[0]), ' '.join(args), args[0])
+
+
+class WindowsProcessTable(ProcessTable):
+    """Toolhelp snapshot for names/PIDs, NtQueryInformationProcess for command lines"""
+
+    TH32CS_SNAPPROCESS = 0x2
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    ProcessCommandLineInformation = 60  # Windows 8.1+
+    STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [
+                ('dwSize', wintypes.DWORD),
+                ('cntUsage', wintypes.DWORD),
+                ('th32ProcessID', wintypes.DWORD),
+                ('th32DefaultHeapID', ctypes.c_size_t),
+                ('th32ModuleID', wintypes.DWORD),
+                ('cntThreads', wintypes.DWORD),
+                ('th32ParentProcessID', wintypes.DWORD),
+                ('pcPriClassBase', ctypes.c_long),
+                ('dwFlags', wintypes.DWORD),
+                ('szExeFile', ctypes.c_wchar * 260),
+            ]
+
+        class UNICODE_STRING(ctypes.Structure):
+            _fields_ = [
+                ('Length', ctypes.c_ushort),
+                ('MaximumLength', ctypes.c_ushort),
+                ('Buffer', ctypes.c_void_p),
+            ]
+
+        self._PROCESSENTRY32W = PROCESSENTRY32W
+        self._UNICODE_STRING = UNICODE_STRING
+
+        k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        k32.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+        k32.CreateToolhelp32Snapshot.restype = ctypes.c_void_p
+        k32.Process32FirstW.argtypes = [ctypes.c_void_p, ctypes.POINTER(PROCESSENTRY32W)]
+        k32.Process32FirstW.restype = wintypes.BOOL
+        k32.Process32NextW.argtypes = [ctypes.c_void_p, ctypes.POINTER(PROCESSENTRY32W)]
+        k32.Process32NextW.restype = wintypes.BOOL
+        k32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        k32.OpenProcess.restype = ctypes.c_void_p
+        k32.CloseHandle.argtypes = [ctypes.c_void_p]
+        k32.QueryFullProcessImageNameW.argtypes = [ctypes.c_void_p, wintypes.DWORD,
+                                                   ctypes.c_wchar_p, ctypes.POINTER(wintypes.DWORD)]
+        k32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+        ntdll = ctypes.WinDLL('ntdll')
+        ntdll.NtQueryInformationProcess.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p,
+                                                    ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong)]
+        ntdll.NtQueryInformationProcess.restype = ctypes.c_ulong
+        self._k32 = k32
+        self._ntdll = ntdll
+
+    def _snapshot(self) -> Iterator[ProcessInfo]:
+        """PID and exe name of every process (no handles opened)"""
+        ctypes = self._ctypes
+        snapshot = self._k32.CreateToolhelp32Snapshot(self.TH32CS_SNAPPROCESS, 0)
+        if not snapshot or snapshot == ctypes.c_void_p(-1).value:
+            return
+        try:
+            entry = self._PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(entry)
+            ok = self._k32.Process32FirstW(snapshot, ctypes.byref(entry))
+            while ok:
+                yield ProcessInfo(entry.th32ProcessID, entry.szExeFile)
+                ok = self._k32.Process32NextW(snapshot, ctypes.byref(entry))
+        finally:
+            self._k32.CloseHandle(snapshot)
+
+    def _fill_details(self, info: ProcessInfo) -> ProcessInfo:
+        """Read command line and image path for one process"""
+        ctypes = self._ctypes
+        handle = self._k32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, info.pid)
+        if not handle:
+            return info
+        try:
+            size = ctypes.c_ulong(0)
+            status = self._ntdll.NtQueryInformationProcess(
+                handle, self.ProcessCommandLineInformation, None, 0, ctypes.byref(size))
+            if status == self.STATUS_INFO_LENGTH_MISMATCH and size.value:
+                buf = ctypes.create_string_buffer(size.value)
+                status = self._ntdll.NtQueryInformationProcess(
+                    handle, self.ProcessCommandLineInformation, buf, size, ctypes.byref(size))
+                if status == 0:
+                    us = self._UNICODE_STRING.from_buffer(buf)
+                    if us.Buffer and us.Length:
+                        info.cmdline = ctypes.wstring_at(us.Buffer, us.Length // 2)
+
+            path_len = ctypes.c_ulong(1024)
+            path_buf = ctypes.create_unicode_buffer(path_len.value)
+            if self._k32.QueryFullProcessImageNameW(handle, 0, path_buf, ctypes.byref(path_len)):
+                info.exe = path_buf.value
+        finally:
+            self._k32.CloseHandle(handle)
+        return info
+
+    def processes(self) -> Iterator[ProcessInfo]:
+        for info in self._snapshot():
+            yield self._fill_details(info)
+
+    def find(self, name: str = CLIENT_PROCESS_NAME) -> List[ProcessInfo]:
+        # Only open handles for the processes we actually care about
+        wanted = name.lower()
+        return [self._fill_details(p) for p in self._snapshot() if p.name.lower() == wanted]
+
+
+_default_table = None
+
+
+def get_process_table() -> Optional[ProcessTable]:
+    """Process table for this OS, or None if it can't be read in-process"""
+    global _default_table
+    if _default_table is None:
+        try:
+            if os.name == 'nt':
+                _default_table = WindowsProcessTable()
+            elif sys.platform.startswith('linux') and os.path.isdir('/proc'):
+                _default_table = ProcFsProcessTable()
+        except Exception as e:
+            logging.warning(f"In-process process table unavailable: {e}")
+    return _default_table
@@ -0,0 +1,171 @@
+"""Payload projections for Skinergy Desktop Uploader
+
+Trims League client responses down to the records and fields the Skinergy
+site actually uses before they are cached or uploaded. The loot filter and
+skin schema are versioned tables; a newer `loot_filter.json` or
+`skin_schema.json` in the data dir replaces the built-in one without a code
+change.
+"""
+
+import json
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Set
+
+LOOT_FILTER_FILE = 'loot_filter.json'
+SKIN_SCHEMA_FILE = 'skin_schema.json'
+
+# Keep a loot record when any `match` field has one of the listed values,
+# then keep only `fields` of it (None keeps every field)
+DEFAULT_LOOT_FILTER = {
+    'version': 1,
+    'match': {
+        'type': ['SKIN', 'SKIN_RENTAL'],
+        'displayCategories': ['CHAMPION_SKIN'],
+    },
+    'fields': [
+        'count', 'disenchantValue', 'displayCategories', 'itemDesc', 'itemStatus',
+        'lootId', 'lootName', 'parentItemStatus', 'parentStoreItemId', 'rarity',
+        'redeemableStatus', 'storeItemId', 'type', 'value',
+    ],
+}
+
+
+# skins-minimal projection: a field maps to None (keep the value as is) or
+# to a nested field map (applied to a dict value or to each dict in a list).
+# `ignored` lists dotted paths we drop on purpose, so strict mode only warns
+# about fields the client has started sending since the schema was written.
+_OWNERSHIP = {
+    'owned': None,
+    'loyaltyReward': None,
+    'xboxGPReward': None,
+    'rental': {'rented': None},
+}
+DEFAULT_SKIN_SCHEMA = {
+    'version': 1,
+    'fields': {
+        'id': None,
+        'championId': None,
+        'name': None,
+        'isBase': None,
+        'disabled': None,
+        'stillObtainable': None,
+        'ownership': _OWNERSHIP,
+        'chromas': {
+            'id': None,
+            'championId': None,
+            'name': None,
+            'disabled': None,
+            'stillObtainable': None,
+            'ownership': _OWNERSHIP,
+        },
+    },
+    'ignored': [
+        'chromaPath', 'emblems', 'featuresText', 'lastSelected', 'rarityGemPath',
+        'splashPath', 'tilePath', 'uncenteredSplashPath', 'skinAugments', 'questSkinInfo',
+        'splashVideoPath', 'collectionSplashVideoPath', 'loadScreenPath', 'skinType',
+        'ownership.rental.endDate', 'ownership.rental.purchaseDate',
+        'ownership.rental.winCountRemaining',
+        'chromas.chromaPath', 'chromas.colors', 'chromas.lastSelected',
+        'chromas.ownership.rental.endDate', 'chromas.ownership.rental.purchaseDate',
+        'chromas.ownership.rental.winCountRemaining',
+    ],
+}
+
+
+def _valid_loot_filter(table) -> bool:
+    return (isinstance(table.get('match'), dict)
+            and all(isinstance(v, list) for v in table['match'].values())
+            and (table.get('fields') is None or isinstance(table.get('fields'), list)))
+
+
+def _valid_field_map(fields) -> bool:
+    return isinstance(fields, dict) and all(
+        spec is None or _valid_field_map(spec) for spec in fields.values())
+
+
+def _valid_skin_schema(table) -> bool:
+    return _valid_field_map(table.get('fields')) and isinstance(table.get('ignored', []), list)
+
+
+def _load_table(data_dir: Optional[str], filename: str, default: Dict,
+                is_valid: Callable[[Dict], bool]) -> Dict:
+    """Built-in table, or the data dir override if it is valid and not older"""
+    if not data_dir:
+        return default
+    path = os.path.join(data_dir, filename)
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                override = json.load(f)
+            if not (isinstance(override, dict) and isinstance(override.get('version'), int)
+                    and is_valid(override)):
+                logging.warning(f"Ignoring {filename}: not a valid table")
+            elif override['version'] < default['version']:
+                logging.warning(f"Ignoring {filename}: version {override['version']} "
+                                f"is older than built-in version {default['version']}")
+            else:
+                return override
+    except Exception as e:
+        logging.warning(f"Failed to load {filename}: {e}")
+    return default
+
+
+def load_loot_filter(data_dir: Optional[str]) -> Dict:
+    return _load_table(data_dir, LOOT_FILTER_FILE, DEFAULT_LOOT_FILTER, _valid_loot_filter)
+
+
+def load_skin_schema(data_dir: Optional[str]) -> Dict:
+    return _load_table(data_dir, SKIN_SCHEMA_FILE, DEFAULT_SKIN_SCHEMA, _valid_skin_schema)
+
+
+def filter_loot(items: List, table: Optional[Dict] = None) -> List[Dict]:
+    """Records matching the filter table, projected to its field list"""
+    table = table or DEFAULT_LOOT_FILTER
+    match = {field: set(values) for field, values in table['match'].items()}
+    fields = table.get('fields')
+    kept = []
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        if not any(item.get(field) in values for field, values in match.items()):
+            continue
+        kept.append(item if fields is None else {f: item[f] for f in fields if f in item})
+    return kept
+
+
+def _project(record: Dict, fields: Dict, path: str, ignored: Set[str],
+             unknown: Optional[Set[str]]) -> Dict:
+    projected = {}
+    for key, value in record.items():
+        if key not in fields:
+            if unknown is not None and path + key not in ignored:
+                unknown.add(path + key)
+            continue
+        spec = fields[key]
+        if spec is not None:
+            if isinstance(value, dict):
+                value = _project(value, spec, f"{path}{key}.", ignored, unknown)
+            elif isinstance(value, list):
+                value = [_project(v, spec, f"{path}{key}.", ignored, unknown) if isinstance(v, dict) else v
+                         for v in value]
+        projected[key] = value
+    return projected
+
+
+def project_skins(skins: List, schema: Optional[Dict] = None,
+                  unknown: Optional[Set[str]] = None) -> List:
+    """skins-minimal records reduced to the schema's fields
+
+    Pass a set as `unknown` (strict mode) to collect the dotted paths of
+    fields that are neither projected nor listed as ignored.
+    """
+    schema = schema or DEFAULT_SKIN_SCHEMA
+    ignored = set(schema.get('ignored') or ())
+    return [_project(s, schema['fields'], '', ignored, unknown) if isinstance(s, dict) else s
+            for s in skins or []]
+
+
+def json_size(value) -> int:
+    """Size of the compact JSON encoding, for logging savings"""
+    return len(json.dumps(value, separators=(',', ':')).encode('utf-8'))
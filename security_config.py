@@ -1,9 +1,16 @@
 """Security utilities for Skinergy Desktop Uploader"""
 
+import json
+import logging
+import math
 import os
 import re
+import threading
 import time
-from typing import Dict, Tuple
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+RATE_LIMIT_FILE = 'rate_limits.json'
 
 
 class SecurityConfig:
@@ -17,7 +24,35 @@ class SecurityConfig:
     SSL_VERIFY = True
     REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', '30'))
     LOG_SENSITIVE_DATA = False
+    LOG_KEEP_RUNS = int(os.getenv('LOG_KEEP_RUNS', '5'))  # previous runs kept as skin_fetcher.log.N
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+    LOG_JSON = os.getenv('LOG_JSON', '0') == '1'  # also write skin_fetcher.jsonl
     MAX_REQUESTS_PER_MINUTE = int(os.getenv('MAX_REQUESTS_PER_MINUTE', '10'))
+    # Per-endpoint budgets (requests per minute)
+    RATE_LIMITS = {
+        'auth_verify': int(os.getenv('AUTH_VERIFY_RATE_LIMIT', str(MAX_REQUESTS_PER_MINUTE))),
+        'upload_data': int(os.getenv('UPLOAD_RATE_LIMIT', str(MAX_REQUESTS_PER_MINUTE))),
+    }
+    RATE_LIMIT_SHARED = os.getenv('RATE_LIMIT_SHARED', '1') != '0'  # one budget for all instances
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '4'))
+    DISCOVERY_TIMEOUT = int(os.getenv('DISCOVERY_TIMEOUT', '10'))
+    DELTA_UPLOADS = os.getenv('DELTA_UPLOADS', '1') != '0'
+    UPLOAD_COMPRESSION = os.getenv('UPLOAD_COMPRESSION', 'auto')  # auto, gzip, zstd or none
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '2048'))
+    STREAM_UPLOADS = os.getenv('STREAM_UPLOADS', '1') != '0'  # chunked bodies for large uploads
+    CHUNKED_UPLOADS = os.getenv('CHUNKED_UPLOADS', '1') != '0'  # resumable upload sessions
+    UPLOAD_PART_BYTES = int(os.getenv('UPLOAD_PART_BYTES', str(512 * 1024)))
+    OFFLINE_SPOOL = os.getenv('OFFLINE_SPOOL', '1') != '0'  # queue uploads while the API is down
+    UNCHANGED_UPLOADS = os.getenv('UNCHANGED_UPLOADS', 'ping')  # ping, skip or upload
+    LOOT_FILTER = os.getenv('LOOT_FILTER', '1') != '0'  # upload only skin loot (see projections.py)
+    SKIN_PROJECTION = os.getenv('SKIN_PROJECTION', '1') != '0'  # slim skins-minimal records
+    PROJECTION_STRICT = os.getenv('PROJECTION_STRICT', '0') == '1'  # warn about unknown skin fields
+    LIVE_SYNC = os.getenv('LIVE_SYNC', '0') == '1'  # sync on client inventory events
+    LIVE_SYNC_DEBOUNCE = float(os.getenv('LIVE_SYNC_DEBOUNCE', '5'))
+    DAEMON_INTERVAL = int(os.getenv('DAEMON_INTERVAL', '3600'))  # seconds between --daemon syncs
+    # Extra install dirs or lockfiles (os.pathsep-separated), e.g. clients in other Wine prefixes
+    LEAGUE_LOCKFILES = [p for p in os.getenv('LEAGUE_LOCKFILES', '').split(os.pathsep) if p.strip()]
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', '4'))  # clients synced at once in --batch
     
     @classmethod
     def get_api_endpoints(cls) -> Dict[str, str]:
@@ -26,48 +61,50 @@ class SecurityConfig:
         return {
             'base': base,
             'auth_verify': f"{base}/auth/desktop-verify",
-            'upload_data': f"{base}/{cls.UPLOAD_ENDPOINT}"
+            'upload_data': f"{base}/{cls.UPLOAD_ENDPOINT}",
+            'upload_delta': f"{base}/{cls.UPLOAD_ENDPOINT}/delta",
+            'upload_unchanged': f"{base}/{cls.UPLOAD_ENDPOINT}/unchanged",
+            'upload_session': f"{base}/{cls.UPLOAD_ENDPOINT}/session"
         }
     
+    # Log redaction rules, applied in order: (keyword, pattern, replacement).
+    # The keyword is a lowercase substring every match must contain; lines
+    # without it skip that rule's regex entirely.
+    LOG_REDACTIONS = [
+        # Auth tokens and bearers
+        ('token', r'auth[_\s]?token[:\s]*[a-zA-Z0-9\-_]{10,}', 'auth_token: [REDACTED]'),
+        ('bearer', r'Bearer\s+[a-zA-Z0-9\-_]{10,}', 'Bearer [REDACTED]'),
+        ('token', r'token[:\s]+[a-zA-Z0-9\-_]{10,}', 'token: [REDACTED]'),
+        ('received auth token: ', r'Received auth token: [a-zA-Z0-9\-_]{10,}', 'Received auth token: [REDACTED]'),
+
+        # User and summoner IDs
+        ('user', r'user[_\s]?id[:\s]*[a-f0-9\-]{20,}', 'user_id: [REDACTED]'),
+        ('summoner', r'summoner[_\s]?id[:\s]*\d{6,}', 'summoner_id: [REDACTED]'),
+        ('user id: ', r'User ID: [a-f0-9\-]{20,}', 'User ID: [REDACTED]'),
+
+        # API endpoints and URLs
+        ('api endpoint: https://', r'API endpoint: https://[^\s]+', 'API endpoint: [REDACTED]'),
+        ('making request to: https://', r'Making request to: https://[^\s]+', 'Making request to: [API_ENDPOINT]'),
+        (' from: https://', r'Fetching [a-z]+ from: https://[^\s]+', 'Fetching data from: [LOCAL_ENDPOINT]'),
+
+        # Payload details section
+        ('=== payload details ===', r'=== PAYLOAD DETAILS ===.*?=== END PAYLOAD DETAILS ===',
+         '=== PAYLOAD DETAILS ===\n[PAYLOAD CONTENT REDACTED FOR SECURITY]\n=== END PAYLOAD DETAILS ==='),
+
+        # Sample data structures
+        ('sample skin entry:', r'Sample skin entry:.*?(?=\n\[|\n$)', 'Sample skin entry: [REDACTED]'),
+        ('sample loot entry:', r'Sample loot entry:.*?(?=\n\[|\n$)', 'Sample loot entry: [REDACTED]'),
+
+        # Response texts that might contain sensitive data
+        ('api response text: ', r'API response text: .*', 'API response text: [REDACTED]'),
+        ('verification response text: ', r'Verification response text: .*', 'Verification response text: [REDACTED]'),
+    ]
+
     @classmethod
     def sanitize_log_message(cls, message: str) -> str:
         """Strip out tokens, IDs, and other sensitive stuff from logs"""
         if not cls.LOG_SENSITIVE_DATA:
-            patterns = [
-                # Auth tokens and bearers
-                (r'auth[_\s]?token[:\s]*[a-zA-Z0-9\-_]{10,}', 'auth_token: [REDACTED]'),
-                (r'Bearer\s+[a-zA-Z0-9\-_]{10,}', 'Bearer [REDACTED]'),
-                (r'token[:\s]+[a-zA-Z0-9\-_]{10,}', 'token: [REDACTED]'),
-                (r'Received auth token: [a-zA-Z0-9\-_]{10,}', 'Received auth token: [REDACTED]'),
-                
-                # User and summoner IDs
-                (r'user[_\s]?id[:\s]*[a-f0-9\-]{20,}', 'user_id: [REDACTED]'),
-                (r'summoner[_\s]?id[:\s]*\d{6,}', 'summoner_id: [REDACTED]'),
-                (r'User ID: [a-f0-9\-]{20,}', 'User ID: [REDACTED]'),
-                
-                # API endpoints and URLs
-                (r'API endpoint: https://[^\s]+', 'API endpoint: [REDACTED]'),
-                (r'Making request to: https://[^\s]+', 'Making request to: [API_ENDPOINT]'),
-                (r'Fetching [a-z]+ from: https://[^\s]+', 'Fetching data from: [LOCAL_ENDPOINT]'),
-                
-                # Payload details section
-                (r'=== PAYLOAD DETAILS ===.*?=== END PAYLOAD DETAILS ===', 
-                 '=== PAYLOAD DETAILS ===\n[PAYLOAD CONTENT REDACTED FOR SECURITY]\n=== END PAYLOAD DETAILS ==='),
-                
-                # Sample data structures
-                (r'Sample skin entry:.*?(?=\n\[|\n$)', 'Sample skin entry: [REDACTED]'),
-                (r'Sample loot entry:.*?(?=\n\[|\n$)', 'Sample loot entry: [REDACTED]'),
-                
-                # Response texts that might contain sensitive data
-                (r'API response text: .*', 'API response text: [REDACTED]'),
-                (r'Verification response text: .*', 'Verification response text: [REDACTED]'),
-            ]
-            
-            sanitized = message
-            for pattern, replacement in patterns:
-                sanitized = re.sub(pattern, replacement, sanitized, flags=re.IGNORECASE | re.DOTALL)
-            
-            return sanitized
+            return _log_sanitizer.sanitize(message)
         
         return message
     
@@ -89,33 +126,164 @@ class SecurityConfig:
         return True, code
     
 
+class LogSanitizer:
+    """Applies redaction rules in order with precompiled patterns
+
+    For ASCII text IGNORECASE matching is plain lowercase comparison, so a
+    rule whose keyword isn't in the lowercased line can't match and is
+    skipped. Non-ASCII lines run every rule, because Unicode case folding
+    lets characters like U+212A (Kelvin sign) match 'k'.
+    """
+
+    def __init__(self, rules):
+        self.rules = [(keyword, re.compile(pattern, re.IGNORECASE | re.DOTALL), replacement)
+                      for keyword, pattern, replacement in rules]
+
+    def sanitize(self, message: str) -> str:
+        if not message.isascii():
+            for _, regex, replacement in self.rules:
+                message = regex.sub(replacement, message)
+            return message
+
+        lowered = message.lower()
+        for keyword, regex, replacement in self.rules:
+            if keyword in lowered:
+                sanitized = regex.sub(replacement, message)
+                if sanitized != message:
+                    # Later rules see the redacted text, same as sequential re.sub
+                    message = sanitized
+                    lowered = message.lower()
+        return message
+
+
+_log_sanitizer = LogSanitizer(SecurityConfig.LOG_REDACTIONS)
+
+
 class RateLimiter:
-    """Simple client-side rate limiter"""
-    
-    def __init__(self, max_requests: int = 10, window_minutes: int = 1):
+    """Client-side token bucket rate limiter
+
+    Holds up to `max_requests` tokens, refilled evenly over the window. With
+    a `state_file` the bucket is kept in that file under a file lock, so
+    every uploader instance on the machine (and a protocol-handler relaunch)
+    draws from the same budget.
+    """
+
+    def __init__(self, max_requests: int = 10, window_minutes: int = 1,
+                 state_file: Optional[str] = None, name: str = 'default'):
         self.max_requests = max_requests
         self.window_seconds = window_minutes * 60
-        self.requests = []
-    
+        self.rate = max_requests / self.window_seconds  # tokens per second
+        self.state_file = state_file
+        self.name = name
+        self.tokens = float(max_requests)
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
     def can_make_request(self) -> bool:
-        """Check if we're still under the rate limit"""
-        now = time.time()
-        
-        # Clean up old requests
-        self.requests = [req_time for req_time in self.requests 
-                        if now - req_time < self.window_seconds]
-        
-        # See if we can make another request
-        if len(self.requests) < self.max_requests:
-            self.requests.append(now)
-            return True
-        
-        return False
-    
+        """Take a token if one is available"""
+        def _take(tokens):
+            if tokens >= 1:
+                return tokens - 1, True
+            return tokens, False
+        return self._update(_take)
+
     def time_until_next_request(self) -> int:
-        """How many seconds until we can make another request"""
-        if not self.requests:
+        """How many seconds until we can make another request (takes nothing)"""
+        tokens = self._peek()
+        if tokens >= 1:
             return 0
-        
-        oldest_request = min(self.requests)
-        return max(0, int(self.window_seconds - (time.time() - oldest_request)))
\ No newline at end of file
+        return math.ceil((1 - tokens) / self.rate)
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        # A clock step backwards just refills nothing
+        return min(float(self.max_requests), tokens + max(0.0, now - updated) * self.rate)
+
+    def _update(self, change):
+        """Refill, apply `change(tokens) -> (tokens, result)` and return result"""
+        with self._lock:
+            if self.state_file:
+                try:
+                    return self._update_shared(change)
+                except OSError as e:
+                    logging.debug(f"Rate limit state unavailable, using in-process bucket: {e}")
+            now = time.time()
+            self.tokens, result = change(self._refill(self.tokens, self.updated, now))
+            self.updated = now
+            return result
+
+    def _peek(self) -> float:
+        """Tokens available now, without writing anything back"""
+        with self._lock:
+            now = time.time()
+            tokens = self._refill(self.tokens, self.updated, now)
+            if self.state_file:
+                # The file is only ever replaced whole, so reading needs no lock. Other
+                # instances only take tokens, so the lower count is the current one (and
+                # the in-process one if the file couldn't be written)
+                tokens = min(tokens, self._load_shared(now)[1])
+            return tokens
+
+    def _load_shared(self, now: float):
+        """(all buckets in the state file, this bucket's refilled tokens)"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if not isinstance(state, dict):
+                state = {}
+        except (OSError, ValueError):
+            state = {}
+        bucket = state.get(self.name)
+        try:
+            tokens = self._refill(float(bucket['tokens']), float(bucket['updated']), now)
+        except (TypeError, KeyError, ValueError):
+            tokens = float(self.max_requests)
+        return state, tokens
+
+    def _update_shared(self, change):
+        with _file_lock(self.state_file + '.lock'):
+            now = time.time()
+            state, tokens = self._load_shared(now)
+            tokens, result = change(tokens)
+            state[self.name] = {'tokens': tokens, 'updated': now}
+            tmp_path = self.state_file + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+            self.tokens, self.updated = tokens, now
+            return result
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock shared with other processes (blocks until acquired)"""
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10 s; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def create_rate_limiters(data_dir: Optional[str] = None) -> Dict[str, RateLimiter]:
+    """One limiter per rate-limited endpoint, shared through `data_dir` if enabled"""
+    state_file = None
+    if data_dir and SecurityConfig.RATE_LIMIT_SHARED:
+        state_file = os.path.join(data_dir, RATE_LIMIT_FILE)
+    return {endpoint: RateLimiter(max_requests, state_file=state_file, name=endpoint)
+            for endpoint, max_requests in SecurityConfig.RATE_LIMITS.items()}
@@ -0,0 +1,332 @@
+"""Upload snapshots and delta computation for Skinergy Desktop Uploader
+
+After every acknowledged upload we keep a compact snapshot (a 64-bit content
+hash of every skin, loot item and friend record) so the next sync can send
+only the records that changed. Snapshots are stored in a small binary format:
+a header with magic, format version and CRC32, then columnar sections (record
+keys + hashes per collection) that load without a JSON parse.
+"""
+
+import array
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_FILE = 'last_upload.snap'
+
+SNAPSHOT_MAGIC = b'SKSN'
+SNAPSHOT_FORMAT = 2
+# magic, format version, reserved, CRC32 of body, body length
+_HEADER = struct.Struct('<4sHHII')
+_U32 = struct.Struct('<I')
+_KEYS_INT = 0
+_KEYS_STR = 1
+_KEYS_INT32 = 2
+_INT32_MIN, _INT32_MAX = -2 ** 31, 2 ** 31 - 1
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Top-level payload fields that describe the account rather than the collection
+ACCOUNT_FIELDS = ('user_id', 'summoner_name', 'summoner_tag', 'icon', 'region', 'summoner_id')
+
+
+# Fields that change without the collection changing (selection, presence)
+VOLATILE_FIELDS = {
+    'skins': frozenset(('lastSelected',)),
+    'loot': frozenset(('isNew',)),
+    'friends': frozenset(('availability', 'lastSeenOnlineTimestamp', 'lol', 'patchline',
+                          'product', 'productName', 'statusMessage', 'time')),
+}
+
+
+def skin_key(skin: Dict) -> str:
+    return str(skin.get('id'))
+
+
+def loot_key(item: Dict) -> str:
+    return str(item.get('lootId') or item.get('lootName') or '')
+
+
+def friend_key(friend: Dict) -> str:
+    return str(friend.get('puuid') or friend.get('id') or friend.get('summonerId') or '')
+
+
+# Collection field -> record key, in payload order
+COLLECTIONS = (('skins', skin_key), ('loot', loot_key), ('friends', friend_key))
+_KEY_FUNCS = dict(COLLECTIONS)
+
+
+def _strip(record: Dict, fields) -> Dict:
+    """Shallow copy of a record without `fields`, also applied to lists of
+    sub-records such as a skin's chromas"""
+    stripped = {}
+    for key, value in record.items():
+        if key in fields:
+            continue
+        if isinstance(value, list) and value and isinstance(value[0], dict):
+            value = [_strip(v, fields) if isinstance(v, dict) else v for v in value]
+        stripped[key] = value
+    return stripped
+
+
+def normalize_payload(payload: Dict) -> Dict:
+    """Account fields plus sorted collections with volatile fields removed"""
+    normalized = {field: payload.get(field) for field in ACCOUNT_FIELDS}
+    for field, key in COLLECTIONS:
+        records = [r for r in payload.get(field) or [] if isinstance(r, dict)]
+        normalized[field] = [_strip(r, VOLATILE_FIELDS[field]) for r in sorted(records, key=key)]
+    return normalized
+
+
+def _canonical(value) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'),
+                      ensure_ascii=False, default=str).encode('utf-8')
+
+
+def record_hash(field: str, record: Dict) -> int:
+    """64-bit hash of a whole record (chromas and all) minus its volatile fields"""
+    digest = hashlib.blake2b(_canonical(_strip(record, VOLATILE_FIELDS[field])), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def record_hashes(payload: Dict, field: str) -> Dict[str, int]:
+    """Record key -> record_hash for one collection of a payload"""
+    key = _KEY_FUNCS[field]
+    return {key(r): record_hash(field, r) for r in payload.get(field) or [] if isinstance(r, dict)}
+
+
+def payload_version(payload: Dict) -> str:
+    """Stable content hash of an upload payload
+
+    Identical collections hash the same regardless of record order or
+    presence/selection state, so repeat uploads can be detected.
+    """
+    digest = hashlib.sha256()
+    for field, value in normalize_payload(payload).items():
+        digest.update(field.encode('utf-8'))
+        digest.update(_canonical(value))
+    return digest.hexdigest()
+
+
+def build_snapshot(payload: Dict, version: Optional[str] = None) -> Dict:
+    """Reduce a full payload to the state needed for the next diff"""
+    return {
+        'user_id': payload.get('user_id'),
+        'summoner_id': payload.get('summoner_id'),
+        'version': version or payload_version(payload),
+        'saved_at': time.time(),
+        **{field: record_hashes(payload, field) for field, _ in COLLECTIONS},
+    }
+
+
+def _diff(base: Dict[str, int], payload: Dict, field: str,
+          hashes: Optional[Dict[str, int]]) -> Tuple[List[Dict], List[Dict], List[str]]:
+    """(added, changed, removed keys) of one collection against its base hashes"""
+    key = _KEY_FUNCS[field]
+    added: List[Dict] = []
+    changed: List[Dict] = []
+    seen = set()
+    for record in payload.get(field) or []:
+        if not isinstance(record, dict):
+            continue
+        record_key = key(record)
+        seen.add(record_key)
+        if record_key not in base:
+            added.append(record)
+        elif base[record_key] != (hashes[record_key] if hashes is not None
+                                  else record_hash(field, record)):
+            changed.append(record)
+    return added, changed, sorted(set(base) - seen)
+
+
+def compute_delta(base: Dict, payload: Dict, version: str, current: Optional[Dict] = None) -> Dict:
+    """Diff a full payload against the last acknowledged snapshot
+
+    Any record whose content hash differs from the snapshot is sent whole.
+    `current` is build_snapshot(payload) if the caller already has it, so
+    the records aren't hashed twice.
+    """
+    def diff(field):
+        return _diff(base.get(field) or {}, payload, field, current[field] if current else None)
+
+    skins_added, skins_changed, skins_removed = diff('skins')
+    loot_added, loot_changed, loot_removed = diff('loot')
+    friends_added, friends_changed, friends_removed = diff('friends')
+
+    delta = {field: payload.get(field) for field in ACCOUNT_FIELDS}
+    delta.update({
+        'mode': 'delta',
+        'base_version': base.get('version'),
+        'version': version,
+        'skins_added': skins_added,
+        'skins_changed': skins_changed,
+        'skins_removed': skins_removed,
+        'loot_changed': loot_added + loot_changed,
+        'loot_removed': loot_removed,
+        'friends_added': friends_added,
+        'friends_changed': friends_changed,
+        'friends_removed': friends_removed,
+    })
+    return delta
+
+
+def delta_size(delta: Dict) -> int:
+    """Number of changed records in a delta"""
+    return sum(len(delta.get(k) or []) for k in (
+        'skins_added', 'skins_changed', 'skins_removed', 'loot_changed',
+        'loot_removed', 'friends_added', 'friends_changed', 'friends_removed'))
+
+
+def is_compatible(base: Optional[Dict], payload: Dict) -> bool:
+    """A snapshot can only be a delta base for the same user and summoner"""
+    return bool(base and base.get('version')
+                and base.get('user_id') == payload.get('user_id')
+                and str(base.get('summoner_id')) == str(payload.get('summoner_id')))
+
+
+class SnapshotError(ValueError):
+    """Snapshot file is truncated, corrupt or from an unknown format version"""
+
+
+def _le(values: array.array) -> bytes:
+    """Array contents in little-endian byte order"""
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data) -> array.array:
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _int_keys(keys: List[str]) -> Optional[List[int]]:
+    """Keys as ints if every one is a canonical int64 decimal, else None"""
+    ints = []
+    for key in keys:
+        try:
+            value = int(key)
+        except ValueError:
+            return None
+        if str(value) != key or not _INT64_MIN <= value <= _INT64_MAX:
+            return None
+        ints.append(value)
+    return ints
+
+
+def _pack_keys(keys: List[str]) -> bytes:
+    ints = _int_keys(keys)
+    if ints is not None:
+        if all(_INT32_MIN <= i <= _INT32_MAX for i in ints):
+            return bytes([_KEYS_INT32]) + _U32.pack(len(ints)) + _le(array.array('i', ints))
+        return bytes([_KEYS_INT]) + _U32.pack(len(ints)) + _le(array.array('q', ints))
+    blob = '\x00'.join(k.replace('\x00', '') for k in keys).encode('utf-8')
+    return bytes([_KEYS_STR]) + _U32.pack(len(keys)) + _U32.pack(len(blob)) + blob
+
+
+class _Reader:
+    """Bounds-checked cursor over a snapshot body"""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def take(self, size: int) -> memoryview:
+        end = self.pos + size
+        if end > len(self.data):
+            raise SnapshotError("snapshot truncated")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def u32(self) -> int:
+        return _U32.unpack(self.take(4))[0]
+
+    def keys(self) -> List[str]:
+        kind = self.take(1)[0]
+        count = self.u32()
+        if kind == _KEYS_INT32:
+            return [str(k) for k in _from_le('i', self.take(count * 4))]
+        if kind == _KEYS_INT:
+            return [str(k) for k in _from_le('q', self.take(count * 8))]
+        if kind == _KEYS_STR:
+            blob = bytes(self.take(self.u32())).decode('utf-8')
+            keys = blob.split('\x00') if count else []
+            if len(keys) != count:
+                raise SnapshotError("snapshot key table is corrupt")
+            return keys
+        raise SnapshotError(f"unknown key encoding {kind}")
+
+
+def encode_snapshot(snapshot: Dict) -> bytes:
+    """Serialize a build_snapshot() dict to the binary snapshot format"""
+    meta = {k: snapshot.get(k) for k in ('user_id', 'summoner_id', 'version', 'saved_at')}
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+
+    parts = [_U32.pack(len(meta_bytes)), meta_bytes]
+    for field, _ in COLLECTIONS:
+        hashes = snapshot.get(field) or {}
+        parts.append(_pack_keys(list(hashes)))
+        parts.append(_le(array.array('Q', hashes.values())))
+    body = b''.join(parts)
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, 0, zlib.crc32(body), len(body)) + body
+
+
+def decode_snapshot(data: bytes) -> Dict:
+    """Parse the binary snapshot format back into a build_snapshot() dict"""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("snapshot truncated")
+    magic, version, _, crc, length = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("not a snapshot file")
+    if version != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"unsupported snapshot format {version}")
+    body = data[_HEADER.size:]
+    if len(body) != length or zlib.crc32(body) != crc:
+        raise SnapshotError("snapshot checksum mismatch")
+
+    reader = _Reader(body)
+    snapshot = json.loads(bytes(reader.take(reader.u32())).decode('utf-8'))
+    for field, _ in COLLECTIONS:
+        keys = reader.keys()
+        snapshot[field] = dict(zip(keys, _from_le('Q', reader.take(len(keys) * 8))))
+    return snapshot
+
+
+def load_snapshot(data_dir: Optional[str], filename: str = SNAPSHOT_FILE) -> Optional[Dict]:
+    """Load the last acknowledged snapshot (or another snapshot file), or None"""
+    if not data_dir:
+        return None
+    path = os.path.join(data_dir, filename)
+    try:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return decode_snapshot(f.read())
+    except Exception as e:
+        logging.warning(f"Failed to load upload snapshot: {e}")
+        return None
+
+
+def save_snapshot(data_dir: Optional[str], snapshot: Dict, filename: str = SNAPSHOT_FILE):
+    """Atomically persist a snapshot (after the server acknowledged it)"""
+    if not data_dir:
+        return
+    try:
+        final_path = os.path.join(data_dir, filename)
+        tmp_path = f"{final_path}.tmp.{int(time.time())}"
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_snapshot(snapshot))
+        os.replace(tmp_path, final_path)
+    except Exception as e:
+        logging.warning(f"Failed to save upload snapshot: {e}")
+
@@ -0,0 +1,175 @@
+"""Background auto-sync for Skinergy Desktop Uploader (--daemon)
+
+Runs the sync pipeline without any window: once shortly after the League
+client starts and then every DAEMON_INTERVAL seconds while it stays up.
+Triggers are coalesced into a single worker, so at most one sync runs at a
+time, and an unchanged collection is never re-uploaded.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from client_watcher import ClientWatcher
+from lcu_events import LcuEventSubscriber
+from security_config import SecurityConfig
+from sync_engine import (STATUS_AUTH_EXPIRED, STATUS_NOT_AUTHORIZED, STATUS_QUEUED,
+                         SkinSyncEngine, SyncResult)
+
+
+def lower_priority():
+    """Drop this process to below-normal CPU (and I/O) priority"""
+    try:
+        if os.name == 'nt':
+            import ctypes
+            BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), BELOW_NORMAL_PRIORITY_CLASS)
+        else:
+            os.nice(10)
+    except Exception as e:
+        logging.debug(f"Could not lower process priority: {e}")
+
+
+class SyncDaemon:
+    """Schedules syncs from client start events, live events and a timer
+
+    `get_auth` returns (auth_token, user_id) and is called before every sync,
+    so authorizing in the window later is picked up without a restart.
+    """
+
+    CONNECT_DELAY = 10.0     # the lockfile appears before the client API answers
+    RETRY_DELAY = 30.0
+    JITTER = 0.1             # +/- fraction of the interval, spreads post-patch load
+
+    def __init__(self, engine: SkinSyncEngine,
+                 get_auth: Callable[[], Tuple[Optional[str], Optional[str]]],
+                 interval: Optional[float] = None,
+                 on_auth_expired: Optional[Callable[[], None]] = None,
+                 live_sync: Optional[bool] = None):
+        self.engine = engine
+        self.get_auth = get_auth
+        self.interval = float(interval or SecurityConfig.DAEMON_INTERVAL)
+        self.on_auth_expired = on_auth_expired
+        self.live_sync = SecurityConfig.LIVE_SYNC if live_sync is None else live_sync
+        self.client_running = False
+        self.last_result: Optional[SyncResult] = None
+        self.sync_count = 0
+        self._failures = 0
+        self._reasons: List[str] = []
+        self._next_due: Optional[float] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._watcher: Optional[ClientWatcher] = None
+        self._subscriber: Optional[LcuEventSubscriber] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def request_sync(self, reason: str, delay: float = 0.0):
+        """Ask for a sync within `delay` seconds; merges with any pending request"""
+        due = time.monotonic() + delay
+        with self._lock:
+            if reason not in self._reasons:
+                self._reasons.append(reason)
+            if self._next_due is None or due < self._next_due:
+                self._next_due = due
+        self._wake.set()
+
+    def start(self):
+        self._watcher = ClientWatcher(self.engine.lockfile_candidates, self._on_client_change,
+                                      fallback_check=self.engine.is_league_running)
+        self._watcher.start()
+        self._thread = threading.Thread(target=self._run, name="sync-daemon", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._watcher:
+            self._watcher.stop()
+        if self._subscriber:
+            self._subscriber.stop()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until stop() is called; True if stopped"""
+        return self._stop.wait(timeout)
+
+    def _on_client_change(self, is_running: bool):
+        was_running, self.client_running = self.client_running, is_running
+        if is_running:
+            self.engine.log("League client detected")
+            self._failures = 0
+            self.request_sync("client started", delay=self.CONNECT_DELAY)
+            if self.live_sync and self._subscriber is None:
+                self._subscriber = LcuEventSubscriber(
+                    self.engine.get_league_connection_info,
+                    lambda uris: self.request_sync("collection changed"),
+                    debounce=SecurityConfig.LIVE_SYNC_DEBOUNCE)
+                self._subscriber.start()
+        else:
+            if was_running:
+                self.engine.log("League client closed")
+            self.engine.invalidate_connection()
+            if self._subscriber:
+                self._subscriber.stop()
+                self._subscriber = None
+            with self._lock:
+                # Nothing to fetch until it comes back; the restart triggers a sync
+                self._reasons = []
+                self._next_due = None
+
+    def _schedule(self, delay: float):
+        with self._lock:
+            if self._reasons:
+                return  # something new came in while we were syncing
+            self._next_due = time.monotonic() + delay
+
+    def _interval_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.JITTER, 1 + self.JITTER)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                due = self._next_due
+            timeout = None if due is None else max(0.0, due - time.monotonic())
+            if timeout is None or timeout > 0:
+                self._wake.wait(timeout)
+                self._wake.clear()
+                continue
+            if self._stop.is_set():
+                break
+            with self._lock:
+                reasons = self._reasons or ["scheduled"]
+                self._reasons = []
+                self._next_due = None
+            if not self.client_running:
+                continue
+            self._sync(reasons)
+
+    def _sync(self, reasons: List[str]):
+        auth_token, user_id = self.get_auth()
+        if not auth_token or not user_id:
+            self.engine.log("⚠ Not authorized - skipping sync (authorize in the app first)")
+            self._schedule(self._interval_delay())
+            return
+
+        self.engine.log(f"=== Auto-sync ({', '.join(reasons)}) ===")
+        result = self.engine.run(auth_token, user_id, skip_unchanged=True)
+        self.last_result = result
+        self.sync_count += 1
+        self.engine.log(("✓ " if result.ok else "✗ ") + result.message)
+
+        if result.ok or result.status == STATUS_QUEUED:
+            # A queued upload is the spool drainer's job now, no need to fetch again
+            self._failures = 0
+            self._schedule(self._interval_delay())
+        elif result.status in (STATUS_AUTH_EXPIRED, STATUS_NOT_AUTHORIZED):
+            if result.status == STATUS_AUTH_EXPIRED and self.on_auth_expired:
+                self.on_auth_expired()
+            self._schedule(self._interval_delay())
+        else:
+            self._failures += 1
+            self._schedule(min(self.RETRY_DELAY * 2 ** (self._failures - 1), self.interval))
@@ -0,0 +1,1364 @@
+"""Headless sync pipeline for Skinergy Desktop Uploader
+
+Everything between finding the League client and uploading to Skinergy lives
+here so it can run without the Tkinter window (see --headless).
+"""
+
+import itertools
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+import chunked_upload
+import projections
+import snapshots
+from client_watcher import pid_alive, read_lockfile
+from http_client import (SessionManager, compress_body, compress_stream, iter_json,
+                         parse_accept_encoding, upload_encoding)
+from process_table import ProcessTable, get_process_table, parse_client_args
+from security_config import SecurityConfig
+from upload_spool import SpoolDrainer, UploadSpool
+
+
+# Result statuses returned by SkinSyncEngine.run()
+STATUS_SUCCESS = 'success'
+STATUS_UNCHANGED = 'unchanged'
+STATUS_NO_CLIENT = 'no_client'
+STATUS_CLIENT_ERROR = 'client_error'
+STATUS_NOT_AUTHORIZED = 'not_authorized'
+STATUS_AUTH_EXPIRED = 'auth_expired'
+STATUS_UPLOAD_FAILED = 'upload_failed'
+STATUS_CONNECTION_ERROR = 'connection_error'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+STATUS_BASE_REJECTED = 'base_rejected'
+STATUS_TOO_LARGE = 'too_large'
+STATUS_SERVER_UNAVAILABLE = 'server_unavailable'
+STATUS_QUEUED = 'queued'
+
+# Delta upload responses that mean "send everything instead"
+# (404: server has no delta endpoint, 409/412: base version unknown or stale)
+DELTA_FALLBACK_STATUSES = (404, 409, 412)
+
+# Upload failures that mean "try again later", so the collection is spooled
+SPOOL_STATUSES = (STATUS_CONNECTION_ERROR, STATUS_TIMEOUT, STATUS_SERVER_UNAVAILABLE)
+
+# Process exit codes used by --headless
+EXIT_CODES = {
+    STATUS_SUCCESS: 0,
+    STATUS_UNCHANGED: 0,
+    STATUS_ERROR: 1,
+    STATUS_NO_CLIENT: 2,
+    STATUS_CLIENT_ERROR: 3,
+    STATUS_NOT_AUTHORIZED: 4,
+    STATUS_AUTH_EXPIRED: 4,
+    STATUS_UPLOAD_FAILED: 5,
+    STATUS_SERVER_UNAVAILABLE: 5,
+    STATUS_CONNECTION_ERROR: 6,
+    STATUS_TIMEOUT: 6,
+    STATUS_QUEUED: 7,
+}
+
+_CREATE_NO_WINDOW = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+
+# Remembered League install dirs, so discovery can go straight to the lockfile
+CLIENT_PATHS_FILE = 'client_paths.json'
+
+
+class SyncResult:
+    """Outcome of one sync run"""
+
+    def __init__(self, status: str, message: str = '', popup_title: str = 'Error',
+                 popup_msg: Optional[str] = None):
+        self.status = status
+        self.message = message
+        self.popup_title = popup_title
+        self.popup_msg = popup_msg
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (STATUS_SUCCESS, STATUS_UNCHANGED)
+
+    @property
+    def exit_code(self) -> int:
+        return EXIT_CODES.get(self.status, 1)
+
+    def __repr__(self):
+        return f"SyncResult({self.status!r}, {self.message!r})"
+
+
+class SkinSyncEngine:
+    """GUI-free connect -> summoner -> skins -> loot -> friends -> upload pipeline
+
+    `log` receives plain log lines and `progress` receives (text, step, stage)
+    updates, so the window (or a console) can follow along.
+
+    `tables_dir` is where loot_filter.json / skin_schema.json overrides are
+    read from (default: data_dir). The offline spool is `spool` if given,
+    otherwise one in data_dir; `offline_spool=False` means no spool at all.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None,
+                 log: Optional[Callable[[str], None]] = None,
+                 progress: Optional[Callable[[str, Optional[int], Optional[str]], None]] = None,
+                 process_table: Optional[ProcessTable] = None,
+                 export_json: bool = False,
+                 tables_dir: Optional[str] = None,
+                 spool: Optional[UploadSpool] = None,
+                 offline_spool: bool = True):
+        self.data_dir = data_dir
+        self.tables_dir = tables_dir or data_dir
+        # Also write readable skins.json / skinsLoot.json (--export-json)
+        self.export_json = export_json
+        self.process_table = process_table if process_table is not None else get_process_table()
+        self._log = log
+        self._progress = progress
+        self.api_endpoints = SecurityConfig.get_api_endpoints()
+        self.sessions = SessionManager()
+        self.delta_supported = SecurityConfig.DELTA_UPLOADS
+        self.unchanged_ping_supported = True
+        self.chunked_supported = SecurityConfig.CHUNKED_UPLOADS
+        self._reported_fields = set()
+        self.accepted_encodings = set()
+        self.compression_disabled = False
+        self.stream_uploads = SecurityConfig.STREAM_UPLOADS
+        self.bytes_uploaded = 0  # request bodies sent to the API, as sent (compressed)
+        self.spool = spool
+        self.spool_drainer = None
+        if spool is None and offline_spool and data_dir and SecurityConfig.OFFLINE_SPOOL:
+            try:
+                self.spool = UploadSpool(data_dir)
+            except Exception as e:
+                logging.warning(f"Offline upload spool unavailable: {e}")
+        self._upload_lock = threading.RLock()
+        self._connection = None
+        self._connection_lock = threading.Lock()
+        self._install_dirs = None
+        self._paths_lock = threading.Lock()
+        self._strategy_context = threading.local()
+        # Per-strategy timings so the discovery order can be tuned from real data
+        self.last_discovery = {'winner': None, 'timings': {}}
+        self.discovery_stats: Dict[str, Dict] = {}
+
+    def log(self, message: str):
+        """Send a message to the log callback (or the logging module)"""
+        if self._log:
+            self._log(message)
+        else:
+            logging.info(SecurityConfig.sanitize_log_message(message))
+
+    def progress(self, text: str, step: Optional[int] = None, stage: Optional[str] = None):
+        """Report pipeline progress; `stage` is the short spinner text"""
+        if self._progress:
+            self._progress(text, step, stage)
+        else:
+            self.log(f"Progress: {text}")
+
+    # --- Skinergy API ---
+
+    def verify_auth_code(self, code: str) -> requests.Response:
+        """POST a validated auth code to the desktop-verify endpoint"""
+        response = self.sessions.api().post(
+            self.api_endpoints['auth_verify'],
+            json={"code": code},
+            headers={"Content-Type": "application/json"},
+            timeout=SecurityConfig.REQUEST_TIMEOUT
+        )
+        self._note_accepted_encodings(response)
+        return response
+
+    # --- League client discovery ---
+
+    def is_league_running(self) -> bool:
+        """Check if League client is currently running"""
+        if self.process_table is not None:
+            try:
+                return bool(self.process_table.find())
+            except Exception as e:
+                logging.debug(f"Process table lookup failed: {e}")
+        try:
+            result = subprocess.run(
+                ['tasklist', '/FI', 'IMAGENAME eq LeagueClientUx.exe'],
+                capture_output=True, text=True, timeout=5,
+                creationflags=_CREATE_NO_WINDOW
+            )
+            return 'LeagueClientUx.exe' in result.stdout
+        except Exception:
+            return False
+
+    def get_summoner_name_quick(self) -> Optional[str]:
+        """Try to get the logged-in summoner name from the League client API."""
+        try:
+            port, token = self.get_league_connection_info()
+            if not port or not token:
+                return None
+            resp = self.lcu_get(port, token, "/lol-summoner/v1/current-summoner", timeout=3)
+            if resp.status_code == 200:
+                data = resp.json()
+                name = data.get('gameName') or data.get('displayName') or ''
+                tag = data.get('tagLine', '')
+                if name and tag:
+                    return f"{name}#{tag}"
+                return name or None
+        except Exception:
+            pass
+        return None
+
+    def get_league_connection_info(self) -> Tuple[Optional[str], Optional[str]]:
+        """Get League client connection details
+
+        Reuses the last discovered (port, token) while its lockfile, lockfile
+        mtime and client PID are unchanged. Otherwise the in-process strategies
+        run first (they take milliseconds), then the subprocess ones race each
+        other under DISCOVERY_TIMEOUT and the first valid answer wins.
+        """
+        cached = self._cached_connection()
+        if cached:
+            return cached
+
+        self.log("Attempting to find League client connection info...")
+        record = {'winner': None, 'timings': {}}
+
+        for method_name, method in (("Process table", self.try_process_table),
+                                    ("Known lockfile", self.try_known_lockfiles)):
+            result = self._timed_strategy(method_name, method, record)
+            if result:
+                self._record_discovery(record, method_name)
+                self._cache_connection(*result)
+                return result
+
+        methods = [
+            ("WMIC", self.try_wmic),
+            ("PowerShell", self.try_powershell),
+            ("Lockfile", self.try_lockfile)
+        ]
+        result = self._race_strategies(methods, record, SecurityConfig.DISCOVERY_TIMEOUT)
+        if result:
+            # Only the winner is cached; abandoned losers may still answer later
+            self._cache_connection(*result)
+            return result
+
+        self._record_discovery(record, None)
+        self.log("✗ All methods failed to find League connection")
+        return None, None
+
+    def _timed_strategy(self, method_name, method, record, procs=None):
+        """Run one discovery strategy, recording its duration"""
+        self._strategy_context.procs = procs
+        start = time.monotonic()
+        port = token = None
+        try:
+            port, token = method()
+        except Exception as e:
+            self.log(f"✗ {method_name} method error: {str(e)}")
+        finally:
+            self._strategy_context.procs = None
+            elapsed = time.monotonic() - start
+            with self._connection_lock:
+                record['timings'][method_name] = round(elapsed, 4)
+                stats = self.discovery_stats.setdefault(method_name, {'runs': 0, 'wins': 0, 'total_time': 0.0})
+                stats['runs'] += 1
+                stats['total_time'] += elapsed
+
+        if port and token:
+            self.log(f"✓ Found connection via {method_name}: port {port} ({elapsed * 1000:.0f} ms)")
+            return port, token
+        self.log(f"✗ {method_name} method failed ({elapsed * 1000:.0f} ms)")
+        return None
+
+    def _race_strategies(self, methods, record, deadline):
+        """Run strategies concurrently and return the first valid (port, token)
+
+        Losers are abandoned: queued ones are cancelled and any wmic/PowerShell
+        children they started are killed.
+        """
+        procs = set()
+        pool = ThreadPoolExecutor(max_workers=len(methods), thread_name_prefix="lcu-discovery")
+        futures = {pool.submit(self._timed_strategy, name, method, record, procs): name
+                   for name, method in methods}
+        winner = None
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                result = future.result()
+                if result:
+                    winner = (futures[future], result)
+                    break
+        except FuturesTimeout:
+            self.log(f"✗ Connection discovery timed out after {deadline}s")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            with self._connection_lock:
+                for proc in list(procs):
+                    try:
+                        proc.kill()
+                    except Exception:
+                        pass
+
+        if winner:
+            self._record_discovery(record, winner[0])
+            return winner[1]
+        return None
+
+    def _record_discovery(self, record, winner):
+        """Log which strategy won and how long each took
+
+        Abandoned strategies keep adding their timings to `record` (which is
+        self.last_discovery) when they finish.
+        """
+        with self._connection_lock:
+            record['winner'] = winner
+            if winner:
+                self.discovery_stats[winner]['wins'] += 1
+            self.last_discovery = record
+            timings = dict(record['timings'])
+        timings = ", ".join(f"{name} {secs * 1000:.0f} ms" for name, secs in timings.items())
+        self.log(f"Discovery winner: {winner or 'none'} ({timings})")
+
+    def _run_command(self, args, shell=False):
+        """Run a discovery helper process; returns (returncode, stdout)
+
+        The process is registered with the current race so it can be killed
+        once another strategy wins.
+        """
+        procs = getattr(self._strategy_context, 'procs', None)
+        proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                shell=shell, creationflags=_CREATE_NO_WINDOW)
+        if procs is not None:
+            with self._connection_lock:
+                procs.add(proc)
+        try:
+            stdout, _ = proc.communicate(timeout=SecurityConfig.DISCOVERY_TIMEOUT)
+            return proc.returncode, stdout
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return -1, ''
+        finally:
+            if procs is not None:
+                with self._connection_lock:
+                    procs.discard(proc)
+
+    def _cached_connection(self) -> Optional[Tuple[str, str]]:
+        """Return the cached (port, token) if its client identity still matches"""
+        with self._connection_lock:
+            cached = self._connection
+        if not cached:
+            return None
+
+        lockfile = cached.get('lockfile')
+        if lockfile:
+            info = read_lockfile(lockfile)
+            if (not info or info['mtime'] != cached['mtime'] or info['pid'] != cached['pid']
+                    or not pid_alive(info['pid'], written_at=info['mtime'])):
+                self.log("League client changed since last connection, rediscovering")
+                self.invalidate_connection()
+                return None
+        return cached['port'], cached['token']
+
+    def _cache_connection(self, port, token):
+        """Remember (port, token) together with the lockfile that produced it"""
+        entry = {'port': str(port), 'token': token, 'lockfile': None, 'mtime': None, 'pid': None}
+        for path in self.lockfile_candidates():
+            info = read_lockfile(path)
+            if info and info['port'] == str(port) and info['token'] == token:
+                entry.update(lockfile=path, mtime=info['mtime'], pid=info['pid'])
+                self._remember_install_dir(os.path.dirname(path))
+                break
+        with self._connection_lock:
+            self._connection = entry
+
+    def invalidate_connection(self):
+        """Forget the cached connection (401, connection error or client exit)"""
+        with self._connection_lock:
+            had_connection = self._connection is not None
+            self._connection = None
+        if had_connection:
+            self.sessions.reset_lcu()
+
+    def _load_install_dirs(self):
+        """Install dirs found on earlier runs, most recent first"""
+        if self._install_dirs is None:
+            self._install_dirs = []
+            if self.data_dir:
+                try:
+                    path = os.path.join(self.data_dir, CLIENT_PATHS_FILE)
+                    if os.path.exists(path):
+                        with open(path, 'r', encoding='utf-8') as f:
+                            self._install_dirs = list(json.load(f).get('install_dirs', []))
+                except Exception as e:
+                    logging.warning(f"Failed to load {CLIENT_PATHS_FILE}: {e}")
+        return self._install_dirs
+
+    def _remember_install_dir(self, install_dir):
+        """Persist a League install dir so later runs can skip process lookups"""
+        # Wine reports Windows paths that don't exist on the host
+        if not install_dir or not os.path.isdir(install_dir):
+            return
+        install_dir = os.path.normpath(install_dir)
+        with self._paths_lock:
+            self._save_install_dir(install_dir)
+
+    def _save_install_dir(self, install_dir):
+        dirs = self._load_install_dirs()
+        if dirs and dirs[0] == install_dir:
+            return
+        self._install_dirs = [install_dir] + [d for d in dirs if d != install_dir][:4]
+        if self.data_dir:
+            try:
+                path = os.path.join(self.data_dir, CLIENT_PATHS_FILE)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump({'install_dirs': self._install_dirs}, f)
+            except Exception as e:
+                logging.warning(f"Failed to save {CLIENT_PATHS_FILE}: {e}")
+
+    def lockfile_candidates(self):
+        """Lockfile paths in remembered, configured (LEAGUE_LOCKFILES) and default install dirs"""
+        dirs = list(self._load_install_dirs()) + [
+            os.path.expandvars(r"%LOCALAPPDATA%\Riot Games\League of Legends"),
+            r"C:\Riot Games\League of Legends",
+        ]
+        paths = []
+        for entry in SecurityConfig.LEAGUE_LOCKFILES:
+            entry = os.path.expanduser(entry.strip())
+            path = entry if os.path.basename(entry) == 'lockfile' else os.path.join(entry, 'lockfile')
+            if path not in paths:
+                paths.append(path)
+        for d in dirs:
+            path = os.path.join(d, 'lockfile')
+            if path not in paths:
+                paths.append(path)
+        return paths
+
+    def discover_clients(self) -> List[Dict]:
+        """Every running client as {port, token, pid, source}, one entry per port
+
+        Unlike get_league_connection_info this doesn't stop at the first
+        match: all LeagueClientUx processes plus every live lockfile (other
+        installs, Wine prefixes listed in LEAGUE_LOCKFILES).
+        """
+        clients = {}
+        if self.process_table is not None:
+            for process in self.process_table.find():
+                args = parse_client_args(process.cmdline)
+                if args['port'] and args['token']:
+                    clients.setdefault(args['port'], {'port': args['port'], 'token': args['token'],
+                                                      'pid': process.pid, 'source': 'process'})
+        for path in self.lockfile_candidates():
+            info = read_lockfile(path)
+            if info and pid_alive(info['pid'], written_at=info['mtime']):
+                clients.setdefault(info['port'], {'port': info['port'], 'token': info['token'],
+                                                  'pid': info['pid'], 'source': path})
+        return list(clients.values())
+
+    def try_process_table(self):
+        """Read LeagueClientUx's command line in-process (no wmic/PowerShell)"""
+        if self.process_table is None:
+            return None, None
+        for process in self.process_table.find():
+            args = parse_client_args(process.cmdline)
+            if args['port'] and args['token']:
+                self._remember_install_dir(args['install_dir'])
+                if process.exe:
+                    self._remember_install_dir(os.path.dirname(process.exe))
+                return args['port'], args['token']
+        return None, None
+
+    def try_known_lockfiles(self):
+        """Read lockfiles in known install dirs without spawning any process"""
+        for path in self.lockfile_candidates():
+            info = read_lockfile(path)
+            if info and pid_alive(info['pid'], written_at=info['mtime']):
+                return info['port'], info['token']
+        return None, None
+
+    def try_wmic(self):
+        """Try to get info using wmic"""
+        cmd = 'wmic PROCESS WHERE "name=\'LeagueClientUx.exe\'" GET commandline /format:list'
+        returncode, stdout = self._run_command(cmd, shell=True)
+
+        if returncode == 0 and stdout:
+            args = parse_client_args(stdout)
+            if args['port'] and args['token']:
+                self._remember_install_dir(args['install_dir'])
+                return args['port'], args['token']
+
+        return None, None
+
+    def try_powershell(self):
+        """Try to get info using PowerShell"""
+        ps_cmd = '''
+        $process = Get-Process LeagueClientUx -ErrorAction SilentlyContinue
+        if ($process) {
+            $commandLine = (Get-CimInstance Win32_Process -Filter "ProcessId = $($process.Id)").CommandLine
+            Write-Output $commandLine
+        }
+        '''
+
+        returncode, stdout = self._run_command(['powershell', '-Command', ps_cmd])
+
+        if returncode == 0 and stdout:
+            args = parse_client_args(stdout)
+            if args['port'] and args['token']:
+                self._remember_install_dir(args['install_dir'])
+                return args['port'], args['token']
+
+        return None, None
+
+    def try_lockfile(self):
+        """Try to read League's lockfile"""
+        possible_paths = self.lockfile_candidates()
+
+        if self.process_table is not None:
+            for process in self.process_table.find():
+                if process.exe and os.path.isabs(process.exe):
+                    possible_paths.insert(0, os.path.join(os.path.dirname(process.exe), 'lockfile'))
+            return self._read_first_lockfile(possible_paths)
+
+        try:
+            returncode, stdout = self._run_command(
+                ['wmic', 'process', 'where', 'name="LeagueClientUx.exe"', 'get', 'ExecutablePath'], shell=True)
+
+            if returncode == 0:
+                lines = stdout.split('\n')
+                for line in lines:
+                    if 'League of Legends' in line and '.exe' in line:
+                        league_dir = os.path.dirname(line.strip())
+                        lockfile_path = os.path.join(league_dir, 'lockfile')
+                        possible_paths.insert(0, lockfile_path)
+                        break
+        except Exception:
+            pass
+
+        return self._read_first_lockfile(possible_paths)
+
+    def _read_first_lockfile(self, paths):
+        """(port, token) from the first readable lockfile"""
+        for path in paths:
+            info = read_lockfile(path)
+            if info:
+                self._remember_install_dir(os.path.dirname(path))
+                return info['port'], info['token']
+
+        return None, None
+
+    # --- League client data ---
+
+    def lcu_get(self, port, token, path: str, timeout: int = 10) -> requests.Response:
+        """GET a League client endpoint"""
+        url = f"https://127.0.0.1:{port}{path}"
+        try:
+            response = self.sessions.lcu(port, token).get(url, timeout=timeout)
+        except requests.exceptions.ConnectionError:
+            # Client restarted or exited - the cached port/token are stale
+            self.invalidate_connection()
+            raise
+        if response.status_code == 401:
+            self.invalidate_connection()
+        return response
+
+    def fetch_account(self, port, token) -> Optional[Dict]:
+        """Fetch summoner id, icon and Riot ID; returns None if the summoner call fails"""
+        summoner_url = f"https://127.0.0.1:{port}/lol-summoner/v1/current-summoner"
+        self.log(f"Making request to: {summoner_url}")
+
+        response = self.lcu_get(port, token, "/lol-summoner/v1/current-summoner", timeout=10)
+        self.log(f"Summoner API response: {response.status_code}")
+
+        if response.status_code != 200:
+            self.log(f"✗ Failed to get summoner info: {response.status_code}")
+            return None
+
+        summoner_data = response.json()
+        summoner_id = summoner_data.get('summonerId')
+        initial_game_name = summoner_data.get('displayName', '').strip()
+        profile_icon_id = summoner_data.get('profileIconId', 0)
+
+        self.log(f"✓ Base summoner info: '{initial_game_name}' (ID: {summoner_id}, IconID: {profile_icon_id})")
+
+        # Get Riot ID (game name and tagline)
+        self.progress("Fetching Riot ID...")
+
+        final_game_name = initial_game_name
+        tagline = "N/A"
+        platform_id = "N/A"
+
+        # Try a few different endpoints to get Riot ID
+        try:
+            chat_me_response = self.lcu_get(port, token, "/lol-chat/v1/me", timeout=10)
+            if chat_me_response.status_code == 200:
+                chat_data = chat_me_response.json()
+                fetched_game_name_from_chat = chat_data.get('gameName', '').strip()
+                fetched_tagline_from_chat = chat_data.get('gameTag', '').strip()
+                fetched_platform_id_from_chat = chat_data.get('platformId', '').strip()
+
+                if fetched_game_name_from_chat:
+                    final_game_name = fetched_game_name_from_chat
+                if fetched_tagline_from_chat:
+                    tagline = fetched_tagline_from_chat
+                if fetched_platform_id_from_chat:
+                    platform_id = fetched_platform_id_from_chat
+        except Exception:
+            pass
+
+        # Try account endpoint as fallback
+        if not final_game_name.strip() or final_game_name == initial_game_name or tagline == "N/A" or platform_id == "N/A":
+            try:
+                active_account_response = self.lcu_get(port, token, "/lol-account/v1/active-account", timeout=10)
+                if active_account_response.status_code == 200:
+                    account_data = active_account_response.json()
+                    fetched_game_name_from_account = account_data.get('gameName', '').strip()
+                    fetched_tagline_from_account = account_data.get('tagLine', '').strip()
+                    fetched_platform_id_from_account = account_data.get('platformId', '').strip()
+
+                    if fetched_game_name_from_account and (not final_game_name.strip() or final_game_name == initial_game_name):
+                        final_game_name = fetched_game_name_from_account
+                    if fetched_tagline_from_account and tagline == "N/A":
+                        tagline = fetched_tagline_from_account
+                    if fetched_platform_id_from_account and platform_id == "N/A":
+                        platform_id = fetched_platform_id_from_account
+            except Exception:
+                pass
+
+        # Last resort: summoner Riot ID endpoint
+        if not final_game_name.strip() or final_game_name == initial_game_name or tagline == "N/A":
+            try:
+                riot_id_response = self.lcu_get(port, token, "/lol-summoner/v1/current-summoner/riot-id", timeout=10)
+                if riot_id_response.status_code == 200:
+                    riot_id_data = riot_id_response.json()
+                    fetched_game_name_from_summoner_riot_id = riot_id_data.get('gameName', '').strip()
+                    fetched_tagline_from_summoner_riot_id = riot_id_data.get('tagLine', '').strip()
+
+                    if fetched_game_name_from_summoner_riot_id and (not final_game_name.strip() or final_game_name == initial_game_name):
+                        final_game_name = fetched_game_name_from_summoner_riot_id
+                    if fetched_tagline_from_summoner_riot_id and tagline == "N/A":
+                        tagline = fetched_tagline_from_summoner_riot_id
+            except Exception:
+                pass
+
+        # Make sure we have something
+        if not final_game_name.strip() or (final_game_name == initial_game_name and not initial_game_name.strip()):
+            final_game_name = "Player"
+
+        if not tagline or tagline == "N/A":
+            tagline = "N/A"
+        if not platform_id or platform_id == "N/A":
+            platform_id = "UNKNOWN"
+
+        self.log(f"✓ Connected as: {final_game_name}#{tagline} (Region: {platform_id})")
+
+        return {
+            "summoner_id": summoner_id,
+            "summoner_name": final_game_name,
+            "summoner_tag": tagline,
+            "icon": profile_icon_id,
+            "region": platform_id,
+        }
+
+    def fetch_skin_inventory(self, port, token, summoner_id):
+        """Fetch skins-minimal; returns None on a non-200 response"""
+        response = self.lcu_get(port, token, f"/lol-champions/v1/inventories/{summoner_id}/skins-minimal", timeout=15)
+        self.log(f"Skins API response: {response.status_code}")
+
+        if response.status_code != 200:
+            self.log(f"✗ Failed to fetch skins: {response.status_code}")
+            return None
+
+        skins_data = response.json()
+        skin_count = len(skins_data) if isinstance(skins_data, list) else 0
+        self.log(f"✓ Fetched {skin_count} skins")
+        if self.export_json:
+            self._save_json("skins.json", skins_data)
+        if SecurityConfig.SKIN_PROJECTION and isinstance(skins_data, list):
+            skins_data = self._project_skins(skins_data)
+        return skins_data
+
+    def _project_skins(self, skins_data):
+        """Slim skins-minimal records to the projection schema"""
+        schema = projections.load_skin_schema(self.tables_dir)
+        unknown = set() if SecurityConfig.PROJECTION_STRICT else None
+        projected = projections.project_skins(skins_data, schema, unknown)
+        if unknown:
+            new_fields = sorted(unknown - self._reported_fields)
+            self._reported_fields.update(new_fields)
+            if new_fields:
+                self.log(f"⚠ Skin schema v{schema['version']} does not cover new client fields: "
+                         f"{', '.join(new_fields[:20])}")
+        return projected
+
+    def fetch_loot(self, port, token):
+        """Fetch player loot; failures are logged and give an empty list"""
+        loot_data = []
+        try:
+            response = self.lcu_get(port, token, "/lol-loot/v1/player-loot", timeout=15)
+            self.log(f"Loot API response: {response.status_code}")
+
+            if response.status_code == 200:
+                loot_data = response.json()
+                loot_count = len(loot_data) if isinstance(loot_data, list) else 0
+                self.log(f"✓ Fetched {loot_count} loot items")
+                if self.export_json:
+                    self._save_json("skinsLoot.json", loot_data)
+                if SecurityConfig.LOOT_FILTER and isinstance(loot_data, list):
+                    loot_data = self._filter_loot(loot_data)
+        except Exception as e:
+            self.log(f"⚠ Loot fetch error: {str(e)}")
+        return loot_data
+
+    def _filter_loot(self, loot_data):
+        """Keep only skin loot, trimmed to the fields the site uses"""
+        table = projections.load_loot_filter(self.tables_dir)
+        before = projections.json_size(loot_data)
+        filtered = projections.filter_loot(loot_data, table)
+        after = projections.json_size(filtered)
+        self.log(f"Loot filter v{table['version']}: kept {len(filtered)} of {len(loot_data)} items, "
+                 f"{before} -> {after} bytes ({before - after} removed)")
+        return filtered
+
+    def fetch_friends(self, port, token):
+        """Fetch the friends list for auto-friending; failures give an empty list"""
+        friends_data = []
+        try:
+            friends_response = self.lcu_get(port, token, "/lol-chat/v1/friends", timeout=10)
+            self.log(f"Friends API response: {friends_response.status_code}")
+
+            if friends_response.status_code == 200:
+                all_friends = friends_response.json()
+                friends_data = all_friends if isinstance(all_friends, list) else []
+                self.log(f"✓ Fetched {len(friends_data)} friends from League client")
+                if self.export_json:
+                    self._save_json("friends.json", friends_data)
+            else:
+                self.log(f"⚠ Friends API returned status {friends_response.status_code}")
+        except Exception as e:
+            self.log(f"⚠ Friends fetch error: {str(e)}")
+        return friends_data
+
+    def fetch_collection(self, port, token, summoner_id):
+        """Fetch skins, loot and friends concurrently
+
+        Loot and friends failures are isolated inside their fetchers; a skins
+        failure gives None (or re-raises) just like the sequential version.
+        """
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="lcu-fetch") as pool:
+            skins_future = pool.submit(self.fetch_skin_inventory, port, token, summoner_id)
+            loot_future = pool.submit(self.fetch_loot, port, token)
+            friends_future = pool.submit(self.fetch_friends, port, token)
+
+            loot_data = loot_future.result()
+            friends_data = friends_future.result()
+            skins_data = skins_future.result()
+
+        self.log(f"Fetched collection in {time.monotonic() - start:.2f}s")
+        return skins_data, loot_data, friends_data
+
+    def _save_json(self, filename: str, data):
+        """Atomically write readable JSON to the data dir (best effort)"""
+        if not self.data_dir:
+            return
+        try:
+            tmp_path = os.path.join(self.data_dir, f"{filename}.tmp.{int(time.time())}")
+            final_path = os.path.join(self.data_dir, filename)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, final_path)
+            self.log(f"✓ Saved {filename} to: {final_path}")
+        except Exception as e:
+            self.log(f"✗ Failed to save {filename}: {e}")
+
+    # --- Upload ---
+
+    def upload_collection(self, payload: Dict, auth_token: str,
+                          skip_unchanged: bool = False, fetched_at: Optional[float] = None,
+                          from_spool: bool = False, data_dir: Optional[str] = None) -> SyncResult:
+        """Upload only what changed since the last acknowledged snapshot
+
+        Falls back to a full upload when there is no usable base or the server
+        rejects it; the snapshot is only replaced once the server says 200/201.
+
+        If the content hash matches the snapshot, UNCHANGED_UPLOADS decides:
+        'ping' sends just the hash, 'skip' sends nothing, 'upload' uploads as
+        usual. `skip_unchanged` (the --daemon) always sends nothing.
+
+        When the API is unreachable the collection goes to the offline spool
+        and STATUS_QUEUED is returned (not for uploads from the spool itself).
+        `data_dir` overrides where the snapshot lives (a spooled upload of
+        another --batch account).
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        snapshot_dir = data_dir or self.data_dir
+        with self._upload_lock:
+            version = snapshots.payload_version(payload)
+            current = snapshots.build_snapshot(payload, version)
+            result = self._upload_versioned(payload, version, current, auth_token, skip_unchanged,
+                                            snapshot_dir)
+
+            if result.ok:
+                snapshots.save_snapshot(snapshot_dir, current)
+                if self.spool is not None:
+                    # Anything spooled for this user is older than what the server now has
+                    self.spool.discard(str(payload.get('user_id')), fetched_before=fetched_at)
+            elif result.status in SPOOL_STATUSES and self.spool is not None and not from_spool:
+                result = self._spool_upload(payload, fetched_at, result)
+            return result
+
+    def _upload_versioned(self, payload: Dict, version: str, current: Dict, auth_token: str,
+                          skip_unchanged: bool, snapshot_dir: Optional[str]) -> SyncResult:
+        base = snapshots.load_snapshot(snapshot_dir)
+        result = None
+
+        if snapshots.is_compatible(base, payload) and base['version'] == version:
+            result = self._upload_unchanged(payload, version, auth_token, skip_unchanged)
+            if result is not None and result.status == STATUS_BASE_REJECTED:
+                # Server no longer has this version, so it can't be a delta base either
+                self.log("⚠ Server does not know the last upload - sending full collection")
+                base = None
+                result = None
+            elif result is not None:
+                return result
+
+        if self.delta_supported and snapshots.is_compatible(base, payload):
+            delta = snapshots.compute_delta(base, payload, version, current)
+            self.log(f"Uploading delta: {snapshots.delta_size(delta)} changed records since last upload")
+            result = self.upload(delta, auth_token, url=self.api_endpoints['upload_delta'])
+            if result.status == STATUS_BASE_REJECTED:
+                self.log("⚠ Server rejected delta base - falling back to full upload")
+                result = None
+            elif result.status == STATUS_TOO_LARGE:
+                self.log("⚠ Delta too large for the server - falling back to full upload")
+                result = None
+
+        if result is None:
+            full_payload = dict(payload, version=version)
+            result = self._upload_full(full_payload, auth_token)
+        return result
+
+    def _spool_upload(self, payload: Dict, fetched_at: float, failed: SyncResult) -> SyncResult:
+        """Keep a collection the API couldn't take for the drainer to send later"""
+        try:
+            self.spool.put(payload, fetched_at, delay=SpoolDrainer.RETRY_BASE, data_dir=self.data_dir)
+        except Exception as e:
+            self.log(f"✗ Could not queue the upload: {e}")
+            return failed
+        self.notify_spool()
+        self.log(f"⚠ {failed.message} - collection saved, it will be uploaded automatically")
+        return SyncResult(STATUS_QUEUED, f"{failed.message} - upload queued",
+                          popup_title="Upload Queued",
+                          popup_msg="Skinergy servers can't be reached right now.\n\n"
+                                    "Your collection was saved and will be uploaded automatically "
+                                    "while the app is open.")
+
+    def upload_spooled(self, payload: Dict, auth_token: str, fetched_at: float,
+                       data_dir: Optional[str] = None) -> SyncResult:
+        """Upload a spooled collection unless a newer upload already replaced it
+
+        `data_dir` is the account's own data dir the entry was spooled with.
+        """
+        with self._upload_lock:
+            if not self.spool.contains(str(payload.get('user_id')), fetched_at):
+                return SyncResult(STATUS_UNCHANGED, "Queued upload superseded by a newer one")
+            return self.upload_collection(payload, auth_token, fetched_at=fetched_at, from_spool=True,
+                                          data_dir=data_dir)
+
+    def start_spool_drainer(self, get_token: Callable[[str], Optional[str]]):
+        """Upload spooled collections in the background (get_token: user_id -> token)"""
+        if self.spool is None or self.spool_drainer is not None:
+            return
+        self.spool_drainer = SpoolDrainer(self.spool, self.upload_spooled, get_token,
+                                          retry_statuses=SPOOL_STATUSES,
+                                          auth_statuses=(STATUS_AUTH_EXPIRED, STATUS_NOT_AUTHORIZED),
+                                          log=self.log)
+        self.spool_drainer.start()
+
+    def stop_spool_drainer(self):
+        if self.spool_drainer is not None:
+            self.spool_drainer.stop()
+            self.spool_drainer = None
+
+    def notify_spool(self):
+        """Look at the spool now (e.g. a new auth token can send what was waiting)"""
+        if self.spool_drainer is not None:
+            self.spool_drainer.notify()
+
+    def _upload_unchanged(self, payload: Dict, version: str, auth_token: str,
+                          skip_unchanged: bool) -> Optional[SyncResult]:
+        """Handle a collection identical to the last upload
+
+        Returns None to upload as usual, or STATUS_BASE_REJECTED when the
+        server has lost that version and needs a full upload.
+        """
+        policy = 'skip' if skip_unchanged else (SecurityConfig.UNCHANGED_UPLOADS or 'ping').lower()
+        if policy == 'upload':
+            return None
+
+        if policy == 'ping' and self.unchanged_ping_supported:
+            self.log("Collection unchanged since last upload - sending hash only")
+            ping = {field: payload.get(field) for field in ('user_id', 'summoner_id')}
+            ping.update(mode='unchanged', version=version)
+            result = self.upload(ping, auth_token, url=self.api_endpoints['upload_unchanged'])
+            # A 404 only means the server has no ping endpoint (now switched off)
+            if not result.ok and self.unchanged_ping_supported:
+                return result
+
+        self.log("✓ Collection unchanged since last upload - nothing to upload")
+        return SyncResult(STATUS_UNCHANGED, "Collection unchanged since last upload")
+
+    def upload(self, payload: Dict, auth_token: str, url: Optional[str] = None) -> SyncResult:
+        """POST the payload to upload_data with retries on 5xx and network errors"""
+        url = url or self.api_endpoints['upload_data']
+        mode = payload.get('mode')
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {auth_token}"
+        }
+
+        self.log("Uploading data to Skinergy servers...")
+
+        max_attempts = 3
+        backoff_base = 2
+        api_response = None
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                timeout_val = max(30, SecurityConfig.REQUEST_TIMEOUT)
+                api_response = self._post_json(url, payload, headers, timeout_val)
+
+                self.log(f"API response status: {getattr(api_response, 'status_code', 'NO_RESPONSE')}")
+
+                if api_response.status_code in (200, 201):
+                    self.log("✓ Data uploaded successfully!")
+                    return SyncResult(STATUS_SUCCESS, "Data uploaded successfully")
+                elif api_response.status_code == 401:
+                    # Authorization token is invalid/expired - need to re-authorize
+                    error_msg = "Authorization expired"
+                    try:
+                        error_data = api_response.json()
+                        error_msg = error_data.get('error', error_msg)
+                    except Exception:
+                        pass
+
+                    self.log(f"⚠ {error_msg} - please re-authorize")
+                    return SyncResult(STATUS_AUTH_EXPIRED, error_msg,
+                                      popup_title="Re-authorization Required",
+                                      popup_msg="Your authorization has expired.\n\nPlease get a new code from the Skinergy website and try again.")
+                elif mode in ('delta', 'unchanged') and api_response.status_code in DELTA_FALLBACK_STATUSES:
+                    if api_response.status_code == 404:
+                        # Endpoint not on this server, stop trying for this session
+                        if mode == 'delta':
+                            self.delta_supported = False
+                        else:
+                            self.unchanged_ping_supported = False
+                    self.log(f"⚠ {mode.capitalize()} upload not accepted (HTTP {api_response.status_code})")
+                    return SyncResult(STATUS_BASE_REJECTED, "Delta base rejected")
+                elif api_response.status_code == 413:
+                    self.log("⚠ Upload rejected as too large (HTTP 413)")
+                    return SyncResult(STATUS_TOO_LARGE, "Upload too large",
+                                      popup_title="Upload Error",
+                                      popup_msg="Failed to upload data.\n\nThe upload is too large for the server.")
+                elif api_response.status_code >= 500:
+                    if attempt < max_attempts:
+                        wait = backoff_base ** attempt
+                        self.log(f"Retrying upload in {wait}s (attempt {attempt + 1}/{max_attempts})")
+                        time.sleep(wait)
+                        continue
+                    else:
+                        break
+                else:
+                    error_msg = "Upload failed"
+                    try:
+                        error_data = api_response.json()
+                        error_msg = error_data.get('error', error_msg)
+                    except Exception:
+                        error_msg = getattr(api_response, 'text', error_msg)
+
+                    self.log(f"⚠ API upload failed: {error_msg}")
+                    break
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as rexc:
+                self.log(f"✗ Request exception during upload: {str(rexc)}")
+                if attempt < max_attempts:
+                    wait = backoff_base ** attempt
+                    self.log(f"Retrying upload in {wait}s (attempt {attempt + 1}/{max_attempts})")
+                    time.sleep(wait)
+                    continue
+                if isinstance(rexc, requests.exceptions.Timeout):
+                    return SyncResult(STATUS_TIMEOUT, "Request timeout - server took too long to respond",
+                                      popup_title="Timeout Error",
+                                      popup_msg="Server took too long to respond.\n\nPlease try again.")
+                return SyncResult(STATUS_CONNECTION_ERROR, "Connection error - cannot reach Skinergy servers",
+                                  popup_title="Connection Error",
+                                  popup_msg="Cannot connect to Skinergy servers.\n\nCheck your internet connection.")
+            except requests.exceptions.RequestException as rexc:
+                self.log(f"✗ Request exception during upload: {str(rexc)}")
+                if attempt < max_attempts:
+                    wait = backoff_base ** attempt
+                    self.log(f"Retrying upload in {wait}s (attempt {attempt + 1}/{max_attempts})")
+                    time.sleep(wait)
+                    continue
+                break
+
+        error_msg = "Upload failed after multiple attempts"
+        status = STATUS_UPLOAD_FAILED
+        if api_response is not None:
+            if api_response.status_code >= 500:
+                status = STATUS_SERVER_UNAVAILABLE
+            try:
+                error_data = api_response.json()
+                error_msg = error_data.get('error', error_msg)
+            except Exception:
+                pass
+        return SyncResult(status, f"Upload failed: {error_msg}",
+                          popup_title="Upload Error",
+                          popup_msg=f"Failed to upload data.\n\n{error_msg}")
+
+    def _upload_full(self, payload: Dict, auth_token: str) -> SyncResult:
+        """Full upload: one POST if it fits in a part, otherwise an upload session"""
+        parts = None
+        if self.chunked_supported:
+            header, parts = chunked_upload.split_payload(payload, SecurityConfig.UPLOAD_PART_BYTES)
+            if len(parts) > 1:
+                result = self._upload_chunked(payload, header, parts, auth_token)
+                if result.status != STATUS_BASE_REJECTED:
+                    return result
+
+        result = self.upload(payload, auth_token)
+        if result.status == STATUS_TOO_LARGE and self.chunked_supported:
+            self.log("Splitting the upload into parts")
+            if parts is None:
+                header, parts = chunked_upload.split_payload(payload, SecurityConfig.UPLOAD_PART_BYTES)
+            # Already fits in one part by our measure, so let the server's 413s split it
+            chunked = self._upload_chunked(payload, header, parts, auth_token)
+            if chunked.status != STATUS_BASE_REJECTED:
+                result = chunked
+        return result
+
+    def _upload_chunked(self, payload: Dict, header: Dict, parts, auth_token: str) -> SyncResult:
+        """Upload the collection as parts of one resumable upload session
+
+        Each round sends only the parts the server has not acknowledged, so a
+        dropped connection costs one part rather than the whole collection.
+        Returns STATUS_BASE_REJECTED when the server has no session endpoint
+        (the caller then sends a single body).
+        """
+        key = chunked_upload.session_key(payload)
+        session_url = self.api_endpoints['upload_session']
+        manifest = {
+            'user_id': payload.get('user_id'),
+            'summoner_id': payload.get('summoner_id'),
+            'version': payload.get('version'),
+            'header': header,
+            'sections': {s: len(payload.get(s) or []) for s in chunked_upload.UPLOAD_SECTIONS},
+        }
+        timeout_val = max(30, SecurityConfig.REQUEST_TIMEOUT)
+        session_id = None
+        acked = set()
+        item_cap = None  # records per part the server accepts, learned from 413s
+        max_attempts = 3
+        backoff_base = 2
+        stalled = 0
+        error = None
+
+        def _post(url, body, idempotency_key):
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {auth_token}",
+                "Idempotency-Key": idempotency_key,
+            }
+            return self._post_json(url, body, headers, timeout_val)
+
+        self.log(f"Uploading data to Skinergy servers in {len(parts)} parts...")
+        while True:
+            progressed = False
+            try:
+                if session_id is None:
+                    response = _post(session_url, manifest, key)
+                    if response.status_code == 404:
+                        self.log("⚠ Server does not support upload sessions - sending one body")
+                        self.chunked_supported = False
+                        return SyncResult(STATUS_BASE_REJECTED, "Upload sessions not supported")
+                    if response.status_code >= 500:
+                        error = response
+                    elif response.status_code not in (200, 201):
+                        return self._session_failure(response)
+                    else:
+                        data = response.json()
+                        session_id = data['session_id']
+                        part_ids = {part['id'] for part in parts}
+                        acked = {pid for pid in data.get('received') or [] if pid in part_ids}
+                        if acked:
+                            self.log(f"Resuming upload session: {len(acked)}/{len(parts)} parts already received")
+
+                index = 0
+                while session_id is not None and index < len(parts):
+                    part = parts[index]
+                    if part['id'] in acked:
+                        index += 1
+                        continue
+                    if item_cap is not None and len(part['items']) > item_cap:
+                        parts[index:index + 1] = chunked_upload.split_part(part, item_cap)
+                        continue
+                    try:
+                        response = _post(f"{session_url}/{session_id}/parts", part, f"{key}:{part['id']}")
+                    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as rexc:
+                        error = rexc
+                        self.log(f"✗ Part {part['id']} not acknowledged: {str(rexc)}")
+                        index += 1
+                        continue
+                    if response.status_code in (200, 201, 204):
+                        acked.add(part['id'])
+                        progressed = True
+                        index += 1
+                    elif response.status_code == 413:
+                        if len(part['items']) < 2:
+                            return self._session_failure(response)
+                        # Halve this part and, from now on, every part this big
+                        item_cap = len(part['items']) // 2
+                        self.log(f"Part {part['id']} too large for the server - "
+                                 f"sending at most {item_cap} records per part")
+                    elif response.status_code == 404:
+                        # Session expired on the server; a new one reports what it still has
+                        self.log("⚠ Upload session expired - starting a new one")
+                        session_id = None
+                        break
+                    elif response.status_code >= 500:
+                        error = response
+                        index += 1
+                    else:
+                        return self._session_failure(response)
+
+                if session_id is not None and len(acked) == len(parts):
+                    response = _post(f"{session_url}/{session_id}/commit",
+                                     {'version': payload.get('version'), 'parts': [p['id'] for p in parts]},
+                                     f"{key}:commit")
+                    self.log(f"API response status: {response.status_code}")
+                    if response.status_code in (200, 201):
+                        self.log(f"✓ Data uploaded successfully! ({len(parts)} parts)")
+                        return SyncResult(STATUS_SUCCESS, "Data uploaded successfully")
+                    if response.status_code == 409:
+                        missing = set((response.json() or {}).get('missing') or [])
+                        self.log(f"⚠ Server is missing {len(missing)} parts - resending them")
+                        acked -= missing
+                    elif response.status_code == 404:
+                        session_id = None
+                    elif response.status_code >= 500:
+                        error = response
+                    else:
+                        return self._session_failure(response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as rexc:
+                error = rexc
+                self.log(f"✗ Request exception during upload: {str(rexc)}")
+            except (requests.exceptions.RequestException, ValueError, KeyError) as exc:
+                error = exc
+                self.log(f"✗ Upload session error: {str(exc)}")
+
+            stalled = 0 if progressed else stalled + 1
+            if stalled >= max_attempts:
+                break
+            if stalled:
+                wait = backoff_base ** stalled
+                self.log(f"Retrying {len(parts) - len(acked)} unacknowledged parts in {wait}s "
+                         f"(attempt {stalled + 1}/{max_attempts})")
+                time.sleep(wait)
+
+        if isinstance(error, requests.exceptions.Timeout):
+            return SyncResult(STATUS_TIMEOUT, "Request timeout - server took too long to respond",
+                              popup_title="Timeout Error",
+                              popup_msg="Server took too long to respond.\n\nPlease try again.")
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return SyncResult(STATUS_CONNECTION_ERROR, "Connection error - cannot reach Skinergy servers",
+                              popup_title="Connection Error",
+                              popup_msg="Cannot connect to Skinergy servers.\n\nCheck your internet connection.")
+        return self._session_failure(error if isinstance(error, requests.Response) else None)
+
+    def _session_failure(self, response: Optional[requests.Response]) -> SyncResult:
+        """SyncResult for an upload session request the server refused"""
+        if response is not None and response.status_code == 401:
+            self.log("⚠ Authorization expired - please re-authorize")
+            return SyncResult(STATUS_AUTH_EXPIRED, "Authorization expired",
+                              popup_title="Re-authorization Required",
+                              popup_msg="Your authorization has expired.\n\nPlease get a new code from the Skinergy website and try again.")
+        error_msg = "Upload failed after multiple attempts"
+        status = STATUS_UPLOAD_FAILED
+        if response is not None:
+            if response.status_code >= 500:
+                status = STATUS_SERVER_UNAVAILABLE
+            try:
+                error_msg = response.json().get('error', error_msg)
+            except Exception:
+                error_msg = f"HTTP {response.status_code}"
+            self.log(f"⚠ API upload failed: {error_msg}")
+        return SyncResult(status, f"Upload failed: {error_msg}",
+                          popup_title="Upload Error",
+                          popup_msg=f"Failed to upload data.\n\n{error_msg}")
+
+    def _note_accepted_encodings(self, response: requests.Response):
+        """Remember request codings the API advertises via Accept-Encoding"""
+        header = response.headers.get('Accept-Encoding')
+        if header is not None:
+            self.accepted_encodings = parse_accept_encoding(header)
+
+    def _post_json(self, url: str, payload: Dict, headers: Dict, timeout) -> requests.Response:
+        """POST a JSON body, compressed when it is big enough to be worth it
+
+        Bodies that fit in one chunk are sent with a Content-Length; anything
+        bigger is encoded (and compressed) on the fly with chunked transfer
+        encoding, so the full JSON string is never held in memory.
+        """
+        chunks = iter_json(payload)
+        head = list(itertools.islice(chunks, 2))
+        if self.stream_uploads and len(head) > 1:
+            response, encoding = self._post_streamed(url, itertools.chain(head, chunks), headers, timeout)
+            if encoding and response.status_code == 415:
+                # Compression is off now; a plain body that got a 415 isn't worth repeating
+                response, _ = self._post_streamed(url, iter_json(payload), headers, timeout)
+            if response.status_code != 411:
+                return response
+            self.log("⚠ Server requires Content-Length - sending uploads in one piece")
+            self.stream_uploads = False
+            chunks = iter_json(payload)
+            head = []
+        return self._post_buffered(url, b''.join(itertools.chain(head, chunks)), headers, timeout)
+
+    def _post_streamed(self, url: str, chunks, headers: Dict,
+                       timeout) -> Tuple[requests.Response, Optional[str]]:
+        """POST body chunks with Transfer-Encoding: chunked; returns (response, Content-Encoding)"""
+        encoding = None if self.compression_disabled else upload_encoding(self.accepted_encodings)
+        sizes = {'raw': 0, 'sent': 0}
+
+        def _count(stream, key):
+            for chunk in stream:
+                sizes[key] += len(chunk)
+                yield chunk
+
+        body = _count(compress_stream(_count(chunks, 'raw'), encoding), 'sent')
+        if encoding:
+            headers = dict(headers, **{"Content-Encoding": encoding})
+        response = self.sessions.api().post(url, data=body, headers=headers, timeout=timeout)
+        self.bytes_uploaded += sizes['sent']
+        self._note_accepted_encodings(response)
+        self.log(f"Upload body: {sizes['raw']} bytes streamed"
+                 + (f", {sizes['sent']} bytes {encoding}" if encoding else ""))
+        if encoding and response.status_code == 415:
+            self.log(f"⚠ Server does not accept {encoding} uploads - sending uncompressed")
+            self.compression_disabled = True
+        return response, encoding
+
+    def _post_buffered(self, url: str, body: bytes, headers: Dict, timeout) -> requests.Response:
+        """POST a complete body with Content-Length
+
+        A 415 means the server can't decode our Content-Encoding, so resend
+        plain JSON and stop compressing for the rest of the session.
+        """
+        encoding = None
+        if not self.compression_disabled and len(body) >= SecurityConfig.COMPRESSION_MIN_BYTES:
+            encoding = upload_encoding(self.accepted_encodings)
+
+        if encoding:
+            compressed = compress_body(body, encoding)
+            self.log(f"Upload body: {len(body)} bytes, {len(compressed)} bytes {encoding}")
+            response = self.sessions.api().post(
+                url, data=compressed,
+                headers=dict(headers, **{"Content-Encoding": encoding}),
+                timeout=timeout
+            )
+            self.bytes_uploaded += len(compressed)
+            self._note_accepted_encodings(response)
+            if response.status_code != 415:
+                return response
+            self.log(f"⚠ Server does not accept {encoding} uploads - sending uncompressed")
+            self.compression_disabled = True
+
+        response = self.sessions.api().post(url, data=body, headers=headers, timeout=timeout)
+        self.bytes_uploaded += len(body)
+        self._note_accepted_encodings(response)
+        return response
+
+    # --- Pipeline ---
+
+    def run(self, auth_token: Optional[str], user_id: Optional[str],
+            skip_unchanged: bool = False,
+            connection: Optional[Tuple[str, str]] = None,
+            account: Optional[Dict] = None) -> SyncResult:
+        """Run the full connect -> fetch -> upload pipeline once
+
+        `connection` pins the (port, token) of one client instead of
+        discovering it (batch mode, several clients on one host), and
+        `account` is that client's fetch_account() result if the caller
+        already has it.
+        """
+        if not auth_token:
+            return SyncResult(STATUS_NOT_AUTHORIZED, "Not authorized - please enter authorization code first")
+
+        try:
+            # Find League client connection info
+            self.progress("Connecting to League client...", step=1, stage="Connecting")
+
+            port, token = connection or self.get_league_connection_info()
+
+            if not port or not token:
+                return SyncResult(STATUS_NO_CLIENT, "Could not find League client connection info",
+                                  popup_msg="League client not detected.\n\nOpen League and retry.")
+
+            self.log(f"✓ Connected to League client on port {port}")
+
+            # Get summoner account information
+            self.progress("Getting account information...", step=1, stage="Fetching account")
+            if account is None:
+                account = self.fetch_account(port, token)
+            if account is None:
+                return SyncResult(STATUS_CLIENT_ERROR, "Failed to get summoner info",
+                                  popup_msg="Failed to connect to League client.\n\nMake sure League is running and try again.")
+            if self.export_json:
+                # Names the account of the exported files (see bulk_upload.py)
+                self._save_json("account.json", dict(account, fetched_at=time.time()))
+
+            # Skins, loot and friends only need the summoner id, so fetch them together
+            self.progress("Fetching your skins, loot and friends...", step=1, stage="Fetching skins")
+            skins_data, loot_data, friends_data = self.fetch_collection(port, token, account["summoner_id"])
+            if skins_data is None:
+                return SyncResult(STATUS_CLIENT_ERROR, "Failed to fetch skins",
+                                  popup_msg="Failed to fetch skins from League client.\n\nTry again later.")
+
+            # Upload data to server
+            self.progress("Uploading data to server...", step=2, stage="Uploading")
+
+            if not user_id:
+                return SyncResult(STATUS_NOT_AUTHORIZED, "User ID not found. Please re-authorize.")
+
+            payload = {
+                "user_id": user_id,
+                "summoner_name": account["summoner_name"],
+                "summoner_tag": account["summoner_tag"],
+                "icon": account["icon"],
+                "region": account["region"],
+                "summoner_id": account["summoner_id"],
+                "skins": skins_data,
+                "loot": loot_data,
+                "friends": friends_data
+            }
+
+            self.log(f"Preparing to upload {len(payload.get('skins', []))} skins and {len(payload.get('loot', []))} loot items")
+
+            result = self.upload_collection(payload, auth_token, skip_unchanged=skip_unchanged)
+            if result.ok:
+                self.progress("Upload complete! Your skins are now synced.", step=3, stage="Done")
+            return result
+
+        except requests.exceptions.ConnectionError:
+            return SyncResult(STATUS_CONNECTION_ERROR, "Connection error - cannot reach League client",
+                              popup_msg="Failed to connect to League client.\n\nMake sure League is running and try again.")
+        except requests.exceptions.Timeout:
+            return SyncResult(STATUS_TIMEOUT, "Request timeout - League client took too long to respond",
+                              popup_title="Timeout Error",
+                              popup_msg="League client took too long to respond.\n\nPlease try again.")
+        except Exception as e:
+            return SyncResult(STATUS_ERROR, f"An unexpected error occurred: {str(e)}",
+                              popup_msg="An error occurred.\n\nPlease check the logs for details.")
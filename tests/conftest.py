@@ -0,0 +1,39 @@
+"""Shared fixtures: the repo root on sys.path and a local Skinergy API stand-in"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_api import FakeSkinergyApi  # noqa: E402
+from process_table import FakeProcessTable  # noqa: E402
+from security_config import SecurityConfig  # noqa: E402
+from sync_engine import SkinSyncEngine  # noqa: E402
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """A running FakeSkinergyApi that new engines upload to"""
+    server = FakeSkinergyApi()
+    monkeypatch.setattr(SecurityConfig, 'API_BASE_URL', server.start())
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def make_engine(api, tmp_path):
+    """Engine factory (data dir defaults to tmp_path) that closes its sessions afterwards"""
+    engines = []
+
+    def _make(data_dir=None, **kwargs):
+        kwargs.setdefault('log', lambda message: None)
+        kwargs.setdefault('process_table', FakeProcessTable([]))
+        engine = SkinSyncEngine(data_dir=str(data_dir or tmp_path), **kwargs)
+        engines.append(engine)
+        return engine
+
+    yield _make
+    for engine in engines:
+        engine.sessions.close()
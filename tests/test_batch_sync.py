@@ -0,0 +1,60 @@
+"""--batch against several local League clients"""
+
+import os
+import shutil
+
+import pytest
+
+import snapshots
+from account_store import AccountTokenStore
+from batch_sync import BatchSync, account_dir
+from benchmarks.fake_lcu import FakeLcuApi, make_self_signed_cert
+from benchmarks.synthetic import make_friends, make_loot, make_skins
+from process_table import FakeProcessTable, ProcessInfo
+from sync_engine import STATUS_NOT_AUTHORIZED, STATUS_SUCCESS
+
+pytestmark = [
+    pytest.mark.skipif(shutil.which('openssl') is None, reason="needs the openssl command"),
+    # The League client's certificate is self-signed; the app silences this warning too
+    pytest.mark.filterwarnings('ignore::urllib3.exceptions.InsecureRequestWarning'),
+]
+
+ACCOUNTS = (('Alpha', 'EUW', 101), ('Beta', 'NA1', 102), ('Gamma', 'KR', 103))
+
+
+@pytest.fixture(scope='module')
+def clients(tmp_path_factory):
+    certfile, keyfile = make_self_signed_cert(str(tmp_path_factory.mktemp('cert')))
+    servers = [FakeLcuApi(make_skins(50, seed=i), make_loot(30), make_friends(5), certfile, keyfile,
+                          token=f'lcu-{i}', game_name=name, tag_line=tag, summoner_id=summoner_id).start()
+               for i, (name, tag, summoner_id) in enumerate(ACCOUNTS)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def test_every_client_synced_into_its_own_account_dir(api, clients, tmp_path):
+    store = AccountTokenStore(str(tmp_path))
+    store.set('alpha#euw', 'token-a', 'user-a')
+    store.set('beta#na1', 'token-b', 'user-b')
+    table = FakeProcessTable([ProcessInfo(10 + i, 'LeagueClientUx.exe', lcu.cmdline)
+                              for i, lcu in enumerate(clients)])
+    hits_before = [dict(lcu.hits) for lcu in clients]
+
+    results = BatchSync(str(tmp_path), store=store, log=lambda message: None, workers=3,
+                        process_table=table).run()
+
+    statuses = {r.riot_id: r.result.status for r in results}
+    assert statuses == {'Alpha#EUW': STATUS_SUCCESS, 'Beta#NA1': STATUS_SUCCESS,
+                        'Gamma#KR': STATUS_NOT_AUTHORIZED}
+    assert sorted(api.collections) == ['user-a', 'user-b']
+    for lcu, before in zip(clients, hits_before):
+        summoner = '/lol-summoner/v1/current-summoner'
+        assert lcu.hits.get(summoner, 0) - before.get(summoner, 0) == 1  # identified once, not again in run()
+
+    alpha_dir = account_dir(str(tmp_path), 'alpha#euw')
+    assert snapshots.load_snapshot(alpha_dir)['user_id'] == 'user-a'
+    assert snapshots.load_snapshot(account_dir(str(tmp_path), 'beta#na1'))['user_id'] == 'user-b'
+    assert snapshots.load_snapshot(str(tmp_path)) is None
+    # One spool for all accounts, in the main data dir
+    assert os.listdir(alpha_dir) == [snapshots.SNAPSHOT_FILE]
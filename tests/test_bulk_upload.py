@@ -0,0 +1,68 @@
+"""--bulk uploads of exported snapshot sets"""
+
+import json
+
+from account_store import AccountTokenStore
+from benchmarks.synthetic import make_loot, make_skins
+from bulk_upload import STATUS_SUPERSEDED, BulkUploader
+from sync_engine import STATUS_SUCCESS
+
+
+def _write_set(folder, fetched_at, owned_skin=None):
+    folder.mkdir(parents=True)
+    skins = make_skins(40)
+    if owned_skin is not None:
+        skins[owned_skin]['ownership']['owned'] = not skins[owned_skin]['ownership']['owned']
+    (folder / 'skins.json').write_text(json.dumps(skins))
+    (folder / 'skinsLoot.json').write_text(json.dumps(make_loot(20)))
+    (folder / 'account.json').write_text(json.dumps({
+        'summoner_id': 42, 'summoner_name': 'Bulk', 'summoner_tag': 'EUW', 'fetched_at': fetched_at}))
+    return str(folder)
+
+
+def _uploader(data_dir):
+    store = AccountTokenStore(str(data_dir))
+    store.set('bulk#euw', 'token', 'user-bulk')
+    return BulkUploader(str(data_dir), store=store, log=lambda message: None, workers=2)
+
+
+def test_older_set_is_not_uploaded_after_a_newer_one(api, tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    root = tmp_path / 'sets'
+    _write_set(root / 'b-newer', fetched_at=200.0)
+
+    [result] = _uploader(data_dir).run(str(root))
+    assert result.status == STATUS_SUCCESS
+    version = api.collections['user-bulk']['version']
+
+    # A later run finds an older export of the same account next to the uploaded one
+    older = _write_set(root / 'a-older', fetched_at=100.0, owned_skin=3)
+    uploader = _uploader(data_dir)
+    results = uploader.run(str(root))
+    assert [(r.folder, r.status) for r in results] == [(older, STATUS_SUPERSEDED)]
+    assert uploader.skipped == 1
+    assert api.collections['user-bulk']['version'] == version
+
+    # Still skipped on the next run, even with the newer set gone
+    (root / 'b-newer' / 'skins.json').unlink()
+    assert _uploader(data_dir).run(str(root)) == []
+    assert api.stats['full'] == 1
+
+
+def test_reports_bytes_actually_sent(api, tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    root = tmp_path / 'sets'
+    _write_set(root / 'first', fetched_at=100.0)
+    [first] = _uploader(data_dir).run(str(root))
+    assert first.bytes_sent == api.stats['bytes_received']
+
+    _write_set(root / 'second', fetched_at=200.0, owned_skin=5)
+    received = api.stats['bytes_received']
+    [second] = _uploader(data_dir).run(str(root))
+    assert second.status == STATUS_SUCCESS
+    assert api.stats['deltas'] == 1
+    # The delta, not the size of the collection it stands for
+    assert second.bytes_sent == api.stats['bytes_received'] - received
+    assert second.bytes_sent < first.bytes_sent / 5
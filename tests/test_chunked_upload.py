@@ -0,0 +1,114 @@
+"""Resumable upload sessions against dropped connections and 413s"""
+
+import time
+import types
+
+import pytest
+
+import chunked_upload
+import sync_engine
+from benchmarks.fake_api import FakeSkinergyApi
+from benchmarks.synthetic import make_payload
+from security_config import SecurityConfig
+
+PART_BYTES = 16 * 1024
+
+
+@pytest.fixture(autouse=True)
+def no_retry_sleep(monkeypatch):
+    """Part and session retries return at once"""
+    fake_time = types.SimpleNamespace(time=time.time, monotonic=time.monotonic, sleep=lambda seconds: None)
+    monkeypatch.setattr(sync_engine, 'time', fake_time)
+    monkeypatch.setattr(SecurityConfig, 'UPLOAD_PART_BYTES', PART_BYTES)
+
+
+@pytest.fixture
+def payload():
+    payload = make_payload(skins=300, loot=100, friends=20)
+    payload.update(user_id='user-1', summoner_id=123456789)
+    return payload
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Start a FakeSkinergyApi with the given arguments for new engines to upload to"""
+    servers = []
+
+    def _serve(**server_args):
+        server = FakeSkinergyApi(**server_args)
+        monkeypatch.setattr(SecurityConfig, 'API_BASE_URL', server.start())
+        servers.append(server)
+        return server
+
+    yield _serve
+    for server in servers:
+        server.stop()
+
+
+def _stored_intact(server, payload):
+    stored = server.collections.get(payload['user_id'])
+    return stored is not None and all(stored.get(k) == v for k, v in payload.items())
+
+
+def test_payload_needs_several_parts(payload):
+    _, parts = chunked_upload.split_payload(payload, PART_BYTES)
+    assert len(parts) > 3
+
+
+def test_single_post(serve, make_engine, payload):
+    server = serve()
+    engine = make_engine()
+    engine.chunked_supported = False
+    assert engine.upload_collection(payload, 'token').ok
+    assert _stored_intact(server, payload)
+    assert server.stats['commits'] == 0
+
+
+def test_session_without_drops(serve, make_engine, payload):
+    server = serve()
+    _, parts = chunked_upload.split_payload(payload, PART_BYTES)
+    assert make_engine().upload_collection(payload, 'token').ok
+    assert _stored_intact(server, payload)
+    assert server.stats['commits'] == 1
+    assert server.stats['parts_applied'] == len(parts)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_session_with_dropped_connections(serve, make_engine, payload, seed):
+    server = serve(drop_rate=0.2, seed=seed)
+    assert make_engine().upload_collection(payload, 'token').ok
+    assert server.stats['dropped'] > 0
+    assert _stored_intact(server, payload)
+
+
+def test_interrupted_session_resumes_where_it_stopped(serve, make_engine, payload, tmp_path):
+    server = serve()
+    _, parts = chunked_upload.split_payload(payload, PART_BYTES)
+    handle = server.handle
+
+    def go_down_after_two_parts(path, body, key):
+        reply = handle(path, body, key)
+        if server.stats['parts_applied'] == 2:
+            server.unavailable = True
+        return reply
+
+    server.handle = go_down_after_two_parts
+    assert not make_engine(tmp_path / 'first').upload_collection(payload, 'token').ok
+    assert payload['user_id'] not in server.collections
+
+    server.handle = handle
+    server.unavailable = False
+    assert make_engine(tmp_path / 'second').upload_collection(payload, 'token').ok
+    assert _stored_intact(server, payload)
+    # The two parts from the first run were not sent again
+    assert server.stats['parts_applied'] == len(parts)
+
+
+def test_server_413s_split_the_parts(serve, make_engine, payload, monkeypatch):
+    # One part by our own measure, so every split comes from the server's 413s
+    monkeypatch.setattr(SecurityConfig, 'UPLOAD_PART_BYTES', 64 * 1024 * 1024)
+    server = serve(max_body_bytes=PART_BYTES)
+    assert make_engine().upload_collection(payload, 'token').ok
+    assert _stored_intact(server, payload)
+    assert server.stats['commits'] == 1
+    assert server.stats['parts_applied'] > 1
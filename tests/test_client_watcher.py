@@ -0,0 +1,152 @@
+"""League client detection through its lockfile"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import client_watcher
+from client_watcher import ClientWatcher, InotifyNotifier, PollingNotifier, create_notifier, pid_alive
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="needs Linux /proc")
+
+
+BOOT_TIME = 1_700_000_000
+
+
+def _write_proc(proc_root, pid, *argv, started_at=None):
+    os.makedirs(os.path.join(proc_root, str(pid)))
+    with open(os.path.join(proc_root, str(pid), 'cmdline'), 'wb') as f:
+        f.write(b'\0'.join(a.encode('utf-8') for a in argv) + b'\0')
+    if started_at is not None:
+        with open(os.path.join(proc_root, 'stat'), 'w') as f:
+            f.write(f"cpu  1 2 3\nbtime {BOOT_TIME}\n")
+        ticks = int((started_at - BOOT_TIME) * os.sysconf('SC_CLK_TCK'))
+        with open(os.path.join(proc_root, str(pid), 'stat'), 'w') as f:
+            f.write(f"{pid} ({argv[0][-15:]}) " + ' '.join(['S'] + ['0'] * 18 + [str(ticks)]))
+
+
+@linux_only
+def test_pid_alive_checks_proc(tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    _write_proc(proc_root, 200, '/usr/bin/python3', 'x.py')
+    assert not pid_alive(200, proc_root)  # PID reused by something else
+    assert not pid_alive(300, proc_root)  # crashed client, stale lockfile
+    _write_proc(proc_root, 100, '/opt/league/LeagueClient', '--foo')
+    assert pid_alive(100, proc_root)
+    assert not pid_alive(300, proc_root)  # a native client is running, but not this one
+
+
+@linux_only
+def test_pid_alive_accepts_wine_pid_while_a_client_runs(tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    _write_proc(proc_root, 5000, 'C:\\Riot Games\\League of Legends\\LeagueClient.exe', '--app-port=1',
+                started_at=BOOT_TIME + 500)
+    assert pid_alive(42, proc_root)  # Wine PID from the lockfile, not a host PID
+    assert pid_alive(42, proc_root, written_at=BOOT_TIME + 510)  # written by the running client
+
+
+@linux_only
+def test_stale_lockfile_stays_stale_when_a_wine_client_starts_later(tmp_path):
+    proc_root = str(tmp_path / 'proc')
+    _write_proc(proc_root, 5000, 'C:\\Riot Games\\League of Legends\\LeagueClient.exe', '--app-port=1',
+                started_at=BOOT_TIME + 500)
+    assert not pid_alive(42, proc_root, written_at=BOOT_TIME + 100)  # left by a crash before it started
+
+
+@pytest.fixture
+def league_process():
+    """A host process whose argv[0] is LeagueClient, like a native or Wine client"""
+    if not sys.platform.startswith('linux'):
+        pytest.skip("needs Linux /proc")
+    proc = subprocess.Popen(['bash', '-c', 'exec -a LeagueClient sleep 60'])
+    deadline = time.monotonic() + 5
+    while not pid_alive(proc.pid) and time.monotonic() < deadline:
+        time.sleep(0.01)  # exec not done yet
+    yield proc
+    proc.kill()
+    proc.wait()
+
+
+class _Events:
+    def __init__(self):
+        self.values = []
+        self._changed = threading.Condition()
+
+    def __call__(self, running):
+        with self._changed:
+            self.values.append(running)
+            self._changed.notify_all()
+
+    def wait_for(self, count, timeout=5.0):
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.values) >= count, timeout)
+        return list(self.values)
+
+
+def _write_lockfile(path, pid, port):
+    with open(path, 'w') as f:
+        f.write(f"LeagueClient:{pid}:{port}:secret:https")
+
+
+def _watcher(lockfile, events, notifier_factory, **intervals):
+    watcher = ClientWatcher(lambda: [lockfile, '/nonexistent/lockfile'], events,
+                            notifier_factory=notifier_factory)
+    for name, value in intervals.items():
+        setattr(watcher, name, value)
+    return watcher
+
+
+@pytest.mark.parametrize('backend', ['inotify', 'polling'])
+def test_lockfile_create_modify_delete(tmp_path, league_process, backend):
+    if backend == 'inotify':
+        # Long intervals: only directory events can wake the watcher in time
+        factory = create_notifier
+        intervals = dict(DOWN_INTERVAL=30.0, UP_MIN_INTERVAL=30.0, UP_MAX_INTERVAL=30.0)
+    else:
+        factory = PollingNotifier
+        intervals = dict(POLL_INTERVAL=0.05, UP_MIN_INTERVAL=0.05, UP_MAX_INTERVAL=0.05)
+    lockfile = str(tmp_path / 'lockfile')
+    events = _Events()
+    watcher = _watcher(lockfile, events, factory, **intervals)
+    watcher.start()
+    try:
+        assert events.wait_for(1) == [False]
+        if backend == 'inotify':
+            assert isinstance(watcher._notifier, InotifyNotifier)
+
+        _write_lockfile(lockfile, league_process.pid, 50001)
+        assert events.wait_for(2) == [False, True]
+
+        _write_lockfile(lockfile, league_process.pid, 50002)  # client restarted its API
+        time.sleep(0.3)
+        assert events.values == [False, True]
+
+        os.remove(lockfile)
+        assert events.wait_for(3) == [False, True, False]
+    finally:
+        watcher.stop()
+
+
+def test_stale_lockfile_of_crashed_client(tmp_path, league_process):
+    lockfile = str(tmp_path / 'lockfile')
+    _write_lockfile(lockfile, league_process.pid, 50001)
+    events = _Events()
+    watcher = _watcher(lockfile, events, create_notifier, UP_MIN_INTERVAL=0.05, UP_MAX_INTERVAL=0.05)
+    watcher.start()
+    try:
+        assert events.wait_for(1) == [True]
+        league_process.kill()
+        league_process.wait()
+        assert events.wait_for(2) == [True, False]
+        assert os.path.exists(lockfile)
+    finally:
+        watcher.stop()
+
+
+def test_process_start_time_from_real_proc(league_process):
+    started_at = client_watcher._proc_started_at(league_process.pid, '/proc')
+    assert started_at is not None and abs(started_at - time.time()) < 60
@@ -0,0 +1,121 @@
+"""Delta uploads against the last acknowledged snapshot (DELTA_UPLOADS)"""
+
+import copy
+
+import snapshots
+from benchmarks.synthetic import make_payload
+from sync_engine import STATUS_SUCCESS, STATUS_UNCHANGED
+
+
+def _payload():
+    payload = make_payload(skins=60, loot=40, friends=12)
+    payload['user_id'] = 'user-1'
+    return payload
+
+
+def _change(payload):
+    """A new version of the collection: skins, loot and friends added, changed and removed"""
+    changed = copy.deepcopy(payload)
+    changed['skins'][3]['ownership']['owned'] = not changed['skins'][3]['ownership']['owned']
+    extra = copy.deepcopy(changed['skins'][0])
+    extra['id'] = 999001
+    changed['skins'].append(extra)
+    del changed['skins'][10]
+    changed['loot'][0]['count'] += 2
+    del changed['loot'][5]
+    changed['friends'].append(dict(changed['friends'][0], puuid='new-friend', id='new-friend@pvp.net'))
+    del changed['friends'][4]
+    return changed
+
+
+def test_delta_applied_by_server_matches_full_payload(api, make_engine):
+    engine = make_engine()
+    payload = _payload()
+    assert engine.upload_collection(payload, 'token').status == STATUS_SUCCESS
+    assert api.stats['full'] == 1
+
+    changed = _change(payload)
+    assert engine.upload_collection(changed, 'token').status == STATUS_SUCCESS
+    assert api.stats['deltas'] == 1
+    assert api.stats['full'] == 1
+
+    stored = api.collections['user-1']
+    assert snapshots.normalize_payload(stored) == snapshots.normalize_payload(changed)
+    assert stored['version'] == snapshots.payload_version(changed)
+    assert snapshots.load_snapshot(engine.data_dir)['version'] == snapshots.payload_version(changed)
+
+
+def test_rejected_base_falls_back_to_full_upload(api, make_engine):
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+    api.forget('user-1')  # the collection the snapshot points at is gone
+
+    changed = _change(payload)
+    assert engine.upload_collection(changed, 'token').status == STATUS_SUCCESS
+    assert api.stats['base_rejected'] == 1
+    assert api.stats['deltas'] == 0
+    assert api.stats['full'] == 2
+    assert snapshots.normalize_payload(api.collections['user-1']) == snapshots.normalize_payload(changed)
+    # Still a good delta base afterwards
+    assert engine.delta_supported
+    engine.upload_collection(_change(changed), 'token')
+    assert api.stats['deltas'] == 1
+
+
+def test_server_without_delta_endpoint_gets_full_uploads(api, make_engine):
+    api.deltas_enabled = False
+    engine = make_engine()
+    engine.chunked_supported = False  # full uploads in one POST
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+
+    changed = _change(payload)
+    assert engine.upload_collection(changed, 'token').status == STATUS_SUCCESS
+    assert not engine.delta_supported
+    requests_before = api.stats['requests']
+    engine.upload_collection(_change(changed), 'token')
+    assert api.stats['requests'] == requests_before + 1  # straight to the full upload
+    assert api.stats['full'] == 3
+
+
+def _first_chroma(payload):
+    return next(s['chromas'][0] for s in payload['skins'] if s['chromas'])
+
+
+def test_chroma_and_record_field_changes_reach_the_server(api, make_engine):
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+
+    changed = copy.deepcopy(payload)
+    chroma = _first_chroma(changed)
+    chroma['ownership']['owned'] = not chroma['ownership']['owned']
+    changed['summoner_name'] = 'Renamed'
+    changed['loot'][1]['displayCategories'] = 'CHANGED'  # same count, other field
+    changed['friends'][2]['gameName'] = 'Renamed friend'
+    assert engine.upload_collection(changed, 'token').status == STATUS_SUCCESS
+    assert api.stats['deltas'] == 1
+
+    stored = api.collections['user-1']
+    assert snapshots.normalize_payload(stored) == snapshots.normalize_payload(changed)
+    assert _first_chroma(stored)['ownership']['owned'] == chroma['ownership']['owned']
+
+    # Nothing left over, so the next sync is an unchanged ping against a server that caught up
+    assert engine.upload_collection(copy.deepcopy(changed), 'token').status == STATUS_UNCHANGED
+    assert api.stats['unchanged'] == 1
+    assert api.stats['deltas'] == 1
+
+
+def test_delta_sends_only_changed_records():
+    payload = _payload()
+    base = snapshots.build_snapshot(payload)
+    changed = copy.deepcopy(payload)
+    _first_chroma(changed)['ownership']['owned'] ^= True
+    changed['skins'][5]['lastSelected'] = True  # volatile, not a change
+    changed['friends'][2]['gameName'] = 'Renamed friend'
+
+    delta = snapshots.compute_delta(base, changed, snapshots.payload_version(changed))
+    assert [s['id'] for s in delta['skins_changed']] == [next(s['id'] for s in changed['skins'] if s['chromas'])]
+    assert delta['friends_changed'] == [changed['friends'][2]]
+    assert snapshots.delta_size(delta) == 2
@@ -0,0 +1,117 @@
+"""League client discovery: in-process strategies first, then a race"""
+
+import shutil
+import threading
+import time
+
+import pytest
+
+from process_table import FakeProcessTable, ProcessInfo
+from security_config import SecurityConfig
+from sync_engine import SkinSyncEngine
+
+RACE = ('WMIC', 'PowerShell', 'Lockfile')
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(SecurityConfig, 'LEAGUE_LOCKFILES', [])
+    lines = []
+    engine = SkinSyncEngine(log=lines.append, process_table=FakeProcessTable([]))
+    engine.log_lines = lines
+    engine.lockfile_candidates = lambda: []
+    yield engine
+    engine.sessions.close()
+
+
+def _strategies(engine, **behaviour):
+    """Replace the racing strategies: name -> (seconds, result)"""
+    release = threading.Event()
+    for name, attr in zip(RACE, ('try_wmic', 'try_powershell', 'try_lockfile')):
+        seconds, result = behaviour.get(name, (0, (None, None)))
+
+        def _strategy(seconds=seconds, result=result):
+            release.wait(seconds)
+            return result
+        setattr(engine, attr, _strategy)
+    return release
+
+
+def test_process_table_wins_without_a_race(engine):
+    engine.process_table = FakeProcessTable([ProcessInfo(
+        4242, 'LeagueClientUx.exe', '"C:/Riot Games/LeagueClientUx.exe" --app-port=50123 --remoting-auth-token=abc')])
+    _strategies(engine, WMIC=(0, ('1', 'wrong')))
+
+    assert engine.get_league_connection_info() == ('50123', 'abc')
+    assert engine.last_discovery['winner'] == 'Process table'
+    assert not set(RACE) & set(engine.last_discovery['timings'])
+
+
+def test_first_valid_answer_wins(engine):
+    release = _strategies(engine, WMIC=(5, ('1', 'slow')), PowerShell=(0.05, ('2', 'fast')),
+                          Lockfile=(0, (None, None)))
+    start = time.monotonic()
+    try:
+        assert engine.get_league_connection_info() == ('2', 'fast')
+        assert time.monotonic() - start < 1
+        assert engine.last_discovery['winner'] == 'PowerShell'
+        assert engine.discovery_stats['PowerShell']['wins'] == 1
+        assert 'WMIC' not in engine.last_discovery['timings']  # abandoned, still running
+    finally:
+        release.set()
+    # Cached: a second lookup doesn't race again
+    assert engine.get_league_connection_info() == ('2', 'fast')
+    assert engine.discovery_stats['PowerShell']['runs'] == 1
+
+
+@pytest.mark.skipif(shutil.which('sleep') is None, reason="needs the sleep command")
+def test_losers_helper_processes_are_killed(engine):
+    returncodes = []
+
+    def _slow_wmic():
+        returncodes.append(engine._run_command(['sleep', '30'])[0])
+        return None, None
+    _strategies(engine, PowerShell=(0.2, ('2', 'fast')))
+    engine.try_wmic = _slow_wmic
+
+    assert engine.get_league_connection_info() == ('2', 'fast')
+    deadline = time.monotonic() + 5
+    while not returncodes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert returncodes and returncodes[0] != 0
+
+
+def test_all_strategies_fail(engine):
+    _strategies(engine)
+
+    assert engine.get_league_connection_info() == (None, None)
+    assert engine.last_discovery['winner'] is None
+    assert set(engine.last_discovery['timings']) == {'Process table', 'Known lockfile', *RACE}
+    assert "✗ All methods failed to find League connection" in engine.log_lines
+
+
+def test_race_times_out(engine, monkeypatch):
+    monkeypatch.setattr(SecurityConfig, 'DISCOVERY_TIMEOUT', 0.2)
+    release = _strategies(engine, WMIC=(5, ('1', 'late')), PowerShell=(5, ('2', 'late')),
+                          Lockfile=(5, ('3', 'late')))
+    start = time.monotonic()
+    try:
+        assert engine.get_league_connection_info() == (None, None)
+        assert time.monotonic() - start < 1
+        assert "✗ Connection discovery timed out after 0.2s" in engine.log_lines
+        assert engine.last_discovery['winner'] is None
+    finally:
+        release.set()
+
+
+def test_late_loser_does_not_replace_the_winner(engine):
+    release = _strategies(engine, WMIC=(5, ('1', 'stale')), PowerShell=(0.05, ('2', 'fresh')))
+    assert engine.get_league_connection_info() == ('2', 'fresh')
+
+    release.set()  # the abandoned WMIC run now finds the other credentials
+    deadline = time.monotonic() + 5
+    while 'WMIC' not in engine.last_discovery['timings'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 'WMIC' in engine.last_discovery['timings']
+    assert engine.get_league_connection_info() == ('2', 'fresh')
+    assert engine.discovery_stats['PowerShell']['runs'] == 1
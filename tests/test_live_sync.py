@@ -0,0 +1,83 @@
+"""Live sync: League client inventory events through LcuEventSubscriber"""
+
+import queue
+import time
+
+import pytest
+
+from benchmarks.fake_lcu import FakeLcuEventServer
+from lcu_events import LcuEventSubscriber
+
+SKINS_URI = '/lol-champions/v1/inventories/1/skins-minimal'
+LOOT_URI = '/lol-loot/v1/player-loot-map'
+
+
+@pytest.fixture
+def server():
+    server = FakeLcuEventServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def subscribe(server):
+    subscribers = []
+
+    def _subscribe(debounce, max_delay=LcuEventSubscriber.MAX_DELAY):
+        fired = queue.Queue()
+        subscriber = LcuEventSubscriber(lambda: (server.port, server.token),
+                                        lambda uris: fired.put((time.monotonic(), uris)),
+                                        debounce=debounce, use_tls=False)
+        subscriber.MAX_DELAY = max_delay
+        subscriber.RECONNECT_MIN = 0.05
+        subscriber.start()
+        subscribers.append(subscriber)
+        assert server.wait_subscribed(len(subscriber.topics))
+        return subscriber, fired
+    yield _subscribe
+    for subscriber in subscribers:
+        subscriber.stop()
+
+
+def _wait_seen(subscriber, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while subscriber.events_seen < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert subscriber.events_seen == count
+
+
+def test_burst_fires_once_after_debounce(server, subscribe):
+    subscriber, fired = subscribe(debounce=0.3)
+    for burst in range(2):
+        for i in range(20):
+            server.publish(SKINS_URI if i % 2 else LOOT_URI, {'burst': burst, 'n': i})
+            server.publish('/lol-chat/v1/me', {})  # unrelated traffic
+        last_sent = time.monotonic()
+        fired_at, uris = fired.get(timeout=5)
+        assert uris == {SKINS_URI, LOOT_URI}
+        assert 0.3 <= fired_at - last_sent < 2
+        assert fired.empty()
+    assert subscriber.events_seen == 40
+
+
+def test_steady_events_fire_by_max_delay(server, subscribe):
+    subscriber, fired = subscribe(debounce=0.3, max_delay=0.6)
+    start = time.monotonic()
+    while fired.empty() and time.monotonic() - start < 3:
+        server.publish(SKINS_URI)
+        time.sleep(0.05)
+    fired_at, uris = fired.get(timeout=1)
+    assert uris == {SKINS_URI}
+    assert fired_at - start < 1.5
+
+
+def test_pending_burst_fires_on_reconnect(server, subscribe):
+    subscriber, fired = subscribe(debounce=30)
+    server.publish(LOOT_URI)
+    _wait_seen(subscriber, 1)
+
+    assert server.disconnect() == 1
+    fired_at, uris = fired.get(timeout=5)
+    assert uris == {LOOT_URI}
+    assert subscriber.connected
+    assert fired.empty()
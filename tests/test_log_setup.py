@@ -0,0 +1,41 @@
+"""Queued logging pipeline: extra outputs come and go while it runs"""
+
+import logging
+import time
+
+import pytest
+
+from log_setup import APP_LOGGER, CallbackHandler, add_handler, remove_handler, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    yield str(tmp_path / 'skin_fetcher.log')
+    shutdown_logging()
+    root.handlers[:], level = saved
+    root.setLevel(level)
+
+
+def test_removed_handler_gets_no_more_records(log_path):
+    listener = setup_logging(log_path, json_lines=False)
+    lines = []
+    handler = CallbackHandler(lines.append)
+    add_handler(handler)
+    app_log = logging.getLogger(APP_LOGGER)
+
+    app_log.info("window open")
+    logging.getLogger('urllib3').info("not for the window")
+    deadline = time.monotonic() + 5
+    while not lines and time.monotonic() < deadline:
+        time.sleep(0.01)  # written by the listener thread
+    remove_handler(handler)
+    app_log.info("window closed")
+    shutdown_logging()
+
+    assert lines == ["window open"]
+    assert handler not in listener.handlers
+    with open(log_path, encoding='utf-8') as f:
+        text = f.read()
+    assert "window open" in text and "not for the window" in text and "window closed" in text
@@ -0,0 +1,160 @@
+"""Loot filter and skin projection tables (projections.py)"""
+
+import copy
+import json
+import logging
+import shutil
+
+import pytest
+
+import projections
+from benchmarks.fake_lcu import FakeLcuApi, make_self_signed_cert
+from benchmarks.synthetic import make_friends, make_loot, make_skins
+from projections import (DEFAULT_LOOT_FILTER, DEFAULT_SKIN_SCHEMA, LOOT_FILTER_FILE, SKIN_SCHEMA_FILE,
+                         filter_loot, load_loot_filter, project_skins)
+from security_config import SecurityConfig
+from sync_engine import STATUS_SUCCESS
+
+
+def _write_table(directory, filename, table):
+    path = directory / filename
+    path.write_text(table if isinstance(table, str) else json.dumps(table), encoding='utf-8')
+    return str(directory)
+
+
+def test_default_loot_filter_keeps_only_skin_loot():
+    loot = make_loot(80)
+    kept = filter_loot(loot)
+    kept_ids = {item['lootId'] for item in kept}
+    for item in loot:
+        is_skin = item['type'] in ('SKIN', 'SKIN_RENTAL') or item['displayCategories'] == 'CHAMPION_SKIN'
+        assert (item['lootId'] in kept_ids) == is_skin, item['lootId']
+    assert {item['displayCategories'] for item in kept} == {'CHAMPION_SKIN'}
+    assert len(kept) == 20
+    for item in kept:
+        assert set(item) <= set(DEFAULT_LOOT_FILTER['fields'])
+        assert 'splashPath' not in item and 'count' in item
+
+
+def test_loot_filter_skips_non_records():
+    assert filter_loot([None, 'x', {'type': 'SKIN', 'lootId': 'a'}]) == [{'type': 'SKIN', 'lootId': 'a'}]
+    assert filter_loot(None) == []
+
+
+def test_loot_filter_override_from_tables_dir(tmp_path):
+    table = {'version': DEFAULT_LOOT_FILTER['version'] + 1,
+             'match': {'displayCategories': ['WARDSKIN', 'EMOTE']}, 'fields': None}
+    loaded = load_loot_filter(_write_table(tmp_path, LOOT_FILTER_FILE, table))
+    assert loaded == table
+
+    loot = make_loot(40)
+    kept = filter_loot(loot, loaded)
+    assert {item['displayCategories'] for item in kept} == {'WARDSKIN', 'EMOTE'}
+    assert kept == [item for item in loot if item['displayCategories'] in ('WARDSKIN', 'EMOTE')]
+
+
+@pytest.mark.parametrize('version', [None, '2', 1.5, DEFAULT_LOOT_FILTER['version'] - 1],
+                         ids=['missing', 'string', 'float', 'older'])
+def test_loot_filter_with_unusable_version_is_ignored(tmp_path, caplog, version):
+    table = {'match': {'type': ['EMOTE']}, 'fields': None}
+    if version is not None:
+        table['version'] = version
+    with caplog.at_level(logging.WARNING):
+        assert load_loot_filter(_write_table(tmp_path, LOOT_FILTER_FILE, table)) is DEFAULT_LOOT_FILTER
+    assert f"Ignoring {LOOT_FILTER_FILE}" in caplog.text
+
+
+@pytest.mark.parametrize('table', [
+    '{"version": 2, "match": ',                                   # cut-off JSON
+    '[1, 2]',
+    {'version': 2, 'match': ['SKIN']},
+    {'version': 2, 'match': {'type': 'SKIN'}},
+    {'version': 2, 'match': {'type': ['SKIN']}, 'fields': 'count'},
+], ids=['truncated', 'not-an-object', 'match-list', 'match-values', 'fields'])
+def test_malformed_loot_filter_falls_back_to_default(tmp_path, caplog, table):
+    with caplog.at_level(logging.WARNING):
+        assert load_loot_filter(_write_table(tmp_path, LOOT_FILTER_FILE, table)) is DEFAULT_LOOT_FILTER
+    assert LOOT_FILTER_FILE in caplog.text
+
+
+def test_no_tables_dir_uses_built_in_tables(tmp_path):
+    assert load_loot_filter(None) is DEFAULT_LOOT_FILTER
+    assert load_loot_filter(str(tmp_path)) is DEFAULT_LOOT_FILTER
+    assert projections.load_skin_schema(str(tmp_path)) is projections.DEFAULT_SKIN_SCHEMA
+
+
+def _keys(records):
+    return set().union(*(set(r) for r in records))
+
+
+def test_skins_projected_to_schema_fields():
+    skins = make_skins(60)
+    projected = project_skins(copy.deepcopy(skins))
+    fields = DEFAULT_SKIN_SCHEMA['fields']
+    assert _keys(projected) == set(fields)
+    assert _keys(s['ownership'] for s in projected) == set(fields['ownership'])
+    assert _keys(s['ownership']['rental'] for s in projected) == {'rented'}
+    assert [s['id'] for s in projected] == [s['id'] for s in skins]
+    assert projections.json_size(projected) < projections.json_size(skins) / 2
+
+
+def test_chromas_projected_with_their_ownership():
+    skins = make_skins(60)
+    projected = project_skins(copy.deepcopy(skins))
+    chroma_fields = DEFAULT_SKIN_SCHEMA['fields']['chromas']
+    chromas = [c for s in projected for c in s['chromas']]
+    assert chromas and _keys(chromas) == set(chroma_fields)
+    assert _keys(c['ownership']['rental'] for c in chromas) == {'rented'}
+    for original, slim in zip(skins, projected):
+        assert [(c['id'], c['ownership']['owned']) for c in original['chromas']] == \
+               [(c['id'], c['ownership']['owned']) for c in slim['chromas']]
+
+
+def test_strict_mode_reports_only_unknown_fields():
+    skins = make_skins(30)
+    unknown = set()
+    project_skins(copy.deepcopy(skins), unknown=unknown)
+    assert unknown == set()  # everything the client sends today is projected or ignored
+
+    skins[0]['newBadge'] = True
+    skins[0]['ownership']['rental']['newRentalField'] = 1
+    next(s for s in skins if s['chromas'])['chromas'][0]['sparkle'] = 'gold'
+    project_skins(skins, unknown=unknown)
+    assert unknown == {'newBadge', 'ownership.rental.newRentalField', 'chromas.sparkle'}
+    assert 'newBadge' not in project_skins(skins)[0]
+
+
+def test_engine_warns_once_about_new_skin_fields(make_engine, monkeypatch):
+    monkeypatch.setattr(SecurityConfig, 'PROJECTION_STRICT', True)
+    lines = []
+    engine = make_engine(log=lines.append)
+    skins = make_skins(5)
+    skins[1]['newBadge'] = True
+    engine._project_skins(copy.deepcopy(skins))
+    engine._project_skins(copy.deepcopy(skins))
+    warnings = [line for line in lines if 'does not cover new client fields' in line]
+    assert warnings == ["⚠ Skin schema v1 does not cover new client fields: newBadge"]
+
+
+@pytest.mark.skipif(shutil.which('openssl') is None, reason="needs the openssl command")
+@pytest.mark.filterwarnings('ignore::urllib3.exceptions.InsecureRequestWarning')
+def test_skin_schema_override_reaches_the_upload(api, make_engine, tmp_path):
+    certfile, keyfile = make_self_signed_cert(str(tmp_path))
+    lcu = FakeLcuApi(make_skins(40), make_loot(20), make_friends(3), certfile, keyfile).start()
+    try:
+        tables_dir = tmp_path / 'tables'
+        tables_dir.mkdir()
+        schema = {'version': DEFAULT_SKIN_SCHEMA['version'] + 1,
+                  'fields': {'id': None, 'ownership': {'owned': None}}}
+        _write_table(tables_dir, SKIN_SCHEMA_FILE, schema)
+
+        engine = make_engine(tables_dir=str(tables_dir))
+        result = engine.run('token', 'user-1', connection=(str(lcu.port), lcu.token))
+    finally:
+        lcu.stop()
+
+    assert result.status == STATUS_SUCCESS
+    uploaded = api.collections['user-1']['skins']
+    assert len(uploaded) == 40
+    assert _keys(uploaded) == {'id', 'ownership'}
+    assert _keys(s['ownership'] for s in uploaded) == {'owned'}
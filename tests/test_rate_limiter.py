@@ -0,0 +1,66 @@
+"""Token-bucket RateLimiter, in-process and shared through a state file"""
+
+import os
+import subprocess
+import sys
+import threading
+
+from security_config import RATE_LIMIT_FILE, RateLimiter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from security_config import RateLimiter
+limiter = RateLimiter(30, state_file=sys.argv[2], name='upload_data')
+print(sum(limiter.can_make_request() for _ in range(40)))
+"""
+
+
+def test_threads_share_one_bucket():
+    limiter = RateLimiter(10)
+    granted = []
+    threads = [threading.Thread(target=lambda: granted.append(sum(limiter.can_make_request() for _ in range(50))))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(granted) == 10
+    assert limiter.time_until_next_request() > 0
+
+
+def test_two_processes_share_the_state_file(tmp_path):
+    state_file = str(tmp_path / RATE_LIMIT_FILE)
+    children = [subprocess.Popen([sys.executable, '-c', _CHILD, ROOT, state_file],
+                                 stdout=subprocess.PIPE, text=True) for _ in range(2)]
+    granted = [int(child.communicate(timeout=60)[0]) for child in children]
+    assert all(child.returncode == 0 for child in children)
+    assert sum(granted) == 30
+
+    # A third instance finds the bucket empty as well
+    limiter = RateLimiter(30, state_file=state_file, name='upload_data')
+    assert not limiter.can_make_request()
+    assert limiter.time_until_next_request() > 0
+
+
+def test_time_until_next_request_does_not_write(tmp_path):
+    state_file = str(tmp_path / RATE_LIMIT_FILE)
+    limiter = RateLimiter(2, state_file=state_file, name='upload_data')
+    assert limiter.can_make_request() and limiter.can_make_request()
+    before = os.stat(state_file).st_mtime_ns, open(state_file, 'rb').read()
+
+    assert limiter.time_until_next_request() == 30
+    assert RateLimiter(2, state_file=state_file, name='upload_data').time_until_next_request() == 30
+    assert (os.stat(state_file).st_mtime_ns, open(state_file, 'rb').read()) == before
+
+
+def test_buckets_are_separate_per_endpoint(tmp_path):
+    state_file = str(tmp_path / RATE_LIMIT_FILE)
+    upload = RateLimiter(1, state_file=state_file, name='upload_data')
+    auth = RateLimiter(1, state_file=state_file, name='auth_verify')
+    assert upload.can_make_request()
+    assert not upload.can_make_request()
+    assert auth.time_until_next_request() == 0
+    assert auth.can_make_request()
@@ -0,0 +1,89 @@
+"""Binary last-upload snapshot format (last_upload.snap)"""
+
+import os
+import struct
+import zlib
+
+import pytest
+
+import snapshots
+from benchmarks.synthetic import make_payload
+from snapshots import SNAPSHOT_FILE, SnapshotError, decode_snapshot, encode_snapshot
+from sync_engine import STATUS_SUCCESS
+
+
+def _snapshot(**overrides):
+    payload = make_payload(skins=50, loot=30, friends=8)
+    payload.update(user_id='user-1', summoner_id=123456789, **overrides)
+    return snapshots.build_snapshot(payload)
+
+
+def _with_header(data, magic=None, version=None):
+    old_magic, old_version, reserved, crc, length = struct.unpack_from('<4sHHII', data)
+    header = struct.pack('<4sHHII', magic or old_magic, old_version if version is None else version,
+                         reserved, crc, length)
+    return header + data[len(header):]
+
+
+def test_round_trip():
+    snapshot = _snapshot()
+    assert decode_snapshot(encode_snapshot(snapshot)) == snapshot
+
+
+@pytest.mark.parametrize('skins', [
+    {},
+    {'1': 0, '-7': 2 ** 64 - 1},                      # int32 keys, full-range hashes
+    {str(2 ** 40): 5, '3': 6},                        # int64 keys
+    {'007': 1, 'abc': 2, 'ünï': 3, '': 4},           # not canonical ints: string table
+])
+def test_round_trip_key_encodings(skins):
+    snapshot = dict(_snapshot(), skins=skins)
+    assert decode_snapshot(encode_snapshot(snapshot))['skins'] == skins
+
+
+def test_checksum_mismatch():
+    data = bytearray(encode_snapshot(_snapshot()))
+    data[-3] ^= 0xFF
+    with pytest.raises(SnapshotError, match='checksum'):
+        decode_snapshot(bytes(data))
+
+
+@pytest.mark.parametrize('keep', [0, 10, 16, -1])
+def test_truncated_file(keep):
+    data = encode_snapshot(_snapshot())
+    with pytest.raises(SnapshotError):
+        decode_snapshot(data[:keep])
+
+
+def test_truncated_body_with_valid_checksum():
+    body = struct.pack('<I', 2) + b'{}' + b'\x00'  # meta, then a key table cut short
+    data = struct.pack('<4sHHII', snapshots.SNAPSHOT_MAGIC, snapshots.SNAPSHOT_FORMAT, 0,
+                       zlib.crc32(body), len(body)) + body
+    with pytest.raises(SnapshotError, match='truncated'):
+        decode_snapshot(data)
+
+
+def test_unknown_magic_or_version():
+    data = encode_snapshot(_snapshot())
+    with pytest.raises(SnapshotError, match='not a snapshot'):
+        decode_snapshot(_with_header(data, magic=b'NOPE'))
+    with pytest.raises(SnapshotError, match='unsupported snapshot format 1'):
+        decode_snapshot(_with_header(data, version=1))
+
+
+def test_corrupt_snapshot_means_full_upload(api, make_engine, tmp_path):
+    engine = make_engine()
+    payload = make_payload(skins=40, loot=20, friends=5)
+    payload['user_id'] = 'user-1'
+    engine.upload_collection(payload, 'token')
+    path = os.path.join(str(tmp_path), SNAPSHOT_FILE)
+    with open(path, 'r+b') as f:
+        f.seek(-4, os.SEEK_END)
+        f.write(b'\xff\xff\xff\xff')
+    assert snapshots.load_snapshot(str(tmp_path)) is None
+
+    payload['skins'][0]['ownership']['owned'] = not payload['skins'][0]['ownership']['owned']
+    assert engine.upload_collection(payload, 'token').status == STATUS_SUCCESS
+    assert api.stats['full'] == 2
+    assert api.stats['deltas'] == 0
+    assert snapshots.load_snapshot(str(tmp_path))['version'] == snapshots.payload_version(payload)
@@ -0,0 +1,65 @@
+"""Streamed upload bodies: same bytes as json.dumps, bounded memory"""
+
+import gzip
+import json
+import math
+
+import pytest
+
+from benchmarks.memory import streamed_size, traced_peak
+from benchmarks.synthetic import make_payload
+from http_client import compress_body, compress_stream, iter_json, zstandard
+
+BUDGET_BYTES = 1024 * 1024
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), allow_nan=False).encode('utf-8')
+
+
+@pytest.mark.parametrize('value', [
+    {},
+    [],
+    {'a': [], 'b': {}, 'c': None},
+    {'name': 'Ahri – Spirit Blossom 🌸', 'quote': 'say "hi"\n', 'n': [1, 2.5, -3, True, False]},
+    [{'deep': {'er': [{'x': [1, {'y': 'z'}]}]}}, 'tail'],
+    ('tuple', 1),
+])
+def test_iter_json_matches_json_dumps(value):
+    for chunk_size in (1, 7, 1 << 16):
+        assert b''.join(iter_json(value, chunk_size)) == _dumps(value)
+
+
+def test_iter_json_matches_json_dumps_for_a_payload():
+    payload = make_payload(skins=500, loot=100, friends=20)
+    chunks = list(iter_json(payload, chunk_size=4096))
+    assert b''.join(chunks) == _dumps(payload)
+    assert len(chunks) > 1 and all(chunks)
+
+
+def test_iter_json_rejects_nan():
+    with pytest.raises(ValueError):
+        b''.join(iter_json({'x': [math.nan]}))
+
+
+@pytest.mark.parametrize('encoding', [None, 'gzip', pytest.param('zstd', marks=pytest.mark.skipif(
+    zstandard is None, reason="zstandard not installed"))])
+def test_compress_stream_round_trips(encoding):
+    payload = make_payload(skins=200, loot=50, friends=10)
+    streamed = b''.join(compress_stream(iter_json(payload, chunk_size=1024), encoding))
+    body = _dumps(payload)
+    if encoding is None:
+        assert streamed == body
+    elif encoding == 'gzip':
+        assert gzip.decompress(streamed) == body
+        assert gzip.decompress(compress_body(body, 'gzip')) == body
+    else:
+        assert zstandard.ZstdDecompressor().decompressobj().decompress(streamed) == body
+
+
+@pytest.mark.parametrize('encoding', [None, 'gzip'])
+def test_streaming_peak_stays_under_budget(encoding):
+    payload = make_payload(skins=10000, loot=1500, friends=150)
+    size, peak = traced_peak(lambda: streamed_size(payload, encoding))
+    assert size > 0
+    assert peak <= BUDGET_BYTES, f"streaming peak {peak / 1024:.0f} KB > {BUDGET_BYTES // 1024} KB"
@@ -0,0 +1,148 @@
+"""--daemon scheduling: coalesced triggers, interval reschedule and backoff"""
+
+import threading
+import time
+
+import pytest
+
+from benchmarks.synthetic import make_payload
+from sync_daemon import SyncDaemon
+from sync_engine import STATUS_CONNECTION_ERROR, STATUS_SUCCESS, STATUS_UNCHANGED, SyncResult
+
+
+class _Engine:
+    """What SyncDaemon uses of SkinSyncEngine, with scripted sync results"""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.calls = []  # (monotonic time, kwargs) per sync
+        self.gate = threading.Event()
+        self.gate.set()
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+        self._synced = threading.Condition()
+
+    def lockfile_candidates(self):
+        return []
+
+    def is_league_running(self):
+        return True
+
+    def invalidate_connection(self):
+        pass
+
+    def get_league_connection_info(self):
+        return None, None
+
+    def log(self, message):
+        pass
+
+    def run(self, auth_token, user_id, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.gate.wait(5)
+        with self._lock:
+            self.running -= 1
+        status = self.results.pop(0) if self.results else STATUS_SUCCESS
+        with self._synced:
+            self.calls.append((time.monotonic(), kwargs))
+            self._synced.notify_all()
+        return SyncResult(status, status)
+
+    def wait_for(self, count, timeout=5.0):
+        with self._synced:
+            self._synced.wait_for(lambda: len(self.calls) >= count, timeout)
+        return len(self.calls)
+
+
+@pytest.fixture
+def start_daemon():
+    daemons = []
+
+    def _start(engine, interval=3600.0, retry_delay=SyncDaemon.RETRY_DELAY):
+        daemon = SyncDaemon(engine, lambda: ('token', 'user-1'), interval=interval, live_sync=False)
+        daemon.CONNECT_DELAY = 0.0
+        daemon.JITTER = 0.0
+        daemon.RETRY_DELAY = retry_delay
+        daemon.start()
+        daemons.append(daemon)
+        return daemon
+    yield _start
+    for daemon in daemons:
+        daemon.stop()
+
+
+def _gaps(engine):
+    times = [t for t, _ in engine.calls]
+    return [b - a for a, b in zip(times, times[1:])]
+
+
+def test_client_start_syncs_without_re_uploading_unchanged(start_daemon):
+    engine = _Engine()
+    start_daemon(engine)
+    assert engine.wait_for(1) == 1
+    assert engine.calls[0][1] == {'skip_unchanged': True}
+
+
+def test_burst_of_requests_coalesces_into_one_queued_sync(start_daemon):
+    engine = _Engine()
+    engine.gate.clear()
+    daemon = start_daemon(engine)
+    deadline = time.monotonic() + 5
+    while not engine.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    for i in range(20):
+        daemon.request_sync(f"event {i}")
+    engine.gate.set()
+    assert engine.wait_for(2) == 2
+    time.sleep(0.3)
+    assert len(engine.calls) == 2
+    assert engine.max_running == 1
+    assert daemon.sync_count == 2
+
+
+def test_reschedules_after_each_sync(start_daemon):
+    engine = _Engine()
+    start_daemon(engine, interval=0.2)
+    assert engine.wait_for(4) == 4
+    assert all(0.15 <= gap < 1.0 for gap in _gaps(engine))
+
+
+def test_failures_back_off_and_success_resets(start_daemon):
+    failure = STATUS_CONNECTION_ERROR
+    engine = _Engine([failure, failure, failure, STATUS_SUCCESS, failure])
+    daemon = start_daemon(engine, interval=60.0, retry_delay=0.1)
+    assert engine.wait_for(4) == 4
+    first, second, third = _gaps(engine)
+    assert 0.08 <= first < 0.3 and 0.18 <= second < 0.5 and 0.38 <= third < 0.9
+
+    # Back on the normal interval after a success
+    time.sleep(0.1)
+    assert len(engine.calls) == 4
+    assert daemon._next_due - time.monotonic() > 50
+
+    # ...and the next failure starts over at RETRY_DELAY
+    daemon.request_sync("collection changed")
+    assert engine.wait_for(5) == 5
+    deadline = time.monotonic() + 5
+    while (daemon.sync_count < 5 or daemon._next_due is None) and time.monotonic() < deadline:
+        time.sleep(0.005)  # rescheduled right after run() returns
+    assert daemon.last_result.status == failure
+    assert 0.05 < daemon._next_due - time.monotonic() <= 0.1
+
+
+def test_skip_unchanged_sends_nothing(api, make_engine):
+    engine = make_engine()
+    payload = make_payload(skins=30, loot=10, friends=3)
+    payload['user_id'] = 'user-1'
+    engine.upload_collection(payload, 'token')
+    requests_before = api.stats['requests']
+
+    assert engine.upload_collection(payload, 'token', skip_unchanged=True).status == STATUS_UNCHANGED
+    assert api.stats['requests'] == requests_before
+    # The window's manual sync still confirms with a ping
+    assert engine.upload_collection(payload, 'token').status == STATUS_UNCHANGED
+    assert api.stats['unchanged'] == 1
@@ -0,0 +1,95 @@
+"""Hash-only pings for collections that did not change (UNCHANGED_UPLOADS)"""
+
+import copy
+import random
+
+from benchmarks.synthetic import make_payload
+from security_config import SecurityConfig
+from sync_engine import STATUS_SUCCESS, STATUS_UNCHANGED
+
+
+def _payload():
+    payload = make_payload(skins=60, loot=40, friends=12)
+    payload['user_id'] = 'user-1'
+    return payload
+
+
+def _reordered_and_volatile(payload):
+    """Same collection in another order, with only presence/selection fields changed"""
+    changed = copy.deepcopy(payload)
+    rng = random.Random(7)
+    for field in ('skins', 'loot', 'friends'):
+        rng.shuffle(changed[field])
+    changed['skins'][0]['lastSelected'] = True
+    changed['loot'][0]['isNew'] = True
+    for friend in changed['friends']:
+        friend['availability'] = 'away'
+        friend['time'] = 12345
+    return changed
+
+
+def test_reordered_or_volatile_changes_send_unchanged_ping(api, make_engine):
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+
+    result = engine.upload_collection(_reordered_and_volatile(payload), 'token')
+    assert result.status == STATUS_UNCHANGED
+    assert api.stats['unchanged'] == 1
+    assert api.stats['full'] == 1
+    assert api.stats['deltas'] == 0
+
+
+def test_real_change_is_uploaded(api, make_engine):
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+
+    changed = _reordered_and_volatile(payload)
+    changed['loot'][1]['count'] += 1
+    assert engine.upload_collection(changed, 'token').status == STATUS_SUCCESS
+    assert api.stats['unchanged'] == 0
+    assert api.stats['deltas'] == 1
+
+    engine.delta_supported = False
+    changed['skins'][2]['ownership']['owned'] = not changed['skins'][2]['ownership']['owned']
+    assert engine.upload_collection(changed, 'token').status == STATUS_SUCCESS
+    assert api.stats['full'] == 2
+
+
+def test_rejected_ping_falls_back_to_full_upload(api, make_engine):
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+    api.forget('user-1')
+
+    assert engine.upload_collection(payload, 'token').status == STATUS_SUCCESS
+    assert api.stats['base_rejected'] == 1
+    assert api.stats['full'] == 2
+    assert 'user-1' in api.collections
+
+
+def test_server_without_ping_endpoint_skips_unchanged(api, make_engine):
+    api.unchanged_enabled = False
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+
+    assert engine.upload_collection(payload, 'token').status == STATUS_UNCHANGED
+    assert not engine.unchanged_ping_supported
+    requests_before = api.stats['requests']
+    assert engine.upload_collection(payload, 'token').status == STATUS_UNCHANGED
+    assert api.stats['requests'] == requests_before
+    assert api.stats['full'] == 1
+
+
+def test_upload_policy_sends_unchanged_collection_again(api, make_engine, monkeypatch):
+    monkeypatch.setattr(SecurityConfig, 'UNCHANGED_UPLOADS', 'upload')
+    engine = make_engine()
+    payload = _payload()
+    engine.upload_collection(payload, 'token')
+
+    requests_before = api.stats['requests']
+    assert engine.upload_collection(payload, 'token').status == STATUS_SUCCESS
+    assert api.stats['requests'] > requests_before
+    assert api.stats['unchanged'] == 0
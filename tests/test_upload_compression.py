@@ -0,0 +1,58 @@
+"""Compressed upload bodies and the 415 fallback to plain JSON"""
+
+import pytest
+
+from benchmarks.synthetic import make_payload
+from security_config import SecurityConfig
+from sync_engine import STATUS_SUCCESS
+
+
+@pytest.fixture
+def single_post(api, make_engine, monkeypatch):
+    """Engine whose uploads go out as one POST, compressed with gzip if allowed"""
+    monkeypatch.setattr(SecurityConfig, 'UPLOAD_COMPRESSION', 'gzip')
+    engine = make_engine()
+    engine.chunked_supported = False
+    engine.delta_supported = False
+    return engine
+
+
+def _payload(skins):
+    payload = make_payload(skins=skins, loot=20, friends=5)
+    payload['user_id'] = 'user-1'
+    return payload
+
+
+@pytest.mark.parametrize('stream', [False, True], ids=['buffered', 'streamed'])
+def test_rejected_compression_is_resent_plain(api, single_post, stream):
+    api.unsupported_media = 'encoded'
+    single_post.stream_uploads = stream
+    payload = _payload(skins=400 if stream else 5)
+
+    assert single_post.upload(payload, 'token').status == STATUS_SUCCESS
+    assert api.encodings == ['gzip', None]
+    assert api.collections['user-1']['skins'] == payload['skins']
+    assert single_post.compression_disabled
+
+    # Plain from then on
+    single_post.upload(payload, 'token')
+    assert api.encodings == ['gzip', None, None]
+
+
+@pytest.mark.parametrize('stream', [False, True], ids=['buffered', 'streamed'])
+def test_plain_body_rejected_with_415_is_not_resent(api, single_post, monkeypatch, stream):
+    monkeypatch.setattr(SecurityConfig, 'UPLOAD_COMPRESSION', 'none')
+    api.unsupported_media = 'all'
+    single_post.stream_uploads = stream
+
+    result = single_post.upload(_payload(skins=400 if stream else 5), 'token')
+    assert not result.ok
+    assert api.encodings == [None]
+
+
+def test_compressed_body_decodes_to_the_payload(api, single_post):
+    payload = _payload(skins=5)
+    assert single_post.upload(payload, 'token').status == STATUS_SUCCESS
+    assert api.encodings == ['gzip']
+    assert single_post.bytes_uploaded == api.stats['bytes_received']
+    assert api.collections['user-1']['skins'] == payload['skins']
@@ -0,0 +1,55 @@
+"""Offline upload spool (OFFLINE_SPOOL) shared by several accounts"""
+
+import time
+import types
+
+import pytest
+
+import snapshots
+import sync_engine
+from benchmarks.synthetic import make_payload
+from sync_engine import STATUS_AUTH_EXPIRED, STATUS_NOT_AUTHORIZED, STATUS_QUEUED, SPOOL_STATUSES
+from upload_spool import SpoolDrainer
+
+
+@pytest.fixture(autouse=True)
+def no_retry_sleep(monkeypatch):
+    """Upload retries against a 503 return at once"""
+    fake_time = types.SimpleNamespace(time=time.time, monotonic=time.monotonic, sleep=lambda seconds: None)
+    monkeypatch.setattr(sync_engine, 'time', fake_time)
+
+
+def _payload(user_id, summoner_id):
+    payload = make_payload(skins=30, loot=20, friends=5)
+    payload.update(user_id=user_id, summoner_id=summoner_id)
+    return payload
+
+
+def test_spooled_batch_account_keeps_its_own_snapshot(api, make_engine, tmp_path):
+    primary = make_engine()
+    primary_payload = _payload('user-a', 1)
+    primary.upload_collection(primary_payload, 'token-a')
+
+    account_dir = tmp_path / 'accounts' / 'b'
+    account_dir.mkdir(parents=True)
+    other = make_engine(account_dir)
+    other.spool = primary.spool  # as --batch shares one spool
+    other_payload = _payload('user-b', 2)
+    api.unavailable = True
+    assert other.upload_collection(other_payload, 'token-b').status == STATUS_QUEUED
+    api.unavailable = False
+
+    # The window / --daemon drains it with the primary account's engine
+    entry = primary.spool.pending()[0]
+    primary.spool.retry_later(entry['user_id'], entry['fetched_at'], 0)
+    drainer = SpoolDrainer(primary.spool, primary.upload_spooled, lambda user_id: 'token-b',
+                           retry_statuses=SPOOL_STATUSES,
+                           auth_statuses=(STATUS_AUTH_EXPIRED, STATUS_NOT_AUTHORIZED),
+                           log=lambda message: None)
+    drainer.drain_once()
+
+    assert primary.spool.pending() == []
+    assert snapshots.normalize_payload(api.collections['user-b']) == snapshots.normalize_payload(other_payload)
+    assert snapshots.load_snapshot(str(tmp_path))['user_id'] == 'user-a'
+    assert snapshots.load_snapshot(str(tmp_path))['version'] == snapshots.payload_version(primary_payload)
+    assert snapshots.load_snapshot(str(account_dir))['version'] == snapshots.payload_version(other_payload)
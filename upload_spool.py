@@ -0,0 +1,224 @@
+"""Offline upload spool for Skinergy Desktop Uploader
+
+When the API can't be reached, the fetched collection is kept in a small
+SQLite database in the data dir instead of being thrown away. SpoolDrainer
+sends it later with back-off. There is one row per user, so a newer
+collection replaces an older one that never made it: after an outage each
+user costs one upload, however many times they clicked. Each row remembers
+the data dir holding that account's upload snapshot, since --batch spools
+several accounts into one file.
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+SPOOL_FILE = 'upload_spool.db'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    user_id TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    payload BLOB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    data_dir TEXT
+)
+"""
+
+
+class UploadSpool:
+    """Newest not-yet-uploaded collection per user, stored durably
+
+    Every call opens its own connection, so the GUI, the drainer thread and
+    a --daemon process can share one file; SQLite does the locking.
+    """
+
+    def __init__(self, data_dir: str, filename: str = SPOOL_FILE):
+        self.path = os.path.join(data_dir, filename)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One transaction on a fresh connection, committed and closed on exit"""
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=FULL')  # a spooled upload must survive a crash
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def put(self, payload: Dict, fetched_at: float, delay: float = 0.0,
+            data_dir: Optional[str] = None) -> bool:
+        """Spool a collection unless a newer one for that user is already waiting
+
+        The first attempt is due after `delay` seconds. `data_dir` is where
+        the account's upload snapshot lives (default: the spool's own dir).
+        """
+        blob = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO spool (user_id, fetched_at, payload, next_attempt, data_dir) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                "payload = excluded.payload, attempts = 0, next_attempt = excluded.next_attempt, "
+                "data_dir = excluded.data_dir "
+                "WHERE excluded.fetched_at >= spool.fetched_at",
+                (str(payload.get('user_id')), fetched_at, blob, time.time() + delay, data_dir))
+            return cursor.rowcount > 0
+
+    def contains(self, user_id: str, fetched_at: float) -> bool:
+        """Whether this exact entry is still waiting (not uploaded or replaced)"""
+        with self._connect() as db:
+            row = db.execute("SELECT 1 FROM spool WHERE user_id = ? AND fetched_at = ?",
+                             (str(user_id), fetched_at)).fetchone()
+        return row is not None
+
+    def discard(self, user_id: str, fetched_before: Optional[float] = None):
+        """Drop a user's entry (superseded by an upload of data fetched later)"""
+        with self._connect() as db:
+            if fetched_before is None:
+                db.execute("DELETE FROM spool WHERE user_id = ?", (str(user_id),))
+            else:
+                db.execute("DELETE FROM spool WHERE user_id = ? AND fetched_at <= ?",
+                           (str(user_id), fetched_before))
+
+    def pending(self) -> List[Dict]:
+        """user_id, fetched_at, attempts and next_attempt of every entry"""
+        with self._connect() as db:
+            rows = db.execute("SELECT user_id, fetched_at, attempts, next_attempt FROM spool "
+                              "ORDER BY next_attempt").fetchall()
+        return [dict(zip(('user_id', 'fetched_at', 'attempts', 'next_attempt'), row)) for row in rows]
+
+    def claim(self, user_id: str, lease: float) -> Optional[Dict]:
+        """Take a due entry for `lease` seconds; None if missing, not due or taken
+
+        The lease keeps a second drainer (another process) off the same entry
+        while this one uploads it.
+        """
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute("UPDATE spool SET next_attempt = ? WHERE user_id = ? AND next_attempt <= ?",
+                                (now + lease, str(user_id), now))
+            if cursor.rowcount == 0:
+                return None
+            row = db.execute("SELECT fetched_at, payload, attempts, data_dir FROM spool WHERE user_id = ?",
+                             (str(user_id),)).fetchone()
+        fetched_at, blob, attempts, data_dir = row
+        return {'user_id': user_id, 'fetched_at': fetched_at, 'attempts': attempts,
+                'data_dir': data_dir or os.path.dirname(self.path),
+                'payload': json.loads(zlib.decompress(blob))}
+
+    def retry_later(self, user_id: str, fetched_at: float, delay: float):
+        """Back off an entry after a failed attempt (if it wasn't replaced meanwhile)"""
+        with self._connect() as db:
+            db.execute("UPDATE spool SET attempts = attempts + 1, next_attempt = ? "
+                       "WHERE user_id = ? AND fetched_at = ?",
+                       (time.time() + delay, str(user_id), fetched_at))
+
+
+class SpoolDrainer:
+    """Background thread that uploads spooled collections once the API is back
+
+    `upload(payload, auth_token, fetched_at, data_dir)` returns a SyncResult and
+    `get_token(user_id)` that user's saved auth token (None leaves the entry
+    waiting). Results in `retry_statuses` back off; results in
+    `auth_statuses` wait for a different token; anything else that isn't ok
+    means the server refused the data, so the entry is dropped.
+    """
+
+    RETRY_BASE = 30.0
+    RETRY_MAX = 30 * 60.0
+    IDLE_CHECK = 60.0
+    LEASE = 10 * 60.0  # longer than any upload, incl. retries
+    MAX_AGE = 7 * 24 * 3600.0
+
+    def __init__(self, spool: UploadSpool, upload: Callable, get_token: Callable[[str], Optional[str]],
+                 retry_statuses, auth_statuses, log: Optional[Callable[[str], None]] = None):
+        self.spool = spool
+        self.upload = upload
+        self.get_token = get_token
+        self.retry_statuses = set(retry_statuses)
+        self.auth_statuses = set(auth_statuses)
+        self.log = log or logging.info
+        self._rejected_tokens: Dict[str, str] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="spool-drainer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def notify(self):
+        """Something was spooled or a token changed; look again now"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.drain_once()
+            except Exception as e:
+                self.log(f"⚠ Offline upload queue error: {e}")
+                delay = self.RETRY_BASE
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def backoff(self, attempts: int) -> float:
+        delay = min(self.RETRY_BASE * 2 ** attempts, self.RETRY_MAX)
+        return delay * random.uniform(0.8, 1.2)  # don't all come back at once after maintenance
+
+    def drain_once(self) -> float:
+        """Upload every due entry; returns seconds until the next one is due"""
+        now = time.time()
+        next_due = now + self.IDLE_CHECK
+        for entry in self.spool.pending():
+            if self._stop.is_set():
+                break
+            user_id = entry['user_id']
+            if now - entry['fetched_at'] > self.MAX_AGE:
+                self.log("⚠ Dropping a queued upload older than 7 days")
+                self.spool.discard(user_id, fetched_before=entry['fetched_at'])
+                continue
+            if entry['next_attempt'] > now:
+                next_due = min(next_due, entry['next_attempt'])
+                continue
+            token = self.get_token(user_id)
+            if not token or self._rejected_tokens.get(user_id) == token:
+                continue  # waits for (re-)authorization
+            claimed = self.spool.claim(user_id, self.LEASE)
+            if claimed is None:
+                continue
+
+            self.log("Uploading queued collection...")
+            result = self.upload(claimed['payload'], token, claimed['fetched_at'], claimed['data_dir'])
+            if result.ok:
+                self.log("✓ Queued collection uploaded")
+                self.spool.discard(user_id, fetched_before=claimed['fetched_at'])
+            elif result.status in self.retry_statuses:
+                delay = self.backoff(claimed['attempts'] + 1)
+                self.log(f"⚠ Queued upload failed ({result.message}) - retrying in {delay:.0f}s")
+                self.spool.retry_later(user_id, claimed['fetched_at'], delay)
+                next_due = min(next_due, time.time() + delay)
+            elif result.status in self.auth_statuses:
+                self.log("⚠ Queued upload waiting for authorization")
+                self._rejected_tokens[user_id] = token
+                self.spool.retry_later(user_id, claimed['fetched_at'], 0)
+            else:
+                self.log(f"✗ Queued upload refused by the server, dropping it: {result.message}")
+                self.spool.discard(user_id, fetched_before=claimed['fetched_at'])
+        return max(1.0, next_due - time.time())